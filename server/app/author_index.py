@@ -0,0 +1,150 @@
+"""In-process prefix index for author autocomplete.
+
+Keys are accent- and case-folded (``"Émile Zola"`` -> ``"emile zola"``) and
+kept in a sorted list, so a lookup is a ``bisect`` plus a short forward scan,
+without touching the database. Every word start of a name is indexed, so
+``zo`` finds *Émile Zola* as well as *Zola*.
+
+The index is built at startup (see ``main.lifespan``) and updated by the
+author write paths of this process. Writes made by other processes (other
+workers or replicas sharing the database) are picked up by a full rebuild
+once the index is older than ``AUTHOR_INDEX_MAX_AGE_SECONDS``. A rebuild
+reads its snapshot without holding the index lock; writes made meanwhile are
+journaled and replayed onto the new index before it replaces the old one.
+"""
+
+import bisect
+import os
+import threading
+import time
+import unicodedata
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models import Author
+
+# 0 disables periodic rebuilds (single process owning all author writes)
+AUTHOR_INDEX_MAX_AGE_SECONDS = float(os.getenv("AUTHOR_INDEX_MAX_AGE_SECONDS", "300"))
+
+
+def fold(text: str) -> str:
+    """Lowercase, strip accents and collapse whitespace"""
+    decomposed = unicodedata.normalize("NFKD", text)
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(stripped.casefold().split())
+
+
+def _keys(name: str) -> List[str]:
+    words = fold(name).split(" ")
+    return [" ".join(words[i:]) for i in range(len(words)) if words[i]]
+
+
+class AuthorPrefixIndex:
+    """Sorted (folded key, author id) pairs with bisect lookups"""
+
+    def __init__(self, max_age: float = AUTHOR_INDEX_MAX_AGE_SECONDS) -> None:
+        self.max_age = max_age
+        self._keys: List[Tuple[str, int]] = []
+        self._names: Dict[int, str] = {}
+        self._lock = threading.Lock()
+        self._rebuild_lock = threading.Lock()
+        # author id -> new name (None when removed), recorded while a rebuild runs
+        self._journal: Optional[Dict[int, Optional[str]]] = None
+        self.built_at: Optional[float] = None
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def load(self, authors: Iterable[Tuple[int, str]]) -> None:
+        """Replace the whole index with ``(id, name)`` pairs, then replay journaled writes"""
+        names = dict(authors)
+        keys = sorted((key, author_id) for author_id, name in names.items() for key in _keys(name))
+        with self._lock:
+            journal, self._journal = self._journal or {}, None
+            self._names, self._keys = names, keys
+            for author_id, name in journal.items():
+                self._discard(author_id)
+                if name is not None:
+                    self._insert(author_id, name)
+            self.built_at = time.monotonic()
+
+    def rebuild(self, db: Session) -> None:
+        with self._rebuild_lock:
+            self._rebuild(db)
+
+    def _rebuild(self, db: Session) -> None:
+        with self._lock:
+            self._journal = {}
+        try:
+            authors = db.execute(select(Author.id, Author.name)).tuples().all()
+        except Exception:
+            with self._lock:
+                self._journal = None
+            raise
+        self.load(authors)
+
+    def is_stale(self) -> bool:
+        if self.built_at is None:
+            return True
+        return bool(self.max_age) and time.monotonic() - self.built_at > self.max_age
+
+    def refresh_if_stale(self, db: Session) -> None:
+        """Rebuild when stale; concurrent callers keep using the current index"""
+        if not self.is_stale() or not self._rebuild_lock.acquire(blocking=False):
+            return
+        try:
+            if self.is_stale():
+                self._rebuild(db)
+        finally:
+            self._rebuild_lock.release()
+
+    def _discard(self, author_id: int) -> None:
+        name = self._names.pop(author_id, None)
+        if name is None:
+            return
+        for key in _keys(name):
+            position = bisect.bisect_left(self._keys, (key, author_id))
+            if position < len(self._keys) and self._keys[position] == (key, author_id):
+                del self._keys[position]
+
+    def _insert(self, author_id: int, name: str) -> None:
+        self._names[author_id] = name
+        for key in _keys(name):
+            bisect.insort(self._keys, (key, author_id))
+
+    def upsert(self, author_id: int, name: str) -> None:
+        with self._lock:
+            if self._journal is not None:
+                self._journal[author_id] = name
+            self._discard(author_id)
+            self._insert(author_id, name)
+
+    def remove(self, author_id: int) -> None:
+        with self._lock:
+            if self._journal is not None:
+                self._journal[author_id] = None
+            self._discard(author_id)
+
+    def suggest(self, prefix: str, limit: int = 10) -> List[Tuple[int, str]]:
+        """Return up to ``limit`` ``(id, name)`` pairs matching ``prefix``, by folded key"""
+        folded = fold(prefix)
+        if not folded:
+            return []
+        results: List[Tuple[int, str]] = []
+        seen = set()
+        with self._lock:
+            position = bisect.bisect_left(self._keys, (folded,))
+            while position < len(self._keys) and len(results) < limit:
+                key, author_id = self._keys[position]
+                if not key.startswith(folded):
+                    break
+                if author_id not in seen:
+                    seen.add(author_id)
+                    results.append((author_id, self._names[author_id]))
+                position += 1
+        return results
+
+
+author_index = AuthorPrefixIndex()
@@ -0,0 +1,53 @@
+"""Fetching several resources by id in one request.
+
+Used by ``GET /api/books/?ids=`` and ``POST /api/authors/batch-get``: the
+ids are de-duplicated (first occurrence wins), capped at ``BATCH_MAX_IDS``,
+loaded with a single ``IN`` query and returned in request order. Ids with no
+visible row (unknown, or another user's book) are reported as missing
+instead of failing the whole batch.
+"""
+
+import os
+from typing import Any, Iterable, List, Sequence, Tuple
+
+from app.exceptions import ValidationError
+
+BATCH_MAX_IDS = int(os.getenv("BATCH_MAX_IDS", "100"))
+
+# Missing ids of a ``?ids=`` list response, comma-separated
+MISSING_IDS_HEADER = "X-Missing-Ids"
+
+
+def unique_ids(ids: Iterable[int]) -> List[int]:
+    """Drop repeated ids, keeping the first position, and enforce the batch size"""
+    unique = list(dict.fromkeys(ids))
+    if not unique or len(unique) > BATCH_MAX_IDS:
+        raise ValidationError(
+            message=f"Between 1 and {BATCH_MAX_IDS} ids are required",
+            error_code="INVALID_IDS",
+            details={"count": len(unique), "max": BATCH_MAX_IDS},
+        )
+    return unique
+
+
+def parse_ids(value: str) -> List[int]:
+    """Parse a comma-separated ``ids`` query parameter"""
+    try:
+        ids = [int(part) for part in value.split(",") if part.strip()]
+    except ValueError:
+        raise ValidationError(
+            message="ids must be a comma-separated list of integers",
+            error_code="INVALID_IDS",
+            details={"ids": value[:200]},
+        )
+    return unique_ids(ids)
+
+
+def in_request_order(ids: Sequence[int], rows: Iterable[Any]) -> Tuple[List[Any], List[int]]:
+    """Order ``rows`` (objects with an ``id``) as ``ids`` and list the ids without a row"""
+    by_id = {row.id: row for row in rows}
+    return [by_id[i] for i in ids if i in by_id], [i for i in ids if i not in by_id]
+
+
+def missing_ids_header(missing: Sequence[int]) -> str:
+    return ",".join(str(i) for i in missing)
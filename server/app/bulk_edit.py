@@ -0,0 +1,206 @@
+"""Bulk update and delete of a user's books.
+
+A batch costs a fixed number of queries however many books it touches:
+ownership, ISBN uniqueness and author ids are each checked with one ``IN``
+query, then every valid item is written in a single transaction with
+set-based statements. Items changing the same fields to the same values
+share one ``UPDATE ... WHERE id IN``; items with their own values share one
+executemany. ``updated_at`` is set explicitly to one timestamp for the whole
+batch, so ETags change even when only the author links do. Invalid items
+are reported per id and skipped; the rest of the batch is still applied.
+
+The full-text index follows through its triggers (see ``app.search``).
+"""
+
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, List, Sequence, Set, Tuple
+
+from sqlalchemy import bindparam, delete, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.batch import unique_ids
+from app.exceptions import ValidationError
+from app.logging_config import get_logger
+from app.models import Author, Book, book_author_association
+from app.schemas import BookBulkItemResult, BookBulkOperation, BookBulkResult, BookBulkUpdate
+
+logger = get_logger(__name__)
+
+BOOKS = Book.__table__
+LINKS = book_author_association
+CONFLICT_MESSAGE = "Rejected by the database (conflicting concurrent write)"
+
+
+def _operations(batch: BookBulkUpdate) -> List[BookBulkOperation]:
+    """Normalize ``ids`` + ``changes`` and ``operations`` into one operation per book"""
+    if (batch.operations is None) == (batch.ids is None):
+        raise ValidationError(
+            message="Send either ids with changes, or operations",
+            error_code="INVALID_BULK_UPDATE",
+        )
+    if batch.ids is not None:
+        changes = batch.changes.model_dump(exclude_none=True) if batch.changes is not None else {}
+        if not changes:
+            raise ValidationError(message="No fields to update", error_code="INVALID_BULK_UPDATE")
+        return [BookBulkOperation(id=book_id, **changes) for book_id in unique_ids(batch.ids)]
+    unique_ids(operation.id for operation in batch.operations)  # enforces the batch size
+    return batch.operations
+
+
+class BookBulkEditor:
+    """Applies one batch of updates or deletes for ``owner_id``"""
+
+    def __init__(self, db: Session, owner_id: int) -> None:
+        self.db = db
+        self.owner_id = owner_id
+        self.results: Dict[int, BookBulkItemResult] = {}
+
+    def _fail(self, book_id: int, status: str, error: str) -> None:
+        self.results[book_id] = BookBulkItemResult(id=book_id, status=status, error=error)
+
+    def _owned(self, ids: Sequence[int]) -> Set[int]:
+        owned = set(self.db.scalars(select(Book.id).where(Book.owner_id == self.owner_id, Book.id.in_(ids))))
+        for book_id in ids:
+            if book_id not in owned:
+                self._fail(book_id, "not_found", "Book not found")
+        return owned
+
+    def _check_isbns(self, items: List[Tuple[int, Dict[str, Any]]]) -> List[Tuple[int, Dict[str, Any]]]:
+        isbns = {changes["isbn"] for _, changes in items if "isbn" in changes}
+        holders: Dict[str, int] = {}
+        if isbns:
+            holders = dict(self.db.execute(select(Book.isbn, Book.id).where(Book.isbn.in_(isbns))).tuples().all())
+        kept, seen = [], set()
+        for book_id, changes in items:
+            isbn = changes.get("isbn")
+            if isbn is not None and holders.get(isbn, book_id) != book_id:
+                self._fail(book_id, "failed", "Book with this ISBN already exists")
+            elif isbn is not None and isbn in seen:
+                self._fail(book_id, "failed", "Duplicate ISBN in batch")
+            else:
+                if isbn is not None:
+                    seen.add(isbn)
+                kept.append((book_id, changes))
+        return kept
+
+    def _check_authors(self, items: List[Tuple[int, Dict[str, Any]]]) -> List[Tuple[int, Dict[str, Any]]]:
+        wanted = {author_id for _, changes in items for author_id in changes.get("author_ids", ())}
+        known: Set[int] = set()
+        if wanted:
+            known = set(self.db.scalars(select(Author.id).where(Author.id.in_(wanted))))
+        kept = []
+        for book_id, changes in items:
+            unknown = sorted(set(changes.get("author_ids", ())) - known)
+            if unknown:
+                self._fail(book_id, "failed", f"Unknown author ids: {unknown}")
+            else:
+                kept.append((book_id, changes))
+        return kept
+
+    def _write_updates(self, items: List[Tuple[int, Dict[str, Any]]]) -> None:
+        now = datetime.utcnow()
+        owned = BOOKS.c.owner_id == self.owner_id
+        groups: Dict[Tuple[str, ...], List[Tuple[int, Dict[str, Any]]]] = defaultdict(list)
+        for book_id, changes in items:
+            columns = {name: value for name, value in changes.items() if name != "author_ids"}
+            groups[tuple(sorted(columns))].append((book_id, columns))
+
+        for names, group in groups.items():
+            distinct = {tuple(columns[name] for name in names) for _, columns in group}
+            if len(distinct) == 1:
+                self.db.execute(
+                    update(BOOKS)
+                    .where(owned, BOOKS.c.id.in_([book_id for book_id, _ in group]))
+                    .values(**group[0][1], updated_at=now)
+                )
+            else:
+                # Bound names must differ from the column names SQLAlchemy reserves for SET
+                self.db.execute(
+                    update(BOOKS)
+                    .where(owned, BOOKS.c.id == bindparam("book_id"))
+                    .values(updated_at=now, **{name: bindparam(f"new_{name}") for name in names}),
+                    [
+                        {"book_id": book_id, **{f"new_{name}": value for name, value in columns.items()}}
+                        for book_id, columns in group
+                    ],
+                )
+
+        relinked = [(book_id, changes["author_ids"]) for book_id, changes in items if "author_ids" in changes]
+        if relinked:
+            self.db.execute(delete(LINKS).where(LINKS.c.book_id.in_([book_id for book_id, _ in relinked])))
+            links = [
+                {"book_id": book_id, "author_id": author_id}
+                for book_id, author_ids in relinked
+                for author_id in sorted(set(author_ids))
+            ]
+            if links:
+                self.db.execute(insert(LINKS), links)
+
+    def update(self, batch: BookBulkUpdate) -> BookBulkResult:
+        operations = _operations(batch)
+        order = [operation.id for operation in operations]
+        items: List[Tuple[int, Dict[str, Any]]] = []
+        seen: Set[int] = set()
+        for operation in operations:
+            if operation.id in seen:
+                continue  # reported by _result
+            seen.add(operation.id)
+            changes = operation.model_dump(exclude={"id"}, exclude_none=True)
+            if changes:
+                items.append((operation.id, changes))
+            else:
+                self._fail(operation.id, "failed", "No fields to update")
+
+        owned = self._owned([book_id for book_id, _ in items]) if items else set()
+        items = self._check_authors(self._check_isbns([item for item in items if item[0] in owned]))
+        if items:
+            try:
+                self._write_updates(items)
+                self.db.commit()
+            except IntegrityError:
+                # e.g. an ISBN taken concurrently since the IN check
+                self.db.rollback()
+                logger.warning(
+                    f"Bulk update rejected by the database for user {self.owner_id}",
+                    exc_info=True,
+                )
+                for book_id, _ in items:
+                    self._fail(book_id, "failed", CONFLICT_MESSAGE)
+                items = []
+        for book_id, _ in items:
+            self.results[book_id] = BookBulkItemResult(id=book_id, status="updated")
+        return self._result("update", order)
+
+    def delete(self, ids: Sequence[int]) -> BookBulkResult:
+        found = self._owned(ids)
+        owned = [book_id for book_id in ids if book_id in found]
+        if owned:
+            # Books first: the FTS unlink trigger then has no row left to refresh
+            self.db.execute(delete(BOOKS).where(BOOKS.c.owner_id == self.owner_id, BOOKS.c.id.in_(owned)))
+            self.db.execute(delete(LINKS).where(LINKS.c.book_id.in_(owned)))
+            self.db.commit()
+        for book_id in owned:
+            self.results[book_id] = BookBulkItemResult(id=book_id, status="deleted")
+        return self._result("delete", ids)
+
+    def _result(self, action: str, order: Sequence[int]) -> BookBulkResult:
+        """One result per requested item, in request order; a repeated id only counts once"""
+        results = []
+        reported: Set[int] = set()
+        for book_id in order:
+            if book_id in reported:
+                results.append(BookBulkItemResult(id=book_id, status="failed", error="Duplicate id in batch"))
+            else:
+                results.append(self.results[book_id])
+                reported.add(book_id)
+        succeeded = sum(result.error is None for result in results)
+        logger.info(
+            f"Bulk {action} of books: {succeeded}/{len(results)} applied",
+            extra={'extra_data': {'user_id': self.owner_id, 'action': action, 'processed': len(results),
+                                  'succeeded': succeeded}}
+        )
+        return BookBulkResult(
+            processed=len(results), succeeded=succeeded, failed=len(results) - succeeded, results=results
+        )
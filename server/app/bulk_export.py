@@ -0,0 +1,138 @@
+"""Streaming export of a user's books (NDJSON / CSV / JSON).
+
+Books are read with ``yield_per`` in partitions of ``BULK_EXPORT_CHUNK_SIZE``
+rows, and each partition gets its authors with one ``selectinload`` query.
+Every partition is serialized and handed to the response before the next one
+is fetched; the session only holds weak references to unmodified objects, so
+served partitions are freed and memory use depends on the chunk size, not on
+the size of the library.
+
+The CSV columns match what ``POST /api/books/bulk`` accepts, but ISBNs are
+unique across all users and author ids only mean something in the database
+they come from. To import an export into the same database (another account,
+or after deleting the books), leave out ``isbn``; to import it into another
+database, leave out ``author_ids`` so authors are matched or created by name.
+``omit`` drops CSV columns for that.
+"""
+
+import csv
+import io
+import os
+from typing import FrozenSet, Iterable, Iterator
+
+from pydantic import TypeAdapter
+from sqlalchemy import select
+
+from app.database import SessionLocal
+from app.exceptions import ValidationError
+from app.loaders import BOOK_READ_OPTIONS
+from app.models import Book
+from app.schemas import BookRead
+from app.serialization import BOOK_LIST_ADAPTER, dump_json
+
+BULK_EXPORT_CHUNK_SIZE = int(os.getenv("BULK_EXPORT_CHUNK_SIZE", "1000"))
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+    "json": "application/json",
+}
+CSV_COLUMNS = (
+    "id", "title", "description", "isbn", "published_year",
+    "created_at", "updated_at", "author_ids", "author_names",
+)
+LIST_SEPARATOR = ";"
+
+BOOK_ADAPTER = TypeAdapter(BookRead)
+
+
+def _iter_partitions(owner_id: int, chunk_size: int) -> Iterator[list]:
+    # The response outlives the request's dependencies, so the stream owns its session
+    db = SessionLocal()
+    try:
+        result = db.execute(
+            select(Book)
+            .options(*BOOK_READ_OPTIONS)
+            .where(Book.owner_id == owner_id)
+            .order_by(Book.id)
+            .execution_options(yield_per=chunk_size)
+        )
+        for partition in result.scalars().partitions():
+            yield partition
+    finally:
+        db.close()
+
+
+def _ndjson_chunks(owner_id: int, chunk_size: int) -> Iterator[bytes]:
+    for books in _iter_partitions(owner_id, chunk_size):
+        yield b"".join(
+            BOOK_ADAPTER.dump_json(BOOK_ADAPTER.validate_python(book, from_attributes=True)) + b"\n"
+            for book in books
+        )
+
+
+def _json_chunks(owner_id: int, chunk_size: int) -> Iterator[bytes]:
+    yield b"["
+    separator = b""
+    for books in _iter_partitions(owner_id, chunk_size):
+        # strip the brackets of each partial array and join them with commas
+        yield separator + dump_json(BOOK_LIST_ADAPTER, books)[1:-1]
+        separator = b","
+    yield b"]"
+
+
+def _csv_row(book: Book) -> tuple:
+    return (
+        book.id,
+        book.title,
+        book.description or "",
+        book.isbn or "",
+        "" if book.published_year is None else book.published_year,
+        book.created_at.isoformat() if book.created_at else "",
+        book.updated_at.isoformat() if book.updated_at else "",
+        LIST_SEPARATOR.join(str(author.id) for author in book.authors),
+        LIST_SEPARATOR.join(author.name for author in book.authors),
+    )
+
+
+def _csv_chunks(owner_id: int, chunk_size: int, omit: FrozenSet[str] = frozenset()) -> Iterator[bytes]:
+    kept = [index for index, column in enumerate(CSV_COLUMNS) if column not in omit]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([CSV_COLUMNS[index] for index in kept])
+    for books in _iter_partitions(owner_id, chunk_size):
+        for book in books:
+            row = _csv_row(book)
+            writer.writerow([row[index] for index in kept])
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():  # header only, no books
+        yield buffer.getvalue().encode()
+
+
+EXPORTERS = {
+    "ndjson": _ndjson_chunks,
+    "csv": _csv_chunks,
+    "json": _json_chunks,
+}
+
+
+def export_books(
+    owner_id: int,
+    export_format: str,
+    chunk_size: int = BULK_EXPORT_CHUNK_SIZE,
+    omit: Iterable[str] = (),
+) -> Iterator[bytes]:
+    """Yield the serialized books of ``owner_id`` one chunk at a time, without the ``omit`` CSV columns"""
+    omit = frozenset(omit)
+    if omit:
+        unknown = sorted(omit.difference(CSV_COLUMNS))
+        if export_format != "csv" or unknown:
+            raise ValidationError(
+                message="omit only applies to CSV exports, and takes CSV column names",
+                error_code="INVALID_EXPORT_COLUMNS",
+                details={"unknown": unknown, "columns": list(CSV_COLUMNS)},
+            )
+        return _csv_chunks(owner_id, chunk_size, omit)
+    return EXPORTERS[export_format](owner_id, chunk_size)
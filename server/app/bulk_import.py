@@ -0,0 +1,342 @@
+"""Streaming bulk import of books (NDJSON / CSV).
+
+The request body is consumed as it arrives and cut into chunks of
+``BULK_IMPORT_CHUNK_SIZE`` records. Each chunk costs a fixed number of
+queries whatever its size: one ``IN`` query for ISBN uniqueness, one or two
+for author resolution, one executemany INSERT for the books and one for the
+book/author links, all in a single transaction. Invalid rows are reported
+and skipped; the rest of the chunk is still imported. Only one chunk, the
+current line and the first ``BULK_IMPORT_MAX_ERRORS`` errors are held in
+memory.
+
+CSV uploads need a header row. ``author_ids`` and ``author_names`` cells
+hold ``;``-separated lists. Authors given by name are matched exactly, and
+created when they do not exist yet.
+"""
+
+import codecs
+import csv
+import json
+import os
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Set, Tuple
+
+from pydantic import ValidationError as PydanticValidationError
+from sqlalchemy import func, insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.author_index import author_index
+from app.exceptions import ValidationError
+from app.logging_config import get_logger
+from app.response_cache import AUTHOR_LIST_TAG, response_cache
+from app.models import Author, Book, book_author_association
+from app.schemas import BookImportError, BookImportResult, BookImportRow
+
+logger = get_logger(__name__)
+
+BULK_IMPORT_CHUNK_SIZE = int(os.getenv("BULK_IMPORT_CHUNK_SIZE", "500"))
+BULK_IMPORT_MAX_ERRORS = int(os.getenv("BULK_IMPORT_MAX_ERRORS", "1000"))
+BULK_IMPORT_MAX_LINE_LENGTH = int(os.getenv("BULK_IMPORT_MAX_LINE_LENGTH", str(1024 * 1024)))
+
+NDJSON_CONTENT_TYPES = {"application/x-ndjson", "application/ndjson", "application/jsonl", "application/json-lines"}
+CSV_CONTENT_TYPES = {"text/csv", "application/csv"}
+LIST_SEPARATOR = ";"
+
+# (row number, parsed record or parse error message)
+Record = Tuple[int, Any]
+
+
+class _LineTooLong:
+    """Placeholder yielded instead of a line longer than the limit"""
+
+
+LINE_TOO_LONG = _LineTooLong()
+
+
+def detect_format(content_type: Optional[str], explicit: Optional[str] = None) -> str:
+    """Pick ``ndjson`` or ``csv`` from the ``format`` parameter or Content-Type"""
+    if explicit:
+        return explicit
+    media_type = (content_type or "").split(";", 1)[0].strip().lower()
+    if media_type in NDJSON_CONTENT_TYPES:
+        return "ndjson"
+    if media_type in CSV_CONTENT_TYPES:
+        return "csv"
+    raise ValidationError(
+        message="Unsupported import format, send NDJSON or CSV",
+        error_code="UNSUPPORTED_FORMAT",
+        details={"content_type": content_type},
+    )
+
+
+async def iter_lines(chunks: AsyncIterator[bytes], max_line_length: int = BULK_IMPORT_MAX_LINE_LENGTH):
+    """Split a byte stream into text lines without buffering the whole body.
+
+    Lines longer than ``max_line_length`` are discarded and replaced by
+    ``LINE_TOO_LONG`` so a single bad line cannot exhaust memory.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    pending = ""
+    skipping = False
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            if skipping:
+                skipping = False
+                yield LINE_TOO_LONG
+            elif len(line) > max_line_length:
+                yield LINE_TOO_LONG
+            else:
+                yield line.rstrip("\r")
+        if len(pending) > max_line_length:
+            pending = ""
+            skipping = True
+    pending += decoder.decode(b"", final=True)
+    if skipping or len(pending) > max_line_length:
+        yield LINE_TOO_LONG
+    elif pending:
+        yield pending.rstrip("\r")
+
+
+async def iter_ndjson_records(lines) -> AsyncIterator[Record]:
+    row = 0
+    async for line in lines:
+        if line is not LINE_TOO_LONG and not line.strip():
+            continue
+        row += 1
+        if line is LINE_TOO_LONG:
+            yield row, "Line too long"
+            continue
+        try:
+            data = json.loads(line)
+        except ValueError as exc:
+            yield row, f"Invalid JSON: {exc}"
+            continue
+        yield row, data if isinstance(data, dict) else "Expected a JSON object"
+
+
+def _split_list(value: Optional[str]) -> Optional[List[str]]:
+    if value is None:
+        return None
+    return [item.strip() for item in value.split(LIST_SEPARATOR) if item.strip()]
+
+
+def _csv_row(header: List[str], values: List[str]) -> Dict[str, Any]:
+    data: Dict[str, Any] = {}
+    for key, value in zip(header, values):
+        value = value.strip()
+        data[key] = value or None
+    for key in ("author_ids", "author_names"):
+        if key in data:
+            data[key] = _split_list(data[key])
+    return data
+
+
+async def iter_csv_records(lines) -> AsyncIterator[Record]:
+    """Parse CSV records, joining physical lines while a quoted field is open"""
+    header: Optional[List[str]] = None
+    row = 0
+    record = ""
+    async for line in lines:
+        if line is LINE_TOO_LONG:
+            record = ""
+            if header is None:
+                raise ValidationError(message="CSV header line too long", error_code="INVALID_CSV")
+            row += 1
+            yield row, "Line too long"
+            continue
+        record = f"{record}\n{line}" if record else line
+        if record.count('"') % 2:
+            if len(record) > BULK_IMPORT_MAX_LINE_LENGTH:
+                record = ""
+                row += 1
+                yield row, "Record too long"
+            continue
+        text, record = record, ""
+        if not text.strip():
+            continue
+        values = next(csv.reader([text]))
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        row += 1
+        if len(values) > len(header):
+            yield row, f"Expected {len(header)} columns, got {len(values)}"
+            continue
+        yield row, _csv_row(header, values)
+
+
+async def iter_chunks(records: AsyncIterator[Record], size: int = BULK_IMPORT_CHUNK_SIZE):
+    chunk: List[Record] = []
+    async for record in records:
+        chunk.append(record)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _format_validation_error(exc: PydanticValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in error['loc']) or 'row'}: {error['msg']}"
+        for error in exc.errors()
+    )
+
+
+class BookImporter:
+    """Imports chunks of records for one owner and accumulates the report"""
+
+    def __init__(self, db: Session, owner_id: int, max_errors: int = BULK_IMPORT_MAX_ERRORS) -> None:
+        self.db = db
+        self.owner_id = owner_id
+        self.max_errors = max_errors
+        self.processed = 0
+        self.inserted = 0
+        self.failed = 0
+        self.errors: List[BookImportError] = []
+        # Errors of the current chunk, found pass by pass and reported by row
+        self._chunk_errors: List[BookImportError] = []
+        # (name, id) of authors created by the current chunk, indexed once committed
+        self._created_authors: List[Tuple[str, int]] = []
+
+    def _fail(self, row: int, message: str, isbn: Optional[str] = None) -> None:
+        self.failed += 1
+        self._chunk_errors.append(BookImportError(row=row, error=message, isbn=isbn))
+
+    def _report_chunk_errors(self) -> None:
+        # Chunks arrive in row order, so sorting each one keeps the whole list sorted
+        room = max(0, self.max_errors - len(self.errors))
+        self.errors.extend(sorted(self._chunk_errors, key=lambda error: error.row)[:room])
+        self._chunk_errors.clear()
+
+    def _validate(self, chunk: Iterable[Record]) -> List[Tuple[int, BookImportRow]]:
+        valid = []
+        for row, data in chunk:
+            self.processed += 1
+            if isinstance(data, str):
+                self._fail(row, data)
+                continue
+            try:
+                valid.append((row, BookImportRow.model_validate(data)))
+            except PydanticValidationError as exc:
+                isbn = data.get("isbn")
+                self._fail(row, _format_validation_error(exc), isbn=isbn if isinstance(isbn, str) else None)
+        return valid
+
+    def _check_isbns(self, rows: List[Tuple[int, BookImportRow]]) -> List[Tuple[int, BookImportRow]]:
+        isbns = {book.isbn for _, book in rows if book.isbn}
+        existing: Set[str] = set()
+        if isbns:
+            existing = set(self.db.scalars(select(Book.isbn).where(Book.isbn.in_(isbns))))
+        kept = []
+        seen: Set[str] = set()
+        for row, book in rows:
+            if book.isbn and book.isbn in existing:
+                self._fail(row, "Book with this ISBN already exists", isbn=book.isbn)
+            elif book.isbn and book.isbn in seen:
+                self._fail(row, "Duplicate ISBN in upload", isbn=book.isbn)
+            else:
+                if book.isbn:
+                    seen.add(book.isbn)
+                kept.append((row, book))
+        return kept
+
+    def _resolve_authors(self, rows: List[Tuple[int, BookImportRow]]) -> List[Tuple[int, BookImportRow, Set[int]]]:
+        wanted_ids = {author_id for _, book in rows for author_id in book.author_ids or ()}
+        known_ids: Set[int] = set()
+        if wanted_ids:
+            known_ids = set(self.db.scalars(select(Author.id).where(Author.id.in_(wanted_ids))))
+
+        resolved = []
+        for row, book in rows:
+            unknown = sorted(set(book.author_ids or ()) - known_ids)
+            if unknown:
+                self._fail(row, f"Unknown author ids: {unknown}", isbn=book.isbn)
+            else:
+                resolved.append((row, book, set(book.author_ids or ())))
+
+        names = {name for _, book, _ in resolved for name in book.author_names or ()}
+        if names:
+            ids_by_name = dict(self.db.execute(
+                select(Author.name, func.min(Author.id))
+                .where(Author.name.in_(names))
+                .group_by(Author.name)
+            ).all())
+            missing = sorted(names - ids_by_name.keys())
+            if missing:
+                created = self.db.execute(
+                    insert(Author).returning(Author.name, Author.id, sort_by_parameter_order=True),
+                    [{"name": name} for name in missing],
+                )
+                created_authors = created.tuples().all()
+                ids_by_name.update(created_authors)
+                self._created_authors.extend(created_authors)
+            for _, book, author_ids in resolved:
+                author_ids.update(ids_by_name[name] for name in book.author_names or ())
+        return resolved
+
+    def import_chunk(self, chunk: List[Record]) -> None:
+        """Validate and insert one chunk in its own transaction"""
+        try:
+            self._import_chunk(chunk)
+        finally:
+            self._report_chunk_errors()
+
+    def _import_chunk(self, chunk: List[Record]) -> None:
+        rows = self._check_isbns(self._validate(chunk))
+        if not rows:
+            return
+        resolved = None
+        self._created_authors.clear()
+        try:
+            resolved = self._resolve_authors(rows)
+            if not resolved:
+                self.db.commit()
+                return
+            book_ids = self.db.scalars(
+                insert(Book).returning(Book.id, sort_by_parameter_order=True),
+                [
+                    {
+                        "title": book.title,
+                        "description": book.description,
+                        "isbn": book.isbn,
+                        "published_year": book.published_year,
+                        "owner_id": self.owner_id,
+                    }
+                    for _, book, _ in resolved
+                ],
+            ).all()
+            links = [
+                {"book_id": book_id, "author_id": author_id}
+                for book_id, (_, _, author_ids) in zip(book_ids, resolved)
+                for author_id in sorted(author_ids)
+            ]
+            if links:
+                self.db.execute(insert(book_author_association), links)
+            self.db.commit()
+            for name, author_id in self._created_authors:
+                author_index.upsert(author_id, name)
+            if self._created_authors:
+                response_cache.invalidate(AUTHOR_LIST_TAG)
+        except IntegrityError:
+            # e.g. an ISBN inserted concurrently since the IN check
+            self.db.rollback()
+            logger.warning(
+                f"Bulk import chunk rejected by the database for user {self.owner_id}",
+                exc_info=True,
+            )
+            for row, book, *_ in resolved if resolved is not None else rows:
+                self._fail(row, "Rejected by the database (conflicting concurrent write)", isbn=book.isbn)
+            return
+        self.inserted += len(resolved)
+
+    def result(self) -> BookImportResult:
+        return BookImportResult(
+            processed=self.processed,
+            inserted=self.inserted,
+            failed=self.failed,
+            errors=self.errors,
+            errors_truncated=self.failed > len(self.errors),
+        )
@@ -0,0 +1,133 @@
+"""Conditional GET support (ETag / Last-Modified / 304 Not Modified).
+
+Validators are derived from ``updated_at`` timestamps, never from the
+serialized body:
+
+- a single resource hashes its id and ``updated_at`` (plus those of nested
+  authors for a book), read from the already-loaded row;
+- a collection hashes one aggregate row (count and max ``updated_at`` of the
+  rows it draws from, see ``book_collection_state`` /
+  ``author_collection_state``) and the query string, so a matching
+  ``If-None-Match`` is answered with a single cheap query and no page load.
+
+Collections only get an ETag: a deletion does not move ``max(updated_at)``,
+so a Last-Modified date could not detect it. Responses carry
+``Cache-Control: private, no-cache`` so browsers revalidate instead of
+guessing a freshness lifetime from Last-Modified.
+"""
+
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+from fastapi import Request, Response
+from sqlalchemy import func, select
+from sqlalchemy.sql import Select
+
+from app.models import Author, Book, Preference, book_author_association
+
+CACHE_CONTROL = "private, no-cache"
+
+
+def compute_etag(*parts: Any) -> str:
+    """Strong ETag from a tuple of version components"""
+    return f'"{hashlib.blake2b(repr(parts).encode(), digest_size=16).hexdigest()}"'
+
+
+def _as_utc(value: datetime) -> datetime:
+    # Timestamps are stored as naive UTC (datetime.utcnow)
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+def _parse_http_date(value: str) -> Optional[datetime]:
+    try:
+        return _as_utc(parsedate_to_datetime(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    # If-None-Match uses the weak comparison
+    return etag in {candidate.strip().removeprefix("W/") for candidate in header.split(",")}
+
+
+def validator_headers(etag: str, last_modified: Optional[datetime] = None) -> Dict[str, str]:
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(_as_utc(last_modified).replace(microsecond=0), usegmt=True)
+    return headers
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime] = None) -> bool:
+    """Evaluate If-None-Match, or If-Modified-Since when no ETag was sent (RFC 9110)"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, etag)
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        since = _parse_http_date(if_modified_since)
+        return since is not None and _as_utc(last_modified).replace(microsecond=0) <= since
+    return False
+
+
+def headers_not_modified(request: Request, headers: Dict[str, str]) -> bool:
+    """``is_not_modified`` for validators already rendered as headers (cached responses)"""
+    last_modified = headers.get("Last-Modified")
+    return is_not_modified(request, headers["ETag"], _parse_http_date(last_modified) if last_modified else None)
+
+
+def not_modified(headers: Dict[str, str]) -> Response:
+    return Response(status_code=304, headers=headers)
+
+
+def book_etag(book: Book, view: Optional[Any] = None) -> str:
+    """ETag of a book as rendered through ``view`` (an ``app.fieldsets.View``)"""
+    with_authors = view is None or view.includes("authors")
+    return compute_etag(
+        "book", book.id, book.updated_at,
+        [(author.id, author.updated_at) for author in book.authors] if with_authors else None,
+        view.signature if view is not None else None,
+    )
+
+
+def book_last_modified(book: Book, view: Optional[Any] = None) -> datetime:
+    """Last-Modified matching ``book_etag``: an included author's rename counts too"""
+    if view is not None and not view.includes("authors"):
+        return book.updated_at
+    return max([book.updated_at, *(author.updated_at for author in book.authors if author.updated_at)])
+
+
+def author_etag(author: Author) -> str:
+    return compute_etag("author", author.id, author.updated_at)
+
+
+def preference_etag(preference: Preference) -> str:
+    return compute_etag("preference", preference.id, preference.updated_at)
+
+
+def book_collection_state(owner_id: int) -> Select:
+    """One-row summary of an owner's books and their author links"""
+    owned = Book.owner_id == owner_id
+    links = (
+        select(book_author_association.c.author_id)
+        .join(Book, Book.id == book_author_association.c.book_id)
+        .where(owned)
+        .subquery()
+    )
+    return select(
+        select(func.count(Book.id)).where(owned).scalar_subquery(),
+        select(func.max(Book.updated_at)).where(owned).scalar_subquery(),
+        select(func.count()).select_from(links).scalar_subquery(),
+        select(func.max(Author.updated_at)).where(Author.id.in_(select(links.c.author_id))).scalar_subquery(),
+    )
+
+
+def author_collection_state() -> Select:
+    return select(func.count(Author.id), func.max(Author.updated_at))
+
+
+def collection_etag(kind: str, state: Any, request: Request) -> str:
+    return compute_etag(kind, tuple(state), request.url.query)
@@ -1,12 +1,153 @@
-from sqlalchemy import create_engine
+import hashlib
+import os
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.schema import CreateIndex, CreateTable
 from sqlalchemy.orm import sessionmaker, declarative_base
 
-DATABASE_URL = "sqlite:///./bibliotheque.db"
+from app.metrics import METRICS_ENABLED, instrument_engine
+from app.sql_profiler import profile_engine
 
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False}  # Required for SQLite
-)
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./bibliotheque.db")
+
+# Opt-in async data path (requires aiosqlite for SQLite URLs)
+ASYNC_DB_ENABLED = os.getenv("ASYNC_DB", "false").lower() == "true"
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL")
+
+# Connection pool sizing (ignored for in-memory SQLite, which uses a singleton pool)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+
+# init_db records a digest of the schema here and skips DDL while it matches
+SCHEMA_VERSION_TABLE = "schema_version"
+# How long a booting worker waits for another one applying the schema
+SCHEMA_LOCK_TIMEOUT_MS = int(os.getenv("SCHEMA_LOCK_TIMEOUT_MS", "120000"))
+
+# SQLite tuning applied on every new DBAPI connection.
+# WAL lets readers proceed while a writer holds the lock, which matters when
+# several API replicas share the same database file.
+SQLITE_PRAGMAS: Dict[str, Any] = {
+    "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+    "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+    "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+    "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+    # Negative values are expressed in KiB rather than pages
+    "cache_size": int(os.getenv("SQLITE_CACHE_SIZE", "-64000")),
+}
+
+
+def _is_sqlite(url: str) -> bool:
+    return url.startswith("sqlite")
+
+
+def _is_sqlite_memory(url: str) -> bool:
+    return _is_sqlite(url) and (":memory:" in url or url.rstrip("/") in {"sqlite:", "sqlite+pysqlite:"})
+
+
+def _register_sqlite_pragmas(engine: Engine, pragmas: Dict[str, Any]) -> None:
+    """Apply PRAGMA statements to each connection as it is opened."""
+
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, _connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+
+def _engine_kwargs(
+    url: str,
+    pool_size: Optional[int],
+    max_overflow: Optional[int],
+    pool_timeout: Optional[float],
+    engine_kwargs: Dict[str, Any],
+) -> Dict[str, Any]:
+    kwargs: Dict[str, Any] = dict(engine_kwargs)
+
+    if _is_sqlite(url):
+        connect_args = kwargs.setdefault("connect_args", {})
+        connect_args.setdefault("check_same_thread", False)  # Required for SQLite
+
+    if not _is_sqlite_memory(url):
+        kwargs.setdefault("pool_size", DB_POOL_SIZE if pool_size is None else pool_size)
+        kwargs.setdefault("max_overflow", DB_MAX_OVERFLOW if max_overflow is None else max_overflow)
+        kwargs.setdefault("pool_timeout", DB_POOL_TIMEOUT if pool_timeout is None else pool_timeout)
+
+    return kwargs
+
+
+def create_db_engine(
+    url: Optional[str] = None,
+    *,
+    pragmas: Optional[Dict[str, Any]] = None,
+    pool_size: Optional[int] = None,
+    max_overflow: Optional[int] = None,
+    pool_timeout: Optional[float] = None,
+    **engine_kwargs: Any,
+) -> Engine:
+    """Build an engine from the environment, with SQLite tuning when relevant.
+
+    Every argument defaults to the corresponding environment-driven setting;
+    pass ``pragmas={}`` to get a stock SQLite connection (used by benchmarks).
+    """
+    url = url or DATABASE_URL
+    db_engine = create_engine(
+        url, **_engine_kwargs(url, pool_size, max_overflow, pool_timeout, engine_kwargs)
+    )
+
+    if _is_sqlite(url):
+        resolved_pragmas = SQLITE_PRAGMAS if pragmas is None else pragmas
+        if resolved_pragmas:
+            _register_sqlite_pragmas(db_engine, resolved_pragmas)
+
+    return db_engine
+
+
+def _to_async_url(url: str) -> str:
+    """Map a sync driver URL onto its async driver (sqlite -> sqlite+aiosqlite)."""
+    if url.startswith("sqlite+aiosqlite"):
+        return url
+    if url.startswith("sqlite"):
+        return "sqlite+aiosqlite" + url[url.index(":"):]
+    return url
+
+
+def create_async_db_engine(
+    url: Optional[str] = None,
+    *,
+    pragmas: Optional[Dict[str, Any]] = None,
+    pool_size: Optional[int] = None,
+    max_overflow: Optional[int] = None,
+    pool_timeout: Optional[float] = None,
+    **engine_kwargs: Any,
+):
+    """Async counterpart of create_db_engine, sharing the same tuning."""
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    url = url or ASYNC_DATABASE_URL or _to_async_url(DATABASE_URL)
+    db_engine = create_async_engine(
+        url, **_engine_kwargs(url, pool_size, max_overflow, pool_timeout, engine_kwargs)
+    )
+
+    if _is_sqlite(url):
+        resolved_pragmas = SQLITE_PRAGMAS if pragmas is None else pragmas
+        if resolved_pragmas:
+            _register_sqlite_pragmas(db_engine.sync_engine, resolved_pragmas)
+
+    return db_engine
+
+
+engine = create_db_engine()
+profile_engine(engine)
+if METRICS_ENABLED:
+    instrument_engine(engine)
 
 SessionLocal = sessionmaker(
     autocommit=False,
@@ -14,6 +155,22 @@ SessionLocal = sessionmaker(
     bind=engine
 )
 
+# Built only when ASYNC_DB is enabled so aiosqlite stays optional
+async_engine = None
+AsyncSessionLocal = None
+if ASYNC_DB_ENABLED:
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+
+    async_engine = create_async_db_engine()
+    profile_engine(async_engine.sync_engine)
+    if METRICS_ENABLED:
+        instrument_engine(async_engine.sync_engine)
+    AsyncSessionLocal = async_sessionmaker(
+        bind=async_engine,
+        autoflush=False,
+        expire_on_commit=False,
+    )
+
 Base = declarative_base()
 
 
@@ -26,6 +183,118 @@ def get_db():
         db.close()
 
 
-def init_db():
-    """Initialize database tables"""
-    Base.metadata.create_all(bind=engine)
+async def get_async_db():
+    """Dependency for getting an async database session"""
+    if AsyncSessionLocal is None:
+        raise RuntimeError("Async database mode is disabled (set ASYNC_DB=true)")
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def _add_missing_columns(conn) -> None:
+    """Add columns declared after a table was created (create_all never alters tables)"""
+    inspector = inspect(conn)
+    quote = conn.dialect.identifier_preparer.quote
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            column_type = column.type.compile(dialect=conn.dialect)
+            conn.execute(text(f"ALTER TABLE {quote(table.name)} ADD COLUMN {quote(column.name)} {column_type}"))
+            # Timestamps added later start from the row's creation time
+            if column.name == "updated_at" and "created_at" in existing:
+                conn.execute(text(f"UPDATE {quote(table.name)} SET updated_at = created_at"))
+
+
+def schema_fingerprint(dialect=None) -> str:
+    """Digest of the DDL init_db would run: the schema version recorded in the database"""
+    # Imported here: app.search imports this module
+    from app.search import SEARCH_DDL
+
+    dialect = dialect or engine.dialect
+    digest = hashlib.sha256()
+    for table in Base.metadata.sorted_tables:
+        digest.update(str(CreateTable(table).compile(dialect=dialect)).encode())
+        for index in sorted(table.indexes, key=lambda index: index.name or ""):
+            digest.update(str(CreateIndex(index).compile(dialect=dialect)).encode())
+    if dialect.name == "sqlite":
+        for statement in SEARCH_DDL:
+            digest.update(statement.encode())
+    return digest.hexdigest()
+
+
+def _stored_fingerprint(conn) -> Optional[str]:
+    if not inspect(conn).has_table(SCHEMA_VERSION_TABLE):
+        return None
+    return conn.execute(text(f"SELECT fingerprint FROM {SCHEMA_VERSION_TABLE} WHERE id = 1")).scalar()
+
+
+def _read_fingerprint(conn) -> Optional[str]:
+    """Single-statement variant for the boot check: a missing table reads as no version"""
+    try:
+        return conn.execute(text(f"SELECT fingerprint FROM {SCHEMA_VERSION_TABLE} WHERE id = 1")).scalar()
+    except DBAPIError:
+        conn.rollback()
+        return None
+
+
+def reset_schema_version(conn) -> None:
+    """Make the next init_db run the full DDL pass (e.g. after dropping schema objects)"""
+    if inspect(conn).has_table(SCHEMA_VERSION_TABLE):
+        conn.execute(text(f"DELETE FROM {SCHEMA_VERSION_TABLE}"))
+
+
+def _apply_schema(conn, fingerprint: str) -> None:
+    from app.search import create_search_index
+
+    Base.metadata.create_all(bind=conn)
+    _add_missing_columns(conn)
+    # create_all skips existing tables entirely, so add indexes declared later on
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=conn, checkfirst=True)
+    create_search_index(conn)
+
+    conn.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {SCHEMA_VERSION_TABLE} "
+        "(id INTEGER PRIMARY KEY, fingerprint VARCHAR(64) NOT NULL, applied_at VARCHAR(32) NOT NULL)"
+    ))
+    conn.execute(text(f"DELETE FROM {SCHEMA_VERSION_TABLE}"))
+    conn.execute(
+        text(f"INSERT INTO {SCHEMA_VERSION_TABLE} (id, fingerprint, applied_at) VALUES (1, :fingerprint, :applied_at)"),
+        {"fingerprint": fingerprint, "applied_at": datetime.utcnow().isoformat(timespec="seconds")},
+    )
+
+
+def init_db(force: bool = False) -> bool:
+    """Create or upgrade the schema unless the recorded version is current.
+
+    Returns whether DDL ran. A worker whose database already carries the
+    current fingerprint costs one SELECT (a missing ``schema_version`` table
+    counts as no version). Otherwise, on SQLite, the check is repeated under
+    ``BEGIN IMMEDIATE`` so that workers booting together
+    apply the DDL once, one after the other, instead of racing each other.
+    """
+    fingerprint = schema_fingerprint()
+    with engine.connect() as conn:
+        if not force and _read_fingerprint(conn) == fingerprint:
+            return False
+
+        sqlite = conn.dialect.name == "sqlite"
+        if sqlite:
+            # Wait out another worker's DDL (and FTS backfill) rather than failing
+            conn.exec_driver_sql(f"PRAGMA busy_timeout={SCHEMA_LOCK_TIMEOUT_MS}")
+            conn.exec_driver_sql("BEGIN IMMEDIATE")
+        try:
+            if not force and _stored_fingerprint(conn) == fingerprint:
+                conn.rollback()
+                return False
+            _apply_schema(conn, fingerprint)
+            conn.commit()
+        finally:
+            if sqlite:
+                conn.exec_driver_sql(f"PRAGMA busy_timeout={SQLITE_PRAGMAS.get('busy_timeout', 5000)}")
+    return True
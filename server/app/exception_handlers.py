@@ -13,6 +13,11 @@ from app.logging_config import get_logger
 logger = get_logger(__name__)
 
 
+def _request_id(request: Request) -> str:
+    """Request ID assigned by RequestContextMiddleware (or sent by the client)"""
+    return getattr(request.state, "request_id", None) or request.headers.get("X-Request-ID", "unknown")
+
+
 def format_error_response(
     status_code: int,
     error_code: str,
@@ -37,7 +42,7 @@ async def bibliotheque_exception_handler(
     request: Request, exc: BibliothequeException
 ) -> JSONResponse:
     """Handle custom Bibliotheque exceptions"""
-    request_id = request.headers.get("X-Request-ID", "unknown")
+    request_id = _request_id(request)
 
     logger.warning(
         f"BibliothequeException: {exc.error_code} - {exc.message}",
@@ -60,6 +65,7 @@ async def bibliotheque_exception_handler(
             details=exc.details,
             request_id=request_id,
         ),
+        headers=exc.headers,
     )
 
 
@@ -67,7 +73,7 @@ async def validation_exception_handler(
     request: Request, exc: RequestValidationError
 ) -> JSONResponse:
     """Handle Pydantic validation errors"""
-    request_id = request.headers.get("X-Request-ID", "unknown")
+    request_id = _request_id(request)
 
     # Extract validation errors
     errors = []
@@ -105,7 +111,7 @@ async def generic_exception_handler(
     request: Request, exc: Exception
 ) -> JSONResponse:
     """Handle unexpected exceptions"""
-    request_id = request.headers.get("X-Request-ID", "unknown")
+    request_id = _request_id(request)
 
     logger.error(
         f"Unexpected exception: {type(exc).__name__}",
@@ -12,11 +12,13 @@ class BibliothequeException(Exception):
         status_code: int = 500,
         error_code: str = "INTERNAL_ERROR",
         details: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
     ):
         self.message = message
         self.status_code = status_code
         self.error_code = error_code
         self.details = details or {}
+        self.headers = headers
         super().__init__(self.message)
 
 
@@ -142,12 +144,14 @@ class RateLimitError(BibliothequeException):
         message: str = "Rate limit exceeded",
         error_code: str = "RATE_LIMIT_EXCEEDED",
         details: Optional[Dict[str, Any]] = None,
+        retry_after: Optional[int] = None,
     ):
         super().__init__(
             message=message,
             status_code=429,
             error_code=error_code,
             details=details,
+            headers={"Retry-After": str(retry_after)} if retry_after is not None else None,
         )
 
 
@@ -186,3 +190,24 @@ class ExternalServiceError(BibliothequeException):
             error_code=error_code,
             details=details,
         )
+
+
+class ServiceUnavailableError(BibliothequeException):
+    """503 Service Unavailable - Server is temporarily overloaded"""
+
+    def __init__(
+        self,
+        message: str = "Service temporarily unavailable",
+        error_code: str = "SERVICE_UNAVAILABLE",
+        retry_after: int = 1,
+        details: Optional[Dict[str, Any]] = None,
+    ):
+        if details is None:
+            details = {"retry_after": retry_after}
+        super().__init__(
+            message=message,
+            status_code=503,
+            error_code=error_code,
+            details=details,
+            headers={"Retry-After": str(retry_after)},
+        )
@@ -0,0 +1,194 @@
+"""Opt-in relationship expansion (``?include=``) and sparse fieldsets (``?fields=``).
+
+A ``View`` is parsed from the two query parameters and drives both halves of
+a response:
+
+- the SQL: included relationships get a ``selectinload`` (one ``IN`` query
+  per level), the others are never loaded, and a restricted fieldset becomes
+  ``load_only`` so unrequested columns are not even selected;
+- the JSON: a pydantic model holding only the requested fields is derived
+  from the full schema (and cached), so serialization never touches an
+  attribute that was not loaded.
+
+``include`` takes relationship paths (``books,books.authors``; a path implies
+its parents). ``fields`` takes field names of the top-level resource and
+dotted ones for included relationships (``id,email,books.title``); a level
+without any listed field keeps all of its fields. An empty ``include=``
+drops the default expansions.
+"""
+
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple, Type
+
+from fastapi import Query
+from pydantic import BaseModel, ConfigDict, TypeAdapter, create_model
+from sqlalchemy.orm import load_only, selectinload
+
+from app.exceptions import ValidationError
+from app.models import Author, Book, User
+from app.schemas import AuthorRead, BookRead, Token, UserRead
+
+
+@dataclass(frozen=True)
+class Resource:
+    """An ORM model, its response schema and the relationships it can expand"""
+    name: str
+    model: Any
+    schema: Type[BaseModel]
+    relations: Dict[str, "Resource"] = field(default_factory=dict, hash=False, compare=False)
+    # Columns loaded even when not requested (ETags, pagination cursors)
+    required: Tuple[str, ...] = ("id",)
+
+    @property
+    def scalar_fields(self) -> List[str]:
+        return [name for name in self.schema.model_fields if name not in self.relations]
+
+
+AUTHOR_RESOURCE = Resource("author", Author, AuthorRead, required=("id", "updated_at"))
+BOOK_RESOURCE = Resource(
+    "book", Book, BookRead, {"authors": AUTHOR_RESOURCE}, required=("id", "owner_id", "updated_at")
+)
+USER_RESOURCE = Resource("user", User, UserRead, {"books": BOOK_RESOURCE})
+
+
+@dataclass(frozen=True)
+class View:
+    """Fields and expanded relationships of one resource level"""
+    resource: Resource
+    fields: Optional[FrozenSet[str]] = None  # None: every scalar field
+    include: Tuple[Tuple[str, "View"], ...] = ()
+
+    def includes(self, relation: str) -> bool:
+        return any(name == relation for name, _ in self.include)
+
+    @property
+    def signature(self) -> str:
+        """Canonical text form, part of the ETag of a representation"""
+        fields = ",".join(sorted(self.fields)) if self.fields is not None else "*"
+        nested = "".join(f";{name}({view.signature})" for name, view in self.include)
+        return fields + nested
+
+    def _columns(self) -> List[Any]:
+        names = sorted(self.fields | set(self.resource.required))
+        return [getattr(self.resource.model, name) for name in names]
+
+    def loader_options(self) -> List[Any]:
+        """ORM options loading exactly what this view serializes"""
+        options = [load_only(*self._columns())] if self.fields is not None else []
+        for name, view in self.include:
+            loader = selectinload(getattr(self.resource.model, name))
+            nested = view.loader_options()
+            options.append(loader.options(*nested) if nested else loader)
+        return options
+
+    def adapter(self) -> TypeAdapter:
+        return _adapter(self, False)
+
+    def list_adapter(self) -> TypeAdapter:
+        return _adapter(self, True)
+
+    def token_adapter(self) -> TypeAdapter:
+        """Login response, whose ``user`` follows this view"""
+        return _token_adapter(self)
+
+
+@lru_cache(maxsize=256)
+def _schema(view: View) -> Type[BaseModel]:
+    source = view.resource.schema
+    names = [name for name in view.resource.scalar_fields if view.fields is None or name in view.fields]
+    definitions: Dict[str, Any] = {name: (source.model_fields[name].annotation, source.model_fields[name]) for name in names}
+    for name, nested in view.include:
+        definitions[name] = (List[_schema(nested)], [])
+    return create_model(
+        f"{source.__name__}View", __config__=ConfigDict(from_attributes=True), **definitions
+    )
+
+
+@lru_cache(maxsize=256)
+def _adapter(view: View, many: bool) -> TypeAdapter:
+    schema = _schema(view)
+    return TypeAdapter(List[schema] if many else schema)
+
+
+@lru_cache(maxsize=64)
+def _token_adapter(view: View) -> TypeAdapter:
+    return TypeAdapter(create_model("TokenView", __base__=Token, user=(_schema(view), ...)))
+
+
+def _split(value: str) -> List[str]:
+    return [part.strip() for part in value.split(",") if part.strip()]
+
+
+def _build(resource: Resource, prefix: str, includes: set, fields: Optional[Dict[str, set]]) -> View:
+    selected = None if fields is None or prefix not in fields else frozenset(fields[prefix])
+    nested = []
+    for name, related in sorted(resource.relations.items()):
+        path = f"{prefix}.{name}" if prefix else name
+        if path in includes:
+            nested.append((name, _build(related, path, includes, fields)))
+    return View(resource, selected, tuple(nested))
+
+
+def parse_view(resource: Resource, include: Optional[str], fields: Optional[str], default_include: Tuple[str, ...] = ()) -> View:
+    """Validate ``include`` / ``fields`` against ``resource`` and build its view"""
+    includes = set()
+    for path in (_split(include) if include is not None else default_include):
+        current = resource
+        parts = path.split(".")
+        for depth, part in enumerate(parts):
+            if part not in current.relations:
+                raise ValidationError(
+                    message=f"Unknown relationship in include: {path}",
+                    error_code="INVALID_INCLUDE",
+                    details={"include": path, "allowed": sorted(_relation_paths(resource))},
+                )
+            current = current.relations[part]
+            includes.add(".".join(parts[:depth + 1]))
+
+    selected: Optional[Dict[str, set]] = None
+    if fields is not None:
+        selected = {}
+        for path in _split(fields):
+            prefix, _, name = path.rpartition(".")
+            current = _resolve(resource, prefix) if not prefix or prefix in includes else None
+            if current is None or name not in current.scalar_fields:
+                raise ValidationError(
+                    message=f"Unknown or not included field: {path}",
+                    error_code="INVALID_FIELDS",
+                    details={"field": path},
+                )
+            selected.setdefault(prefix, set()).add(name)
+
+    return _build(resource, "", includes, selected)
+
+
+def _resolve(resource: Resource, path: str) -> Resource:
+    for part in filter(None, path.split(".")):
+        resource = resource.relations[part]
+    return resource
+
+
+def _relation_paths(resource: Resource, prefix: str = "") -> List[str]:
+    paths = []
+    for name, related in resource.relations.items():
+        path = f"{prefix}.{name}" if prefix else name
+        paths += [path, *_relation_paths(related, path)]
+    return paths
+
+
+def view_dependency(resource: Resource, default_include: Tuple[str, ...] = ()):
+    """FastAPI dependency parsing ``include`` and ``fields`` for ``resource``"""
+    def dependency(
+        include: Optional[str] = Query(
+            None, description=f"Relationships to expand, from: {', '.join(_relation_paths(resource))}"
+        ),
+        fields: Optional[str] = Query(None, description="Comma-separated fields to return (dotted for relationships)"),
+    ) -> View:
+        return parse_view(resource, include, fields, default_include)
+    return dependency
+
+
+# Users embed nothing unless asked; books keep their authors by default
+user_view = view_dependency(USER_RESOURCE)
+book_view = view_dependency(BOOK_RESOURCE, default_include=("authors",))
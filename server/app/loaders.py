@@ -0,0 +1,18 @@
+"""Eager-loading strategies for read endpoints.
+
+Response schemas nest relationships (``BookRead.authors``, ``UserRead.books``),
+and Pydantic reads them attribute by attribute while serializing. Without an
+explicit strategy each access lazy-loads on its own, so a page of N books
+costs N + 1 queries. ``selectinload`` fetches each relationship level with a
+single ``IN`` query instead, and keeps row counts flat (unlike ``joinedload``,
+which would multiply book rows by their authors).
+"""
+
+from sqlalchemy.orm import selectinload
+
+from app.models import Book
+
+# GET /api/books/, GET /api/books/{id}, and book write responses
+BOOK_READ_OPTIONS = (selectinload(Book.authors),)
+
+# User payloads only nest what ``?include=`` asks for, see app.fieldsets
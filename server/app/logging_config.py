@@ -3,11 +3,20 @@
 from __future__ import annotations
 
 import logging
+import logging.handlers
 import os
+import queue
+import random
 import sys
 import json
+import threading
 from datetime import datetime
 
+try:  # optional, faster JSON encoder
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
 
 RESET = "\033[0m"
 COLORS = {
@@ -29,7 +38,7 @@ class MinimalConsoleFormatter(logging.Formatter):
         self.include_source = include_source
 
     def format(self, record: logging.LogRecord) -> str:
-        ts = datetime.utcnow().strftime("%H:%M:%S")
+        ts = datetime.utcfromtimestamp(record.created).strftime("%H:%M:%S")
         level = record.levelname
         logger_name = record.name
         message = record.getMessage()
@@ -78,7 +87,8 @@ class JsonLogFormatter(logging.Formatter):
 
     def format(self, record: logging.LogRecord) -> str:
         payload = {
-            "timestamp": datetime.utcnow().isoformat(),
+            # Emission time, not write time (they differ with the queue pipeline)
+            "timestamp": datetime.utcfromtimestamp(record.created).isoformat(),
             "level": record.levelname,
             "logger": record.name,
             "message": record.getMessage(),
@@ -97,7 +107,85 @@ class JsonLogFormatter(logging.Formatter):
                 "message": str(record.exc_info[1]) if record.exc_info[1] else None,
             }
 
-        return json.dumps(payload, ensure_ascii=True)
+        return _dumps(payload)
+
+
+def _dumps(payload: dict) -> str:
+    if orjson is not None:
+        return orjson.dumps(payload, default=str).decode()
+    return json.dumps(payload, ensure_ascii=True, default=str)
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops records instead of blocking when the queue is full."""
+
+    def __init__(self, log_queue: queue.Queue) -> None:
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Only merge args into the message; formatting happens on the listener
+        # thread, and exc_info is kept for the formatters.
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class SamplingFilter(logging.Filter):
+    """Keep only a fraction of INFO-and-below records from high-volume loggers.
+
+    ``rates`` maps a logger name (prefix match on dotted names) to the
+    fraction of records kept, e.g. ``{"app.middleware": 0.1}``. Warnings and
+    errors always pass.
+    """
+
+    def __init__(self, rates: dict[str, float]) -> None:
+        super().__init__()
+        self.rates = rates
+        self.sampled_out = 0
+
+    def _rate_for(self, name: str) -> float | None:
+        while name:
+            if name in self.rates:
+                return self.rates[name]
+            name = name.rpartition(".")[0]
+        return None
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.INFO:
+            return True
+        rate = self._rate_for(record.name)
+        if rate is None or random.random() < rate:
+            return True
+        self.sampled_out += 1
+        return False
+
+
+_listener: logging.handlers.QueueListener | None = None
+_queue_handler: DroppingQueueHandler | None = None
+_sampling_filter: SamplingFilter | None = None
+_listener_lock = threading.Lock()
+
+
+def _parse_sample_rates(raw: str | None) -> dict[str, float]:
+    """Parse ``name=rate,name=rate`` (as in LOG_SAMPLE_RATES)."""
+    rates: dict[str, float] = {}
+    for chunk in (raw or "").split(","):
+        name, sep, value = chunk.partition("=")
+        if not sep:
+            continue
+        try:
+            rates[name.strip()] = min(1.0, max(0.0, float(value)))
+        except ValueError:
+            continue
+    return rates
 
 
 def _resolve_log_mode(mode: str | None) -> str:
@@ -120,18 +208,42 @@ def _resolve_level(log_mode: str, log_level: str | None) -> int:
     return defaults[log_mode]
 
 
-def setup_logging(log_level: str | None = None, log_mode: str | None = None) -> None:
-    """Configure app logging once, with profile-based output style."""
+def setup_logging(
+    log_level: str | None = None,
+    log_mode: str | None = None,
+    async_mode: bool | None = None,
+    queue_size: int | None = None,
+    sample_rates: dict[str, float] | None = None,
+) -> None:
+    """Configure app logging once, with profile-based output style.
+
+    With ``async_mode`` (LOG_ASYNC=true) records are put on a bounded queue and
+    written by a background QueueListener, so request handlers never block on
+    formatting or stdout; records are dropped (and counted) when the queue is
+    full. ``sample_rates`` (LOG_SAMPLE_RATES) thins out INFO lines of chatty
+    loggers such as the access log.
+    """
+    global _listener, _queue_handler, _sampling_filter
+
     resolved_mode = _resolve_log_mode(log_mode or os.getenv("LOG_MODE"))
     resolved_level = _resolve_level(resolved_mode, log_level or os.getenv("LOG_LEVEL"))
     include_source = resolved_mode == "DEBUG"
     use_color = resolved_mode in {"DEBUG", "DEV"}
+    if async_mode is None:
+        async_mode = os.getenv("LOG_ASYNC", "false").lower() == "true"
+    if queue_size is None:
+        queue_size = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+    if sample_rates is None:
+        sample_rates = _parse_sample_rates(os.getenv("LOG_SAMPLE_RATES"))
 
     root_logger = logging.getLogger()
     root_logger.setLevel(resolved_level)
 
     # Idempotent setup: avoid duplicate handlers when reload/import cycles happen.
+    shutdown_logging()
     root_logger.handlers.clear()
+    _queue_handler = None
+    _sampling_filter = None
 
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setLevel(resolved_level)
@@ -141,7 +253,23 @@ def setup_logging(log_level: str | None = None, log_mode: str | None = None) ->
         console_handler.setFormatter(
             MinimalConsoleFormatter(use_color=use_color, include_source=include_source)
         )
-    root_logger.addHandler(console_handler)
+
+    root_handler: logging.Handler = console_handler
+    if async_mode:
+        _queue_handler = DroppingQueueHandler(queue.Queue(maxsize=queue_size))
+        _queue_handler.setLevel(resolved_level)
+        with _listener_lock:
+            _listener = logging.handlers.QueueListener(
+                _queue_handler.queue, console_handler, respect_handler_level=True
+            )
+            _listener.start()
+        root_handler = _queue_handler
+
+    if sample_rates:
+        _sampling_filter = SamplingFilter(sample_rates)
+        root_handler.addFilter(_sampling_filter)
+
+    root_logger.addHandler(root_handler)
 
     # Let third-party loggers propagate to root without adding their own duplicates.
     for logger_name in (
@@ -164,6 +292,50 @@ def setup_logging(log_level: str | None = None, log_mode: str | None = None) ->
     )
 
 
+def _stop_listener(listener: logging.handlers.QueueListener) -> None:
+    while True:
+        try:
+            # Puts the stop marker with put_nowait, then waits for the thread
+            listener.stop()
+            return
+        except queue.Full:
+            # Free a slot by writing one queued record from this thread
+            try:
+                listener.handle(listener.queue.get_nowait())
+            except queue.Empty:
+                pass
+
+
+def shutdown_logging() -> None:
+    """Stop the queue listener, flushing records still queued (lifespan shutdown).
+
+    The root logger then writes to the console handler directly, so records
+    logged later during shutdown are not dropped.
+    """
+    global _listener
+    with _listener_lock:
+        listener, _listener = _listener, None
+    if listener is None:
+        return
+    _stop_listener(listener)
+    root_logger = logging.getLogger()
+    if _queue_handler is not None and _queue_handler in root_logger.handlers:
+        root_logger.removeHandler(_queue_handler)
+        for handler in listener.handlers:
+            for log_filter in _queue_handler.filters:
+                handler.addFilter(log_filter)
+            root_logger.addHandler(handler)
+
+
+def get_logging_stats() -> dict[str, int]:
+    """Counters for the queue pipeline and sampling."""
+    return {
+        "dropped": _queue_handler.dropped if _queue_handler else 0,
+        "queued": _queue_handler.queue.qsize() if _queue_handler else 0,
+        "sampled_out": _sampling_filter.sampled_out if _sampling_filter else 0,
+    }
+
+
 def get_logger(name: str) -> logging.Logger:
     """Get logger configured by setup_logging."""
     return logging.getLogger(name)
@@ -0,0 +1,463 @@
+"""Process metrics in the Prometheus text format (``GET /metrics``).
+
+A small in-process registry (counters, gauges, histograms) with no
+dependency beyond the standard library:
+
+- HTTP: per-route latency histogram, request counts by status code and
+  in-flight requests (recorded by ``RequestContextMiddleware``);
+- database: statement count and time (cursor events), connections opened,
+  checkouts, connections in use and how long they are held (pool events,
+  see ``instrument_engine``);
+- password hashing: time spent per bcrypt job, queueing included;
+- callback metrics sampled at collection time (cache hit counts, hashing
+  backlog), registered by ``main``.
+
+With several uvicorn workers each process only sees its own traffic. When
+``METRICS_MULTIPROC_DIR`` is set, every worker writes a snapshot of its
+metrics to ``<dir>/<pid>.json`` (every ``METRICS_FLUSH_INTERVAL_SECONDS``
+and at shutdown) and a scrape merges all snapshots: counters and histograms
+are summed, including those of workers that have exited, while gauges only
+count live processes. Snapshots of exited workers are folded into
+``exited-<id>.json`` files when a worker starts or stops (see
+``Registry.fold_exited``), so a reused pid never overwrites them and the
+summed counters never go down. Empty the directory to reset the counters.
+"""
+
+import json
+import os
+import threading
+import time
+import uuid
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+METRICS_MULTIPROC_DIR = os.getenv("METRICS_MULTIPROC_DIR") or None
+METRICS_FLUSH_INTERVAL_SECONDS = float(os.getenv("METRICS_FLUSH_INTERVAL_SECONDS", "5"))
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SQL_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+POOL_HOLD_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+HASHING_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Labels = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Labels, Any] = {}
+        self._lock = threading.Lock()
+
+    def snapshot(self) -> Dict[Labels, Any]:
+        with self._lock:
+            return {labels: self._copy(value) for labels, value in self._values.items()}
+
+    @staticmethod
+    def _copy(value: Any) -> Any:
+        return value
+
+    @staticmethod
+    def merge(current: Any, other: Any) -> Any:
+        return current + other
+
+    def samples(self, values: Dict[Labels, Any]) -> Iterable[str]:
+        for labels, value in sorted(values.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+
+class Gauge(Metric):
+    """Gauge summed over live processes"""
+    kind = "gauge"
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def dec(self, *labels: str, amount: float = 1.0) -> None:
+        self.inc(*labels, amount=-amount)
+
+    def set(self, value: float, *labels: str) -> None:
+        with self._lock:
+            self._values[labels] = value
+
+
+class Histogram(Metric):
+    """Cumulative buckets plus ``_sum`` and ``_count``; values are ``[bucket counts..., sum]``"""
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets) + (float("inf"),)
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._values.get(labels)
+            if counts is None:
+                counts = self._values[labels] = [0] * len(self.buckets) + [0.0]
+            counts[index] += 1
+            counts[-1] += value
+
+    @staticmethod
+    def _copy(value: List[float]) -> List[float]:
+        return list(value)
+
+    @staticmethod
+    def merge(current: List[float], other: List[float]) -> List[float]:
+        return [a + b for a, b in zip(current, other)]
+
+    def samples(self, values: Dict[Labels, Any]) -> Iterable[str]:
+        for labels, counts in sorted(values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}"
+            base = _format_labels(self.labelnames, labels)
+            yield f"{self.name}_sum{base} {_format_value(counts[-1])}"
+            yield f"{self.name}_count{base} {cumulative}"
+
+
+class CallbackMetric(Metric):
+    """Counter or gauge whose value is read from ``function`` at collection time"""
+
+    def __init__(self, name: str, documentation: str, kind: str, function: Callable[[], float]) -> None:
+        super().__init__(name, documentation)
+        self.kind = kind
+        self.function = function
+
+    def snapshot(self) -> Dict[Labels, Any]:
+        try:
+            return {(): float(self.function())}
+        except Exception:
+            logger.warning(f"Metric callback {self.name} failed", exc_info=True)
+            return {}
+
+
+class Registry:
+    def __init__(self, multiproc_dir: Optional[str] = METRICS_MULTIPROC_DIR) -> None:
+        self.multiproc_dir = multiproc_dir
+        self._metrics: Dict[str, Metric] = {}
+        self._flusher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._flushed = False
+
+    def register(self, metric: Metric) -> Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def callback(self, name: str, documentation: str, function: Callable[[], float], kind: str = "gauge") -> None:
+        self.register(CallbackMetric(name, documentation, kind, function))
+
+    def snapshot(self) -> Dict[str, Dict[Labels, Any]]:
+        return {name: metric.snapshot() for name, metric in self._metrics.items()}
+
+    # ---- multiprocess aggregation ----
+
+    def _snapshot_path(self, pid: int) -> str:
+        return os.path.join(self.multiproc_dir, f"{pid}.json")
+
+    def _write_snapshot(self, path: str, data: Dict[str, Any]) -> None:
+        os.makedirs(self.multiproc_dir, exist_ok=True)
+        with open(f"{path}.tmp", "w") as snapshot_file:
+            json.dump(data, snapshot_file)
+        os.replace(f"{path}.tmp", path)
+
+    def flush(self) -> None:
+        """Write this process' snapshot for the other workers' scrapes"""
+        if not self.multiproc_dir:
+            return
+        data = {name: [[list(labels), value] for labels, value in values.items()] for name, values in self.snapshot().items()}
+        path = self._snapshot_path(os.getpid())
+        try:
+            self._write_snapshot(path, data)
+            self._flushed = True
+        except OSError:
+            logger.warning(f"Could not write metrics snapshot {path}", exc_info=True)
+
+    def _snapshot_files(self) -> Iterable[Tuple[str, Optional[int]]]:
+        """(filename, pid) of the snapshots in the directory; pid is None for folded files"""
+        # Anything but a "<pid>.json" or "exited-<id>.json" (stray copies,
+        # temporary or claimed files) is skipped
+        for filename in os.listdir(self.multiproc_dir):
+            name, extension = os.path.splitext(filename)
+            if extension != ".json":
+                continue
+            if name.isdigit():
+                yield filename, int(name)
+            elif name.startswith(EXITED_PREFIX):
+                yield filename, None
+
+    @staticmethod
+    def _load(path: str) -> Optional[Dict[str, Any]]:
+        # Half-written or corrupt files cannot break a scrape
+        try:
+            with open(path) as snapshot_file:
+                data = json.load(snapshot_file)
+        except (OSError, ValueError):
+            return None
+        return data if _is_snapshot(data) else None
+
+    def _other_snapshots(self) -> Iterable[Tuple[bool, Dict[str, Any]]]:
+        for filename, pid in self._snapshot_files():
+            if pid == os.getpid():
+                continue
+            data = self._load(os.path.join(self.multiproc_dir, filename))
+            if data is not None:
+                yield pid is not None and _is_alive(pid), data
+
+    def fold_exited(self) -> None:
+        """Merge the snapshots of exited workers (and earlier folded files) into one new file.
+
+        Until this process has flushed, a snapshot under its own pid belongs
+        to an exited worker whose pid was reused. Each file is claimed by
+        renaming it first, so concurrent folds never count a snapshot twice.
+        Gauges are dropped.
+        """
+        if not self.multiproc_dir or not os.path.isdir(self.multiproc_dir):
+            return
+        own_pid = os.getpid()
+        exited = [
+            (filename, pid) for filename, pid in self._snapshot_files()
+            if pid is None or (pid == own_pid and not self._flushed) or (pid != own_pid and not _is_alive(pid))
+        ]
+        if all(pid is None for _, pid in exited):
+            return
+        claimed: List[str] = []
+        merged: Dict[str, Dict[Labels, Any]] = {}
+        for filename, pid in exited:
+            path = os.path.join(self.multiproc_dir, filename)
+            claim = f"{path}.{own_pid}.claim"
+            try:
+                os.rename(path, claim)
+            except OSError:
+                continue  # claimed by another worker
+            claimed.append(claim)
+            self._merge(merged, self._load(claim) or {}, alive=False)
+        if not claimed:
+            return
+        path = os.path.join(self.multiproc_dir, f"{EXITED_PREFIX}{uuid.uuid4().hex}.json")
+        data = {name: [[list(labels), value] for labels, value in values.items()] for name, values in merged.items()}
+        try:
+            self._write_snapshot(path, data)
+        except OSError:
+            logger.warning(f"Could not write metrics snapshot {path}", exc_info=True)
+            return
+        for claim in claimed:
+            try:
+                os.remove(claim)
+            except OSError:
+                pass
+
+    def collect(self) -> Dict[str, Dict[Labels, Any]]:
+        merged = self.snapshot()
+        if not self.multiproc_dir or not os.path.isdir(self.multiproc_dir):
+            return merged
+        for alive, data in self._other_snapshots():
+            self._merge(merged, data, alive)
+        return merged
+
+    def _merge(self, merged: Dict[str, Dict[Labels, Any]], data: Dict[str, Any], alive: bool) -> None:
+        """Add a snapshot to ``merged``; gauges only count for live processes"""
+        for name, values in data.items():
+            metric = self._metrics.get(name)
+            if metric is None or (metric.kind == "gauge" and not alive):
+                continue
+            target = merged.setdefault(name, {})
+            for labels, value in values:
+                labels = tuple(labels)
+                target[labels] = metric.merge(target[labels], value) if labels in target else value
+
+    def render(self) -> str:
+        self.flush()
+        values = self.collect()
+        lines: List[str] = []
+        for name, metric in self._metrics.items():
+            lines.append(f"# HELP {name} {metric.documentation}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            lines.extend(metric.samples(values.get(name, {})))
+        return "\n".join(lines) + "\n"
+
+    # ---- background flushing ----
+
+    def start(self) -> None:
+        if not self.multiproc_dir or self._flusher is not None:
+            return
+        self.fold_exited()
+        self._stop.clear()
+        self._flusher = threading.Thread(target=self._flush_loop, name="metrics-flush", daemon=True)
+        self._flusher.start()
+
+    def _flush_loop(self) -> None:
+        while not self._stop.wait(METRICS_FLUSH_INTERVAL_SECONDS):
+            self.flush()
+
+    def shutdown(self) -> None:
+        self._stop.set()
+        if self._flusher is not None:
+            self._flusher.join(timeout=1)
+            self._flusher = None
+        self.flush()
+        self.fold_exited()
+
+
+EXITED_PREFIX = "exited-"
+
+
+def _is_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _is_snapshot(data: Any) -> bool:
+    """Shape written by ``Registry.flush``: {metric: [[labels, value], ...]}"""
+    return isinstance(data, dict) and all(
+        isinstance(values, list)
+        and all(isinstance(entry, list) and len(entry) == 2 and isinstance(entry[0], list) for entry in values)
+        for values in data.values()
+    )
+
+
+registry = Registry()
+
+REQUESTS = registry.counter(
+    "http_requests_total", "HTTP requests by method, route template and status code", ("method", "route", "status")
+)
+REQUEST_DURATION = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency by method and route template", ("method", "route")
+)
+REQUESTS_IN_PROGRESS = registry.gauge("http_requests_in_progress", "HTTP requests being served", ("method",))
+DB_STATEMENTS = registry.counter("db_statements_total", "SQL statements executed, by leading keyword", ("operation",))
+DB_STATEMENT_DURATION = registry.histogram(
+    "db_statement_duration_seconds", "SQL statement execution time", ("operation",), SQL_BUCKETS
+)
+DB_POOL_CONNECTIONS_OPENED = registry.counter(
+    "db_pool_connections_opened_total", "New DBAPI connections opened by the pool"
+)
+DB_POOL_CHECKOUTS = registry.counter("db_pool_checkouts_total", "Connections checked out of the pool")
+DB_POOL_CHECKED_OUT = registry.gauge("db_pool_checked_out", "Pooled connections currently in use")
+DB_POOL_HOLD_DURATION = registry.histogram(
+    "db_pool_connection_hold_seconds", "Time a connection stays checked out, from checkout to checkin",
+    (), POOL_HOLD_BUCKETS
+)
+PASSWORD_HASH_DURATION = registry.histogram(
+    "password_hash_duration_seconds", "bcrypt job time as seen by the request, queueing included",
+    ("operation",), HASHING_BUCKETS
+)
+AUTH_RATE_LIMIT_DECISIONS = registry.counter(
+    "auth_rate_limit_decisions_total", "Register/login admission decisions (admitted, rejected_ip, rejected_email)",
+    ("endpoint", "decision")
+)
+
+
+def route_label(scope: Dict[str, Any]) -> str:
+    """Route template (``/api/books/{book_id}``), keeping label cardinality bounded"""
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+def observe_request(method: str, route: str, status_code: int, duration: float) -> None:
+    REQUESTS.inc(method, route, str(status_code))
+    REQUEST_DURATION.observe(duration, method, route)
+
+
+def _operation(statement: str) -> str:
+    keyword = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else ""
+    return keyword if keyword in {"SELECT", "INSERT", "UPDATE", "DELETE", "WITH", "PRAGMA"} else "OTHER"
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Count and time SQL statements and pooled connection use of ``engine``"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context._metrics_start = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        start = getattr(context, "_metrics_start", None)
+        if start is None:
+            return
+        operation = _operation(statement)
+        DB_STATEMENTS.inc(operation)
+        DB_STATEMENT_DURATION.observe(time.perf_counter() - start, operation)
+
+    # The pool has no "before checkout" event, so the wait for a connection
+    # is not timed: pool saturation shows as db_pool_checked_out reaching
+    # pool_size + max_overflow, and long holds in the hold-time histogram
+    @event.listens_for(engine, "connect")
+    def _connect(dbapi_connection, connection_record):
+        DB_POOL_CONNECTIONS_OPENED.inc()
+
+    @event.listens_for(engine, "checkout")
+    def _checkout(dbapi_connection, connection_record, connection_proxy):
+        connection_record.info["_metrics_checkout"] = time.perf_counter()
+        DB_POOL_CHECKOUTS.inc()
+        DB_POOL_CHECKED_OUT.inc()
+
+    def _release(connection_record) -> None:
+        start = connection_record.info.pop("_metrics_checkout", None)
+        if start is not None:
+            DB_POOL_CHECKED_OUT.dec()
+            DB_POOL_HOLD_DURATION.observe(time.perf_counter() - start)
+
+    @event.listens_for(engine, "checkin")
+    def _checkin(dbapi_connection, connection_record):
+        _release(connection_record)
+
+    @event.listens_for(engine, "detach")
+    def _detach(dbapi_connection, connection_record):
+        _release(connection_record)
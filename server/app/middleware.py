@@ -2,71 +2,90 @@
 
 import time
 import uuid
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.responses import Response
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from app.logging_config import get_logger
+from app.metrics import METRICS_ENABLED, REQUESTS_IN_PROGRESS, observe_request, route_label
+from app.sql_profiler import SQL_PROFILER_HEADERS, RequestProfile, current_profile
 
 logger = get_logger(__name__)
 
 
-class RequestIDMiddleware(BaseHTTPMiddleware):
-    """Add request ID to all requests and responses"""
-
-    async def dispatch(self, request: Request, call_next) -> Response:
-        # Generate or get request ID
-        request_id = request.headers.get("X-Request-ID") or str(uuid.uuid4())
-        request.state.request_id = request_id
-
-        # Add request ID to response
-        response = await call_next(request)
-        response.headers["X-Request-ID"] = request_id
-        return response
-
-
-class LoggingMiddleware(BaseHTTPMiddleware):
-    """Log all requests and responses"""
-
-    async def dispatch(self, request: Request, call_next) -> Response:
-        # Start timer
-        start_time = time.time()
-        request_id = getattr(request.state, "request_id", "unknown")
-
-        # Get request body (for logging POST/PUT requests)
-        body = await request.body() if request.method in ["POST", "PUT", "PATCH"] else None
-
-        # Call next middleware/handler
-        response = await call_next(request)
-
-        # Calculate processing time
-        process_time = time.time() - start_time
-
-        # Log the request/response
-        logger.info(
-            f"{request.method} {request.url.path}",
-            extra={'extra_data': {
-                'request_id': request_id,
-                'method': request.method,
-                'path': request.url.path,
-                'status_code': response.status_code,
-                'process_time_seconds': round(process_time, 3),
-                'client_ip': request.client.host if request.client else None,
-            }}
-        )
-
-        # Add processing time header
-        response.headers["X-Process-Time"] = str(process_time)
-        return response
-
-
-class CorrelationIDMiddleware(BaseHTTPMiddleware):
-    """Tracking middleware for correlating related requests"""
-
-    async def dispatch(self, request: Request, call_next) -> Response:
-        # Get or create correlation ID for tracing request chains
-        correlation_id = request.headers.get("X-Correlation-ID") or str(uuid.uuid4())
-        request.state.correlation_id = correlation_id
-
-        response = await call_next(request)
-        response.headers["X-Correlation-ID"] = correlation_id
-        return response
+class RequestContextMiddleware:
+    """Pure ASGI middleware for request tracking and access logging.
+
+    Replaces the former RequestIDMiddleware, LoggingMiddleware and
+    CorrelationIDMiddleware (all BaseHTTPMiddleware) with a single layer that
+    never wraps the request/response streams or reads the body:
+
+    - assigns a request ID and a correlation ID (reusing the incoming
+      ``X-Request-ID`` / ``X-Correlation-ID`` headers when present), exposed
+      as ``request.state.request_id`` / ``request.state.correlation_id``
+    - adds both IDs and ``X-Process-Time`` (time to response start) to the
+      response headers
+    - profiles the request's SQL (``app.sql_profiler``): totals in the access
+      line, and ``X-DB-Queries`` / ``X-DB-Time`` headers in debug mode
+    - logs one access line per request once the response has been sent
+    - records the request in ``app.metrics`` (latency, status, in-flight)
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter()
+        headers = Headers(scope=scope)
+        request_id = headers.get("x-request-id") or str(uuid.uuid4())
+        correlation_id = headers.get("x-correlation-id") or str(uuid.uuid4())
+
+        state = scope.setdefault("state", {})
+        state["request_id"] = request_id
+        state["correlation_id"] = correlation_id
+
+        status_code = 500
+        profile = RequestProfile(request_id)
+        profile_token = current_profile.set(profile)
+
+        async def send_with_headers(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                response_headers = MutableHeaders(scope=message)
+                response_headers["X-Request-ID"] = request_id
+                response_headers["X-Correlation-ID"] = correlation_id
+                response_headers["X-Process-Time"] = str(time.perf_counter() - start_time)
+                if SQL_PROFILER_HEADERS:
+                    for name, value in profile.headers():
+                        response_headers[name] = value
+            await send(message)
+
+        method = scope["method"]
+        if METRICS_ENABLED:
+            REQUESTS_IN_PROGRESS.inc(method)
+        try:
+            await self.app(scope, receive, send_with_headers)
+        finally:
+            process_time = time.perf_counter() - start_time
+            current_profile.reset(profile_token)
+            if METRICS_ENABLED:
+                REQUESTS_IN_PROGRESS.dec(method)
+                observe_request(method, route_label(scope), status_code, process_time)
+            client = scope.get("client")
+            logger.info(
+                f"{scope['method']} {scope['path']}",
+                extra={'extra_data': {
+                    'request_id': request_id,
+                    'correlation_id': correlation_id,
+                    'method': scope["method"],
+                    'path': scope["path"],
+                    'status_code': status_code,
+                    'process_time_seconds': round(process_time, 3),
+                    'db_queries': profile.queries,
+                    'db_time_ms': profile.milliseconds,
+                    'client_ip': client[0] if client else None,
+                }}
+            )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Table, UniqueConstraint
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index, Table, UniqueConstraint
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.database import Base
@@ -8,7 +8,10 @@ book_author_association = Table(
     'book_author',
     Base.metadata,
     Column('book_id', Integer, ForeignKey('books.id', ondelete='CASCADE')),
-    Column('author_id', Integer, ForeignKey('authors.id', ondelete='CASCADE'))
+    Column('author_id', Integer, ForeignKey('authors.id', ondelete='CASCADE')),
+    # Lookups go both ways: a book's authors, and an author's books
+    Index('ix_book_author_book_id', 'book_id', 'author_id'),
+    Index('ix_book_author_author_id', 'author_id', 'book_id'),
 )
 
 
@@ -33,6 +36,7 @@ class Author(Base):
     name = Column(String(255), nullable=False, index=True)
     biography = Column(Text, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     books = relationship(
         "Book",
@@ -40,6 +44,11 @@ class Author(Base):
         back_populates="authors"
     )
 
+    __table_args__ = (
+        # Keyset pagination order for list_authors
+        Index("ix_authors_name_id", "name", "id"),
+    )
+
 
 class Book(Base):
     __tablename__ = "books"
@@ -60,6 +69,11 @@ class Book(Base):
         back_populates="books"
     )
 
+    __table_args__ = (
+        # Keyset pagination order for list_books (also serves owner_id lookups)
+        Index("ix_books_owner_id_id", "owner_id", "id"),
+    )
+
 
 class Preference(Base):
     __tablename__ = "preferences"
@@ -0,0 +1,50 @@
+"""Opaque keyset (cursor) pagination helpers.
+
+A cursor is the sort key of the last row of a page, JSON-encoded and then
+base64url-encoded so clients treat it as an opaque token. The next page is
+fetched with ``WHERE (sort key) > (cursor)``, which an index on the sort key
+serves directly instead of scanning and discarding ``skip`` rows.
+"""
+
+import base64
+import json
+from typing import Any, Optional, Sequence, Tuple
+
+from app.exceptions import ValidationError
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(*values: Any) -> str:
+    """Encode a row's sort key as an opaque cursor"""
+    raw = json.dumps(list(values), separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, types: Sequence[type]) -> Tuple[Any, ...]:
+    """Decode a cursor produced by encode_cursor, checking its shape"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        values = None
+
+    if (
+        not isinstance(values, list)
+        or len(values) != len(types)
+        or not all(type(v) is t for v, t in zip(values, types))
+    ):
+        raise ValidationError(
+            message="Invalid pagination cursor",
+            error_code="INVALID_CURSOR",
+            details={"cursor": cursor},
+        )
+    return tuple(values)
+
+
+def next_cursor(rows: Sequence[Any], limit: int, *attrs: str) -> Optional[str]:
+    """Cursor for the page after ``rows``, or None when this page is the last"""
+    if limit <= 0 or len(rows) < limit:
+        return None
+    last = rows[-1]
+    return encode_cursor(*(getattr(last, attr) for attr in attrs))
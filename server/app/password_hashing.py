@@ -0,0 +1,126 @@
+"""Password hashing off the request path.
+
+bcrypt is deliberately slow (~250ms at the default cost). Running it inline
+ties up an anyio threadpool thread per login and makes cheap requests queue
+behind it, so hashing is sent to a dedicated process pool instead. The pool
+has a bounded backlog: once ``PASSWORD_HASH_MAX_PENDING`` jobs are pending,
+new ones are refused with a 503 so callers back off (``Retry-After``).
+
+The pool uses the spawn start method, so each worker process imports this
+module (which only depends on the standard library, and on passlib from the
+first hash) and also re-imports the parent's ``__main__``: uvicorn's entry
+point under ``uvicorn main:app``, or all of main.py when it is run directly.
+That is why main.py starts the server only under ``if __name__ ==
+"__main__"``; importing it in a worker builds the app but does not serve it.
+passlib is imported on the first hash: the API process never needs it unless
+hashing runs inline.
+"""
+
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor
+from functools import lru_cache
+from typing import Optional, Tuple
+
+# bcrypt cost factor; stored hashes with a different cost are upgraded on login
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+# 0 keeps hashing in the anyio threadpool (previous behaviour)
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "32"))
+PASSWORD_HASH_RETRY_AFTER = int(os.getenv("PASSWORD_HASH_RETRY_AFTER", "1"))
+# Scheduling niceness of pool workers, so request handling wins the CPU
+PASSWORD_HASH_NICE = int(os.getenv("PASSWORD_HASH_NICE", "10"))
+
+
+@lru_cache(maxsize=None)
+def get_pwd_context():
+    """The passlib context, built on first use"""
+    from passlib.context import CryptContext
+
+    return CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
+
+
+def hash_password(password: str) -> str:
+    """Hash a password using bcrypt"""
+    return get_pwd_context().hash(password)
+
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password against its hash"""
+    return get_pwd_context().verify(plain_password, hashed_password)
+
+
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verify a password and return a replacement hash if its cost is outdated"""
+    return get_pwd_context().verify_and_update(plain_password, hashed_password)
+
+
+def _init_worker(niceness: int) -> None:
+    if niceness and hasattr(os, "nice"):
+        os.nice(niceness)
+
+
+class HashingOverloaded(Exception):
+    """Raised when the hashing backlog is full"""
+
+
+class PasswordHasher:
+    """Runs bcrypt jobs on a process pool with a bounded number of pending jobs"""
+
+    def __init__(self, workers: int, max_pending: int) -> None:
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.rejected = 0
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def _get_executor(self) -> Optional[Executor]:
+        if self.workers <= 0:
+            return None
+        with self._lock:
+            if self._executor is None:
+                # spawn: never fork a process that already runs an event loop and threads
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(PASSWORD_HASH_NICE,),
+                )
+            return self._executor
+
+    def start(self) -> None:
+        """Create the pool up front (e.g. at lifespan startup)"""
+        self._get_executor()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    async def run(self, func, *args):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.rejected += 1
+                raise HashingOverloaded()
+            self._pending += 1
+        try:
+            executor = self._get_executor()
+            if executor is None:
+                from starlette.concurrency import run_in_threadpool
+
+                return await run_in_threadpool(func, *args)
+            return await asyncio.get_running_loop().run_in_executor(executor, func, *args)
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+
+password_hasher = PasswordHasher(PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_PENDING)
@@ -0,0 +1,61 @@
+"""Test-time guard against query-count regressions (e.g. N+1 loading)."""
+
+from contextlib import contextmanager
+from typing import Iterator, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app import database
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised when a block issues more SQL statements than allowed"""
+
+
+class QueryCounter:
+    """Collects the statements executed while the guard is active"""
+
+    def __init__(self) -> None:
+        self.statements: List[str] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+
+@contextmanager
+def assert_max_queries(limit: int, db_engine: Optional[Engine] = None) -> Iterator[QueryCounter]:
+    """Fail if the enclosed block runs more than ``limit`` SQL statements.
+
+    Counts every statement on ``db_engine``, by default on the app's engines
+    (the async one too with ASYNC_DB=true), whichever thread runs it, so it
+    also covers requests made through ``fastapi.testclient.TestClient``::
+
+        with assert_max_queries(4):
+            client.get("/api/books/?limit=100", headers=headers)
+    """
+    if db_engine is not None:
+        targets = [db_engine]
+    else:
+        targets = [database.engine]
+        if database.async_engine is not None:
+            targets.append(database.async_engine.sync_engine)
+    counter = QueryCounter()
+
+    def _count(_conn, _cursor, statement, _parameters, _context, _executemany):
+        counter.statements.append(statement)
+
+    for target in targets:
+        event.listen(target, "before_cursor_execute", _count)
+    try:
+        yield counter
+    finally:
+        for target in targets:
+            event.remove(target, "before_cursor_execute", _count)
+
+    if counter.count > limit:
+        listing = "\n".join(f"  {i + 1}. {sql}" for i, sql in enumerate(counter.statements))
+        raise QueryBudgetExceeded(
+            f"Expected at most {limit} SQL statements, got {counter.count}:\n{listing}"
+        )
@@ -0,0 +1,257 @@
+"""Token-bucket admission control for the password-hashing endpoints.
+
+Every ``/api/users/register`` and ``/api/users/login`` call costs a bcrypt
+hash. Before any database lookup or hashing, the request takes one token
+from two buckets: one for the client IP and one for the submitted email
+(lower-cased and hashed, so raw addresses are never stored). Both buckets
+are checked and debited together, so a rejected request does not drain the
+other one. When either is empty the request fails fast with a 429 and a
+``Retry-After`` telling when the next token is due.
+
+Buckets hold up to ``*_BURST`` tokens and refill at ``*_PER_MINUTE``; a
+rate of 0 disables that key. Behind a reverse proxy the client IP is only
+right if uvicorn trusts its ``X-Forwarded-For`` (``FORWARDED_ALLOW_IPS``).
+
+Backends:
+- ``memory`` (default): per-process buckets in a bounded LRU, so each
+  worker or replica admits its own share
+- ``redis``: buckets shared by every worker and replica, updated by a Lua
+  script (needs the ``redis`` package; any client with redis-py's
+  ``register_script`` can be injected)
+- ``none``: disabled
+
+A backend error admits the request: throttling is a safeguard, not a
+reason to refuse logins.
+"""
+
+import hashlib
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from app.exceptions import RateLimitError
+from app.logging_config import get_logger
+from app.metrics import AUTH_RATE_LIMIT_DECISIONS
+from app.response_cache import REDIS_URL
+
+try:  # optional, only needed for AUTH_RATE_LIMIT_BACKEND=redis
+    import redis
+except ImportError:  # pragma: no cover - depends on the environment
+    redis = None
+
+logger = get_logger(__name__)
+
+AUTH_RATE_LIMIT_ENABLED = os.getenv("AUTH_RATE_LIMIT_ENABLED", "true").lower() == "true"
+AUTH_RATE_LIMIT_BACKEND = os.getenv("AUTH_RATE_LIMIT_BACKEND", "memory").lower()
+AUTH_RATE_LIMIT_IP_PER_MINUTE = float(os.getenv("AUTH_RATE_LIMIT_IP_PER_MINUTE", "30"))
+AUTH_RATE_LIMIT_IP_BURST = int(os.getenv("AUTH_RATE_LIMIT_IP_BURST", "10"))
+AUTH_RATE_LIMIT_EMAIL_PER_MINUTE = float(os.getenv("AUTH_RATE_LIMIT_EMAIL_PER_MINUTE", "6"))
+AUTH_RATE_LIMIT_EMAIL_BURST = int(os.getenv("AUTH_RATE_LIMIT_EMAIL_BURST", "5"))
+AUTH_RATE_LIMIT_MAX_KEYS = int(os.getenv("AUTH_RATE_LIMIT_MAX_KEYS", "100000"))
+REDIS_KEY_PREFIX = os.getenv("AUTH_RATE_LIMIT_PREFIX", "bibliotheque:ratelimit:")
+
+
+@dataclass(frozen=True)
+class BucketSpec:
+    """One bucket to debit: refill ``rate`` tokens per second up to ``burst``"""
+    scope: str
+    key: str
+    rate: float
+    burst: int
+
+
+class MemoryBackend:
+    """Per-process buckets, least recently used dropped beyond ``max_keys``"""
+
+    name = "memory"
+    blocking = False
+
+    def __init__(self, max_keys: int = AUTH_RATE_LIMIT_MAX_KEYS) -> None:
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def acquire(self, buckets: Sequence[BucketSpec], now: float) -> List[float]:
+        """Debit every bucket if all have a token; return each one's wait (0 when admitted)"""
+        with self._lock:
+            levels = []
+            for spec in buckets:
+                tokens, updated = self._buckets.get(spec.key, (spec.burst, now))
+                levels.append(min(spec.burst, tokens + (now - updated) * spec.rate))
+            waits = [0.0 if level >= 1 else (1 - level) / spec.rate for spec, level in zip(buckets, levels)]
+            admitted = not any(waits)
+            for spec, level in zip(buckets, levels):
+                self._buckets[spec.key] = (level - 1 if admitted else level, now)
+                self._buckets.move_to_end(spec.key)
+            while len(self._buckets) > self.max_keys:
+                # A dropped bucket comes back full, which only errs towards admitting
+                self._buckets.popitem(last=False)
+            return waits
+
+    def clear(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"keys": len(self._buckets), "max_keys": self.max_keys}
+
+
+# KEYS: bucket keys; ARGV: now, then rate and burst per key. Same algorithm as
+# MemoryBackend, atomic on the server; idle buckets expire once full again.
+_ACQUIRE_SCRIPT = """
+local now = tonumber(ARGV[1])
+local levels, waits, admitted = {}, {}, true
+for i, key in ipairs(KEYS) do
+  local rate, burst = tonumber(ARGV[i * 2]), tonumber(ARGV[i * 2 + 1])
+  local state = redis.call('HMGET', key, 'tokens', 'updated')
+  local tokens, updated = tonumber(state[1]) or burst, tonumber(state[2]) or now
+  levels[i] = math.min(burst, tokens + math.max(0, now - updated) * rate)
+  waits[i] = '0'
+  if levels[i] < 1 then
+    admitted = false
+    waits[i] = tostring((1 - levels[i]) / rate)
+  end
+end
+for i, key in ipairs(KEYS) do
+  local rate, burst = tonumber(ARGV[i * 2]), tonumber(ARGV[i * 2 + 1])
+  local level = levels[i]
+  if admitted then level = level - 1 end
+  redis.call('HSET', key, 'tokens', tostring(level), 'updated', tostring(now))
+  redis.call('PEXPIRE', key, math.ceil((burst - level) / rate * 1000) + 1000)
+end
+return waits
+"""
+
+
+class RedisBackend:
+    """Buckets in Redis, shared across processes and replicas"""
+
+    name = "redis"
+    blocking = True
+
+    def __init__(self, client: Any, prefix: str = REDIS_KEY_PREFIX) -> None:
+        self.client = client
+        self.prefix = prefix
+        self._script = client.register_script(_ACQUIRE_SCRIPT)
+
+    def acquire(self, buckets: Sequence[BucketSpec], now: float) -> List[float]:
+        args: List[Any] = [now]
+        for spec in buckets:
+            args += [spec.rate, spec.burst]
+        waits = self._script(keys=[self.prefix + spec.key for spec in buckets], args=args)
+        return [float(wait) for wait in waits]
+
+    def clear(self) -> None:
+        for key in self.client.scan_iter(match=f"{self.prefix}*"):
+            self.client.delete(key)
+
+    def stats(self) -> Dict[str, Any]:
+        return {}
+
+
+class AuthRateLimiter:
+    """Front-end used by the auth routes; counts decisions and never fails a request itself"""
+
+    def __init__(
+        self,
+        backend: Optional[Any],
+        ip_per_minute: float = AUTH_RATE_LIMIT_IP_PER_MINUTE,
+        ip_burst: int = AUTH_RATE_LIMIT_IP_BURST,
+        email_per_minute: float = AUTH_RATE_LIMIT_EMAIL_PER_MINUTE,
+        email_burst: int = AUTH_RATE_LIMIT_EMAIL_BURST,
+    ) -> None:
+        self.backend = backend
+        self.ip_rate = ip_per_minute / 60
+        self.ip_burst = ip_burst
+        self.email_rate = email_per_minute / 60
+        self.email_burst = email_burst
+        self.admitted = 0
+        self.rejected = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None
+
+    def _count(self, attribute: str) -> None:
+        with self._lock:
+            setattr(self, attribute, getattr(self, attribute) + 1)
+
+    def _buckets(self, client_ip: Optional[str], email: Optional[str]) -> List[BucketSpec]:
+        buckets = []
+        if client_ip and self.ip_rate > 0:
+            buckets.append(BucketSpec("ip", f"ip:{client_ip}", self.ip_rate, self.ip_burst))
+        if email and self.email_rate > 0:
+            digest = hashlib.sha256(email.strip().lower().encode()).hexdigest()[:32]
+            buckets.append(BucketSpec("email", f"email:{digest}", self.email_rate, self.email_burst))
+        return buckets
+
+    def check(self, endpoint: str, client_ip: Optional[str], email: Optional[str]) -> None:
+        """Take a token for ``client_ip`` and ``email``, or raise a 429"""
+        buckets = self._buckets(client_ip, email) if self.backend is not None else []
+        if not buckets:
+            return
+        try:
+            waits = self.backend.acquire(buckets, time.time())
+        except Exception:
+            self._count("errors")
+            logger.warning(f"Rate limiter backend failed for {endpoint}, admitting request", exc_info=True)
+            return
+
+        if not any(waits):
+            self._count("admitted")
+            AUTH_RATE_LIMIT_DECISIONS.inc(endpoint, "admitted")
+            return
+
+        self._count("rejected")
+        wait, spec = max(zip(waits, buckets), key=lambda pair: pair[0])
+        AUTH_RATE_LIMIT_DECISIONS.inc(endpoint, f"rejected_{spec.scope}")
+        retry_after = max(1, math.ceil(wait))
+        logger.warning(
+            f"Rate limited {endpoint} attempt ({spec.scope})",
+            extra={'extra_data': {'endpoint': endpoint, 'scope': spec.scope, 'client_ip': client_ip,
+                                  'retry_after': retry_after}}
+        )
+        raise RateLimitError(
+            message="Too many attempts, please retry later",
+            details={"scope": spec.scope, "retry_after": retry_after},
+            retry_after=retry_after,
+        )
+
+    async def check_async(self, endpoint: str, client_ip: Optional[str], email: Optional[str]) -> None:
+        # A remote backend is called from the threadpool, not the event loop
+        if self.backend is not None and self.backend.blocking:
+            await run_in_threadpool(self.check, endpoint, client_ip, email)
+        else:
+            self.check(endpoint, client_ip, email)
+
+    def stats(self) -> Dict[str, Any]:
+        stats: Dict[str, Any] = {
+            "backend": self.backend.name if self.backend is not None else "none",
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "errors": self.errors,
+        }
+        if self.backend is not None:
+            stats.update(self.backend.stats())
+        return stats
+
+
+def create_backend(kind: str = AUTH_RATE_LIMIT_BACKEND) -> Optional[Any]:
+    if not AUTH_RATE_LIMIT_ENABLED or kind == "none":
+        return None
+    if kind == "redis":
+        if redis is not None:
+            return RedisBackend(redis.Redis.from_url(REDIS_URL, socket_timeout=0.5))
+        logger.warning("AUTH_RATE_LIMIT_BACKEND=redis but the redis package is missing; using memory")
+    return MemoryBackend()
+
+
+auth_rate_limiter = AuthRateLimiter(create_backend())
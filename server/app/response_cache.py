@@ -0,0 +1,297 @@
+"""Shared cache of serialized responses for user-independent endpoints.
+
+Entries hold the JSON body and its validator headers, so a hit is answered
+(or turned into a 304) without a query or any serialization.
+
+Invalidation uses versioned tags: an entry is stored under its key plus the
+current version of each of its tags, and a write bumps the versions of the
+tags it affects. Stale entries are never read again and age out through
+the TTL or the LRU bound. Tag versions are read before the database is
+queried, so a response computed from data older than a concurrent write is
+stored under a version that is already outdated.
+
+Backends:
+- ``memory`` (default): per-process LRU, bounded by entries and bytes. A
+  write only bumps the tag versions of the process that handled it; other
+  workers and replicas keep serving their entries until the TTL, which
+  defaults to a few seconds for this backend to bound that staleness
+- ``redis``: shared by every worker and replica (needs the ``redis``
+  package); any client with the redis-py ``get/set/mget/incr/pipeline``
+  interface can be injected, e.g. ``fakeredis.FakeRedis()`` in tests
+- ``none``: disabled
+"""
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from fastapi import Request, Response
+from starlette.concurrency import run_in_threadpool
+
+from app.conditional import headers_not_modified, not_modified
+from app.logging_config import get_logger
+from app.serialization import FastJSONResponse
+
+try:  # optional, only needed for RESPONSE_CACHE_BACKEND=redis
+    import redis
+except ImportError:  # pragma: no cover - depends on the environment
+    redis = None
+
+logger = get_logger(__name__)
+
+RESPONSE_CACHE_BACKEND = os.getenv("RESPONSE_CACHE_BACKEND", "memory").lower()
+# Other processes' memory caches only drop an entry when it expires, so keep it short there
+RESPONSE_CACHE_TTL_SECONDS = int(
+    os.getenv("RESPONSE_CACHE_TTL_SECONDS", "60" if RESPONSE_CACHE_BACKEND == "redis" else "5")
+)
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "1024"))
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+REDIS_URL = os.getenv("REDIS_URL") or "redis://{auth}{host}:{port}/{db}".format(
+    auth=f":{os.getenv('REDIS_PASSWORD')}@" if os.getenv("REDIS_PASSWORD") else "",
+    host=os.getenv("REDIS_HOST", "localhost"),
+    port=os.getenv("REDIS_PORT", "6379"),
+    db=os.getenv("REDIS_DB", "0"),
+)
+REDIS_KEY_PREFIX = os.getenv("RESPONSE_CACHE_PREFIX", "bibliotheque:response:")
+
+# Tags of the authors catalogue entries
+AUTHOR_LIST_TAG = "authors:list"
+
+
+def author_tag(author_id: int) -> str:
+    return f"author:{author_id}"
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    body: bytes
+    headers: Dict[str, str]
+
+    def encode(self) -> bytes:
+        return json.dumps(self.headers).encode() + b"\n" + self.body
+
+    @classmethod
+    def decode(cls, data: bytes) -> "CachedResponse":
+        headers, body = data.split(b"\n", 1)
+        return cls(body=body, headers=json.loads(headers))
+
+
+def replay(request: Request, entry: CachedResponse) -> Response:
+    """Answer from a cached entry, honouring conditional request headers"""
+    if headers_not_modified(request, entry.headers):
+        return not_modified(entry.headers)
+    return FastJSONResponse(entry.body, headers=entry.headers)
+
+
+class MemoryBackend:
+    """In-process LRU bounded by entry count and total bytes"""
+
+    name = "memory"
+    blocking = False
+
+    def __init__(self, max_entries: int, max_bytes: int) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._data: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        self._versions: Dict[str, int] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def tag_versions(self, tags: Iterable[str]) -> List[int]:
+        with self._lock:
+            return [self._versions.get(tag, 0) for tag in tags]
+
+    def bump(self, tags: Iterable[str]) -> None:
+        with self._lock:
+            for tag in tags:
+                self._versions[tag] = self._versions.get(tag, 0) + 1
+
+    def _drop(self, key: str) -> None:
+        _, value = self._data.pop(key)
+        self._bytes -= len(key) + len(value)
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                self._drop(key)
+                return None
+            self._data.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: str, value: bytes, ttl: int) -> None:
+        size = len(key) + len(value)
+        if size > self.max_bytes or self.max_entries <= 0:
+            return
+        with self._lock:
+            if key in self._data:
+                self._drop(key)
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._bytes += size
+            while len(self._data) > self.max_entries or self._bytes > self.max_bytes:
+                self._drop(next(iter(self._data)))
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._data),
+            "max_entries": self.max_entries,
+            "memory_bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "evictions": self.evictions,
+        }
+
+
+class RedisBackend:
+    """Redis-backed store shared across processes"""
+
+    name = "redis"
+    blocking = True
+
+    def __init__(self, client: Any, prefix: str = REDIS_KEY_PREFIX) -> None:
+        self.client = client
+        self.prefix = prefix
+
+    def _tag_key(self, tag: str) -> str:
+        return f"{self.prefix}tag:{tag}"
+
+    def tag_versions(self, tags: Iterable[str]) -> List[int]:
+        tags = list(tags)
+        if not tags:
+            return []
+        return [int(value or 0) for value in self.client.mget([self._tag_key(tag) for tag in tags])]
+
+    def bump(self, tags: Iterable[str]) -> None:
+        pipeline = self.client.pipeline()
+        for tag in tags:
+            pipeline.incr(self._tag_key(tag))
+        pipeline.execute()
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.client.get(self.prefix + key)
+
+    def set(self, key: str, value: bytes, ttl: int) -> None:
+        self.client.set(self.prefix + key, value, ex=ttl)
+
+    def clear(self) -> None:
+        for key in self.client.scan_iter(match=f"{self.prefix}*"):
+            self.client.delete(key)
+
+    def stats(self) -> Dict[str, Any]:
+        info = self.client.info("memory")
+        return {"memory_bytes": info.get("used_memory"), "max_bytes": info.get("maxmemory")}
+
+
+class ResponseCache:
+    """Front-end used by the routes; counts hits and never fails a request"""
+
+    def __init__(self, backend: Optional[Any], ttl: int = RESPONSE_CACHE_TTL_SECONDS) -> None:
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None
+
+    def _count(self, attribute: str) -> None:
+        with self._lock:
+            setattr(self, attribute, getattr(self, attribute) + 1)
+
+    def lookup(self, key: str, tags: Iterable[str]) -> Tuple[Optional[CachedResponse], Optional[str]]:
+        """Return the cached entry (or None) and the versioned key to store a fresh one under"""
+        if self.backend is None:
+            return None, None
+        try:
+            versions = self.backend.tag_versions(tags)
+            versioned_key = f"{key}@{'.'.join(str(version) for version in versions)}"
+            data = self.backend.get(versioned_key)
+        except Exception:
+            self._count("errors")
+            logger.warning(f"Response cache lookup failed for {key}", exc_info=True)
+            return None, None
+        if data is None:
+            self._count("misses")
+            return None, versioned_key
+        self._count("hits")
+        return CachedResponse.decode(data), versioned_key
+
+    def store(self, versioned_key: Optional[str], entry: CachedResponse) -> None:
+        if self.backend is None or versioned_key is None:
+            return
+        try:
+            self.backend.set(versioned_key, entry.encode(), self.ttl)
+        except Exception:
+            self._count("errors")
+            logger.warning(f"Response cache store failed for {versioned_key}", exc_info=True)
+
+    def invalidate(self, *tags: str) -> None:
+        if self.backend is None:
+            return
+        try:
+            self.backend.bump(tags)
+        except Exception:
+            self._count("errors")
+            logger.error(f"Response cache invalidation failed for {tags}", exc_info=True)
+
+    # Async variants: a remote backend is called from the threadpool, not the event loop
+    async def lookup_async(self, key: str, tags: Iterable[str]):
+        if self.backend is not None and self.backend.blocking:
+            return await run_in_threadpool(self.lookup, key, list(tags))
+        return self.lookup(key, tags)
+
+    async def store_async(self, versioned_key: Optional[str], entry: CachedResponse) -> None:
+        if self.backend is not None and self.backend.blocking:
+            await run_in_threadpool(self.store, versioned_key, entry)
+        else:
+            self.store(versioned_key, entry)
+
+    async def invalidate_async(self, *tags: str) -> None:
+        if self.backend is not None and self.backend.blocking:
+            await run_in_threadpool(self.invalidate, *tags)
+        else:
+            self.invalidate(*tags)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        stats: Dict[str, Any] = {
+            "backend": self.backend.name if self.backend is not None else "none",
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+        if self.backend is not None:
+            try:
+                stats.update(self.backend.stats())
+            except Exception:
+                self._count("errors")
+        return stats
+
+
+def create_backend(kind: str = RESPONSE_CACHE_BACKEND) -> Optional[Any]:
+    if kind == "none":
+        return None
+    if kind == "redis":
+        if redis is not None:
+            return RedisBackend(redis.Redis.from_url(REDIS_URL, socket_timeout=0.5))
+        logger.warning("RESPONSE_CACHE_BACKEND=redis but the redis package is missing; using memory")
+    return MemoryBackend(RESPONSE_CACHE_MAX_ENTRIES, RESPONSE_CACHE_MAX_BYTES)
+
+
+response_cache = ResponseCache(create_backend())
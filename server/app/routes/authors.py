@@ -1,10 +1,24 @@
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Request, status
+from sqlalchemy import tuple_
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
+from app.author_index import author_index
+from app.conditional import (
+    author_collection_state,
+    author_etag,
+    collection_etag,
+    is_not_modified,
+    not_modified,
+    validator_headers
+)
 from app.database import get_db
 from app.models import Author
-from app.schemas import AuthorCreate, AuthorRead, AuthorUpdate
+from app.batch import in_request_order, unique_ids
+from app.schemas import AuthorBatchGet, AuthorBatchResult, AuthorCreate, AuthorRead, AuthorSuggestion, AuthorUpdate
+from app.pagination import NEXT_CURSOR_HEADER, decode_cursor, next_cursor
+from app.response_cache import AUTHOR_LIST_TAG, CachedResponse, author_tag, replay, response_cache
+from app.serialization import AUTHOR_ADAPTER, AUTHOR_BATCH_ADAPTER, AUTHOR_LIST_ADAPTER, serialized_response
 from app.security import verify_token
 from app.exceptions import DuplicateResourceError, ResourceNotFoundError
 from app.logging_config import get_logger
@@ -36,33 +50,108 @@ def create_author(
     db.add(db_author)
     db.commit()
     db.refresh(db_author)
+    author_index.upsert(db_author.id, db_author.name)
+    response_cache.invalidate(AUTHOR_LIST_TAG)
     logger.info(f"Author created: {db_author.id} - {author.name}")
     return db_author
 
 
 @router.get("/", response_model=List[AuthorRead])
 def list_authors(
+    request: Request,
     email: str = Depends(verify_token),
     db: Session = Depends(get_db),
     skip: int = 0,
-    limit: int = 10
+    limit: int = 10,
+    cursor: Optional[str] = None
 ):
-    """List all authors"""
-    authors = db.query(Author).offset(skip).limit(limit).all()
-    return authors
+    """List all authors, ordered by name.
+
+    Pages are keyed on (name, id): pass the ``X-Next-Cursor`` header of a
+    response as ``cursor`` to get the following page. ``skip`` keeps the
+    legacy offset paging. Answers 304 to a matching ``If-None-Match``.
+    Pages are the same for every user and are served from ``response_cache``.
+    """
+    cached, cache_key = response_cache.lookup(f"authors:list?{request.url.query}", (AUTHOR_LIST_TAG,))
+    if cached is not None:
+        return replay(request, cached)
+
+    etag = collection_etag("authors", db.execute(author_collection_state()).one(), request)
+    validators = validator_headers(etag)
+    if is_not_modified(request, etag):
+        return not_modified(validators)
+
+    query = db.query(Author).order_by(Author.name, Author.id)
+    if cursor:
+        last_name, last_id = decode_cursor(cursor, (str, int))
+        query = query.filter(tuple_(Author.name, Author.id) > tuple_(last_name, last_id))
+    elif skip:
+        query = query.offset(skip)
+
+    authors = query.limit(limit).all()
+
+    cursor_value = next_cursor(authors, limit, "name", "id")
+    if cursor_value:
+        validators[NEXT_CURSOR_HEADER] = cursor_value
+    response = serialized_response(AUTHOR_LIST_ADAPTER, authors, headers=validators)
+    response_cache.store(cache_key, CachedResponse(response.body, validators))
+    return response
+
+
+@router.get("/suggest", response_model=List[AuthorSuggestion])
+def suggest_authors(
+    prefix: str,
+    limit: int = 10,
+    email: str = Depends(verify_token),
+    db: Session = Depends(get_db)
+):
+    """Author type-ahead: names with a word starting with ``prefix``.
+
+    Served from the in-memory index in ``app.author_index`` (case and accents
+    ignored); the database is only read when the index needs a rebuild.
+    """
+    author_index.refresh_if_stale(db)
+    return [
+        {"id": author_id, "name": name}
+        for author_id, name in author_index.suggest(prefix, max(1, min(limit, 50)))
+    ]
+
+
+@router.post("/batch-get", response_model=AuthorBatchResult)
+def batch_get_authors(
+    batch: AuthorBatchGet,
+    email: str = Depends(verify_token),
+    db: Session = Depends(get_db)
+):
+    """Get several authors in one query, in request order, with the ids that do not exist"""
+    ids = unique_ids(batch.ids)
+    authors, missing = in_request_order(ids, db.query(Author).filter(Author.id.in_(ids)))
+    return serialized_response(AUTHOR_BATCH_ADAPTER, {"authors": authors, "missing": missing})
 
 
 @router.get("/{author_id}", response_model=AuthorRead)
 def get_author(
     author_id: int,
+    request: Request,
     email: str = Depends(verify_token),
     db: Session = Depends(get_db)
 ):
-    """Get a specific author"""
+    """Get a specific author (conditional: ETag / Last-Modified, cached)"""
+    cached, cache_key = response_cache.lookup(f"author:{author_id}", (author_tag(author_id),))
+    if cached is not None:
+        return replay(request, cached)
+
     author = db.query(Author).filter(Author.id == author_id).first()
     if not author:
         raise ResourceNotFoundError("Author", author_id)
-    return author
+
+    etag = author_etag(author)
+    validators = validator_headers(etag, author.updated_at)
+    if is_not_modified(request, etag, author.updated_at):
+        return not_modified(validators)
+    response = serialized_response(AUTHOR_ADAPTER, author, headers=validators)
+    response_cache.store(cache_key, CachedResponse(response.body, validators))
+    return response
 
 
 @router.put("/{author_id}", response_model=AuthorRead)
@@ -84,6 +173,8 @@ def update_author(
     
     db.commit()
     db.refresh(author)
+    author_index.upsert(author.id, author.name)
+    response_cache.invalidate(AUTHOR_LIST_TAG, author_tag(author_id))
     logger.info(f"Author updated: {author_id}")
     return author
 
@@ -101,4 +192,6 @@ def delete_author(
     
     db.delete(author)
     db.commit()
+    author_index.remove(author_id)
+    response_cache.invalidate(AUTHOR_LIST_TAG, author_tag(author_id))
     logger.info(f"Author deleted: {author_id}")
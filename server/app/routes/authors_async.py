@@ -0,0 +1,161 @@
+"""Async variants of the author CRUD handlers (enabled with ASYNC_DB=true).
+
+See ``app.routes.books_async`` for how these shadow the sync routes.
+"""
+
+from fastapi import APIRouter, Depends, Request, status
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+
+from app.author_index import author_index
+from app.conditional import (
+    author_collection_state,
+    author_etag,
+    collection_etag,
+    is_not_modified,
+    not_modified,
+    validator_headers
+)
+from app.database import get_async_db
+from app.models import Author
+from app.schemas import AuthorCreate, AuthorRead, AuthorUpdate
+from app.pagination import NEXT_CURSOR_HEADER, decode_cursor, next_cursor
+from app.response_cache import AUTHOR_LIST_TAG, CachedResponse, author_tag, replay, response_cache
+from app.serialization import AUTHOR_ADAPTER, AUTHOR_LIST_ADAPTER, serialized_response
+from app.security import verify_token
+from app.exceptions import DuplicateResourceError, ResourceNotFoundError
+from app.logging_config import get_logger
+
+logger = get_logger(__name__)
+router = APIRouter(prefix="/api/authors", tags=["authors"])
+
+
+async def _get_author(author_id: int, db: AsyncSession) -> Author:
+    author = await db.get(Author, author_id)
+    if not author:
+        raise ResourceNotFoundError("Author", author_id)
+    return author
+
+
+@router.post("/", response_model=AuthorRead, status_code=status.HTTP_201_CREATED)
+async def create_author(
+    author: AuthorCreate,
+    email: str = Depends(verify_token),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Create a new author"""
+    existing_id = await db.scalar(select(Author.id).where(Author.name == author.name))
+    if existing_id is not None:
+        logger.warning(f"Attempt to create author with existing name: {author.name}")
+        raise DuplicateResourceError(
+            message="Author already exists",
+            details={"name": author.name}
+        )
+
+    db_author = Author(
+        name=author.name,
+        biography=author.biography
+    )
+    db.add(db_author)
+    await db.commit()
+    author_index.upsert(db_author.id, db_author.name)
+    await response_cache.invalidate_async(AUTHOR_LIST_TAG)
+    logger.info(f"Author created: {db_author.id} - {author.name}")
+    return db_author
+
+
+@router.get("/", response_model=List[AuthorRead])
+async def list_authors(
+    request: Request,
+    email: str = Depends(verify_token),
+    db: AsyncSession = Depends(get_async_db),
+    skip: int = 0,
+    limit: int = 10,
+    cursor: Optional[str] = None
+):
+    """List all authors, ordered by name (keyset paging, see authors.list_authors)"""
+    cached, cache_key = await response_cache.lookup_async(f"authors:list?{request.url.query}", (AUTHOR_LIST_TAG,))
+    if cached is not None:
+        return replay(request, cached)
+
+    etag = collection_etag("authors", (await db.execute(author_collection_state())).one(), request)
+    validators = validator_headers(etag)
+    if is_not_modified(request, etag):
+        return not_modified(validators)
+
+    stmt = select(Author)
+    if cursor:
+        last_name, last_id = decode_cursor(cursor, (str, int))
+        stmt = stmt.where(tuple_(Author.name, Author.id) > tuple_(last_name, last_id))
+    elif skip:
+        stmt = stmt.offset(skip)
+
+    authors = (await db.scalars(stmt.order_by(Author.name, Author.id).limit(limit))).all()
+
+    cursor_value = next_cursor(authors, limit, "name", "id")
+    if cursor_value:
+        validators[NEXT_CURSOR_HEADER] = cursor_value
+    response = serialized_response(AUTHOR_LIST_ADAPTER, authors, headers=validators)
+    await response_cache.store_async(cache_key, CachedResponse(response.body, validators))
+    return response
+
+
+@router.get("/{author_id:int}", response_model=AuthorRead)
+async def get_author(
+    author_id: int,
+    request: Request,
+    email: str = Depends(verify_token),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get a specific author (conditional: ETag / Last-Modified, cached)"""
+    cached, cache_key = await response_cache.lookup_async(f"author:{author_id}", (author_tag(author_id),))
+    if cached is not None:
+        return replay(request, cached)
+
+    author = await _get_author(author_id, db)
+    etag = author_etag(author)
+    validators = validator_headers(etag, author.updated_at)
+    if is_not_modified(request, etag, author.updated_at):
+        return not_modified(validators)
+    response = serialized_response(AUTHOR_ADAPTER, author, headers=validators)
+    await response_cache.store_async(cache_key, CachedResponse(response.body, validators))
+    return response
+
+
+@router.put("/{author_id:int}", response_model=AuthorRead)
+async def update_author(
+    author_id: int,
+    author_update: AuthorUpdate,
+    email: str = Depends(verify_token),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Update an author"""
+    author = await _get_author(author_id, db)
+
+    if author_update.name is not None:
+        author.name = author_update.name
+    if author_update.biography is not None:
+        author.biography = author_update.biography
+
+    await db.commit()
+    author_index.upsert(author.id, author.name)
+    await response_cache.invalidate_async(AUTHOR_LIST_TAG, author_tag(author_id))
+    logger.info(f"Author updated: {author_id}")
+    return author
+
+
+@router.delete("/{author_id:int}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_author(
+    author_id: int,
+    email: str = Depends(verify_token),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Delete an author"""
+    author = await _get_author(author_id, db)
+
+    await db.delete(author)
+    await db.commit()
+    author_index.remove(author_id)
+    await response_cache.invalidate_async(AUTHOR_LIST_TAG, author_tag(author_id))
+    logger.info(f"Author deleted: {author_id}")
@@ -1,14 +1,51 @@
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Query, Request, status
+from fastapi.responses import StreamingResponse
+from datetime import datetime
 from sqlalchemy.orm import Session
-from typing import List
+from starlette.concurrency import run_in_threadpool
+from typing import List, Literal, Optional
 
+from app.bulk_edit import BookBulkEditor
+from app.bulk_import import (
+    BookImporter,
+    detect_format,
+    iter_chunks,
+    iter_csv_records,
+    iter_lines,
+    iter_ndjson_records
+)
+from app.batch import MISSING_IDS_HEADER, in_request_order, missing_ids_header, parse_ids
+from app.bulk_export import EXPORT_MEDIA_TYPES, export_books
+from app.conditional import (
+    book_collection_state,
+    book_etag,
+    book_last_modified,
+    collection_etag,
+    is_not_modified,
+    not_modified,
+    validator_headers
+)
 from app.database import get_db
-from app.models import Book, Author, User
-from app.schemas import BookCreate, BookRead, BookUpdate
-from app.security import verify_token
+from app.fieldsets import View, book_view
+from app.models import Book, Author
+from app.loaders import BOOK_READ_OPTIONS
+from app.pagination import NEXT_CURSOR_HEADER, decode_cursor, next_cursor
+from app.search import search_book_ids
+from app.serialization import SEARCH_HIT_LIST_ADAPTER, serialized_response
+from app.schemas import (
+    BookBulkResult,
+    BookBulkUpdate,
+    BookCreate,
+    BookImportResult,
+    BookRead,
+    BookSearchHit,
+    BookUpdate
+)
+from app.security import CurrentUser, get_current_user
 from app.exceptions import (
     DuplicateResourceError,
     ResourceNotFoundError,
+    ValidationError,
     PermissionError as AppPermissionError
 )
 from app.logging_config import get_logger
@@ -20,15 +57,10 @@ router = APIRouter(prefix="/api/books", tags=["books"])
 @router.post("/", response_model=BookRead, status_code=status.HTTP_201_CREATED)
 def create_book(
     book: BookCreate,
-    email: str = Depends(verify_token),
+    current_user: CurrentUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Create a new book"""
-    # Get current user
-    user = db.query(User).filter(User.email == email).first()
-    if not user:
-        raise ResourceNotFoundError("User", email)
-    
     # Validate ISBN uniqueness if provided
     if book.isbn:
         existing_book = db.query(Book).filter(Book.isbn == book.isbn).first()
@@ -45,7 +77,7 @@ def create_book(
         description=book.description,
         isbn=book.isbn,
         published_year=book.published_year,
-        owner_id=user.id
+        owner_id=current_user.id
     )
     
     # Add authors if provided
@@ -56,64 +88,204 @@ def create_book(
     db.add(db_book)
     db.commit()
     db.refresh(db_book)
-    logger.info(f"Book created: {db_book.id} by user {email}")
+    logger.info(f"Book created: {db_book.id} by user {current_user.email}")
     return db_book
 
 
+@router.post("/bulk", response_model=BookImportResult)
+async def bulk_import_books(
+    request: Request,
+    format: Optional[Literal["ndjson", "csv"]] = None,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Import books from a streamed NDJSON or CSV body.
+
+    The format comes from ``format`` or the Content-Type header. Rows are
+    imported chunk by chunk; invalid rows are listed in ``errors`` and do not
+    stop the import.
+    """
+    import_format = detect_format(request.headers.get("content-type"), format)
+    parse = iter_csv_records if import_format == "csv" else iter_ndjson_records
+    importer = BookImporter(db, current_user.id)
+
+    async for chunk in iter_chunks(parse(iter_lines(request.stream()))):
+        await run_in_threadpool(importer.import_chunk, chunk)
+
+    result = importer.result()
+    logger.info(
+        f"Bulk import by user {current_user.email}: {result.inserted} inserted, {result.failed} failed",
+        extra={'extra_data': {'processed': result.processed, 'inserted': result.inserted, 'failed': result.failed}}
+    )
+    return result
+
+
+@router.patch("/", response_model=BookBulkResult)
+def bulk_update_books(
+    batch: BookBulkUpdate,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Update several books in one transaction.
+
+    Send ``ids`` with the ``changes`` to apply to all of them, or
+    ``operations`` with one set of changes per book. Each item is reported in
+    ``results``; a book that is not found or fails validation is skipped
+    without stopping the others.
+    """
+    return BookBulkEditor(db, current_user.id).update(batch)
+
+
+@router.delete("/", response_model=BookBulkResult)
+def bulk_delete_books(
+    ids: str = Query(..., description="Comma-separated book ids to delete"),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Delete several books in one transaction; ids that are not the caller's books are reported as not_found"""
+    return BookBulkEditor(db, current_user.id).delete(parse_ids(ids))
+
+
 @router.get("/", response_model=List[BookRead])
 def list_books(
-    email: str = Depends(verify_token),
+    request: Request,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_db),
+    view: View = Depends(book_view),
+    skip: int = 0,
+    limit: int = 10,
+    cursor: Optional[str] = None,
+    ids: Optional[str] = Query(None, description="Comma-separated book ids to fetch, instead of a page")
+):
+    """List all books for the current user.
+
+    Pages are keyed on (owner_id, id): pass the ``X-Next-Cursor`` header of a
+    response as ``cursor`` to get the following page. ``skip`` keeps the
+    legacy offset paging. Answers 304 to a matching ``If-None-Match``.
+    ``include`` / ``fields`` select the authors and columns returned.
+
+    ``ids=3,1,2`` returns those books instead (one query, request order,
+    paging ignored); ids that are not the caller's books are listed in the
+    ``X-Missing-Ids`` header.
+    """
+    requested = parse_ids(ids) if ids is not None else None
+    etag = collection_etag("books", db.execute(book_collection_state(current_user.id)).one(), request)
+    validators = validator_headers(etag)
+    if is_not_modified(request, etag):
+        return not_modified(validators)
+
+    query = db.query(Book).options(*view.loader_options()).filter(
+        Book.owner_id == current_user.id
+    ).order_by(Book.id)
+    if requested is not None:
+        books, missing = in_request_order(requested, query.filter(Book.id.in_(requested)))
+        if missing:
+            validators[MISSING_IDS_HEADER] = missing_ids_header(missing)
+        return serialized_response(view.list_adapter(), books, headers=validators)
+    if cursor:
+        owner_id, last_id = decode_cursor(cursor, (int, int))
+        if owner_id != current_user.id:
+            raise ValidationError(message="Invalid pagination cursor", error_code="INVALID_CURSOR")
+        query = query.filter(Book.id > last_id)
+    elif skip:
+        query = query.offset(skip)
+
+    books = query.limit(limit).all()
+
+    cursor_value = next_cursor(books, limit, "owner_id", "id")
+    if cursor_value:
+        validators[NEXT_CURSOR_HEADER] = cursor_value
+    return serialized_response(view.list_adapter(), books, headers=validators)
+
+
+@router.get("/export")
+def export_library(
+    format: Literal["ndjson", "csv", "json"] = "ndjson",
+    omit: Optional[str] = Query(None, description="Comma-separated CSV columns to leave out, e.g. isbn"),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """Stream every book of the current user as NDJSON, CSV or a JSON array.
+
+    A CSV export re-imports into the same database with ``omit=isbn`` (ISBNs
+    are unique across users), and into another one with ``omit=author_ids``.
+    """
+    omitted = [column.strip() for column in omit.split(",") if column.strip()] if omit else []
+    chunks = export_books(current_user.id, format, omit=omitted)
+    logger.info(f"Library export ({format}) by user {current_user.email}")
+    return StreamingResponse(
+        chunks,
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="books.{format}"'}
+    )
+
+
+@router.get("/search", response_model=List[BookSearchHit])
+def search_books(
+    q: str,
+    current_user: CurrentUser = Depends(get_current_user),
     db: Session = Depends(get_db),
     skip: int = 0,
     limit: int = 10
 ):
-    """List all books for the current user"""
-    user = db.query(User).filter(User.email == email).first()
-    if not user:
-        raise ResourceNotFoundError("User", email)
-    
-    books = db.query(Book).filter(
-        Book.owner_id == user.id
-    ).offset(skip).limit(limit).all()
-    return books
+    """Full-text search over the current user's books, best match first.
+
+    Matches titles, descriptions and author names/biographies (accents and
+    case ignored, last word as a prefix). Hits carry the highlighted title and
+    a description snippet as HTML: the text is escaped and matches are
+    wrapped in ``<mark>``.
+    """
+    limit = max(1, min(limit, 100))
+    hits = search_book_ids(db, current_user.id, q, limit, skip)
+    books = {}
+    if hits:
+        matched = db.query(Book).options(*BOOK_READ_OPTIONS).filter(
+            Book.id.in_([book_id for book_id, *_ in hits])
+        )
+        books = {book.id: book for book in matched}
+    results = [
+        {"book": books[book_id], "score": score, "highlighted_title": title, "snippet": snippet}
+        for book_id, score, title, snippet in hits
+        if book_id in books
+    ]
+    return serialized_response(SEARCH_HIT_LIST_ADAPTER, results)
 
 
 @router.get("/{book_id}", response_model=BookRead)
 def get_book(
     book_id: int,
-    email: str = Depends(verify_token),
-    db: Session = Depends(get_db)
+    request: Request,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_db),
+    view: View = Depends(book_view)
 ):
-    """Get a specific book"""
-    user = db.query(User).filter(User.email == email).first()
-    if not user:
-        raise ResourceNotFoundError("User", email)
-    
-    book = db.query(Book).filter(
+    """Get a specific book (conditional: ETag / Last-Modified)"""
+    book = db.query(Book).options(*view.loader_options()).filter(
         Book.id == book_id,
-        Book.owner_id == user.id
+        Book.owner_id == current_user.id
     ).first()
     
     if not book:
         raise ResourceNotFoundError("Book", book_id)
-    return book
+
+    etag = book_etag(book, view)
+    last_modified = book_last_modified(book, view)
+    validators = validator_headers(etag, last_modified)
+    if is_not_modified(request, etag, last_modified):
+        return not_modified(validators)
+    return serialized_response(view.adapter(), book, headers=validators)
 
 
 @router.put("/{book_id}", response_model=BookRead)
 def update_book(
     book_id: int,
     book_update: BookUpdate,
-    email: str = Depends(verify_token),
+    current_user: CurrentUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Update a book"""
-    user = db.query(User).filter(User.email == email).first()
-    if not user:
-        raise ResourceNotFoundError("User", email)
-    
-    book = db.query(Book).filter(
+    book = db.query(Book).options(*BOOK_READ_OPTIONS).filter(
         Book.id == book_id,
-        Book.owner_id == user.id
+        Book.owner_id == current_user.id
     ).first()
     
     if not book:
@@ -144,27 +316,25 @@ def update_book(
     if book_update.author_ids is not None:
         authors = db.query(Author).filter(Author.id.in_(book_update.author_ids)).all()
         book.authors = authors
+        # relinking alone does not UPDATE the books row, so bump the version by hand
+        book.updated_at = datetime.utcnow()
     
     db.commit()
     db.refresh(book)
-    logger.info(f"Book updated: {book_id} by user {email}")
+    logger.info(f"Book updated: {book_id} by user {current_user.email}")
     return book
 
 
 @router.delete("/{book_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_book(
     book_id: int,
-    email: str = Depends(verify_token),
+    current_user: CurrentUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Delete a book"""
-    user = db.query(User).filter(User.email == email).first()
-    if not user:
-        raise ResourceNotFoundError("User", email)
-    
     book = db.query(Book).filter(
         Book.id == book_id,
-        Book.owner_id == user.id
+        Book.owner_id == current_user.id
     ).first()
     
     if not book:
@@ -172,4 +342,4 @@ def delete_book(
     
     db.delete(book)
     db.commit()
-    logger.info(f"Book deleted: {book_id} by user {email}")
+    logger.info(f"Book deleted: {book_id} by user {current_user.email}")
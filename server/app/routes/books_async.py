@@ -0,0 +1,195 @@
+"""Async variants of the book CRUD handlers (enabled with ASYNC_DB=true).
+
+Paths use the ``int`` convertor so that, when this router is mounted in front
+of ``app.routes.books``, it only shadows the CRUD routes and leaves any other
+sync endpoint of the books router reachable.
+"""
+
+from datetime import datetime
+from fastapi import APIRouter, Depends, Query, Request, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+
+from app.batch import MISSING_IDS_HEADER, in_request_order, missing_ids_header, parse_ids
+from app.conditional import (
+    book_collection_state,
+    book_etag,
+    book_last_modified,
+    collection_etag,
+    is_not_modified,
+    not_modified,
+    validator_headers
+)
+from app.database import get_async_db
+from app.fieldsets import View, book_view
+from app.models import Book, Author
+from app.loaders import BOOK_READ_OPTIONS
+from app.pagination import NEXT_CURSOR_HEADER, decode_cursor, next_cursor
+from app.serialization import serialized_response
+from app.schemas import BookCreate, BookRead, BookUpdate
+from app.security import CurrentUser, get_current_user
+from app.exceptions import DuplicateResourceError, ResourceNotFoundError, ValidationError
+from app.logging_config import get_logger
+
+logger = get_logger(__name__)
+router = APIRouter(prefix="/api/books", tags=["books"])
+
+
+async def _get_owned_book(book_id: int, user_id: int, db: AsyncSession, options=BOOK_READ_OPTIONS) -> Book:
+    book = await db.scalar(
+        select(Book)
+        .options(*options)
+        .where(Book.id == book_id, Book.owner_id == user_id)
+    )
+    if not book:
+        raise ResourceNotFoundError("Book", book_id)
+    return book
+
+
+@router.post("/", response_model=BookRead, status_code=status.HTTP_201_CREATED)
+async def create_book(
+    book: BookCreate,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Create a new book"""
+    if book.isbn:
+        existing_id = await db.scalar(select(Book.id).where(Book.isbn == book.isbn))
+        if existing_id is not None:
+            logger.warning(f"Attempt to create book with existing ISBN: {book.isbn}")
+            raise DuplicateResourceError(
+                message="Book with this ISBN already exists",
+                details={"isbn": book.isbn}
+            )
+
+    db_book = Book(
+        title=book.title,
+        description=book.description,
+        isbn=book.isbn,
+        published_year=book.published_year,
+        owner_id=current_user.id,
+        authors=[],
+    )
+
+    if book.author_ids:
+        authors = await db.scalars(select(Author).where(Author.id.in_(book.author_ids)))
+        db_book.authors = list(authors)
+
+    db.add(db_book)
+    await db.commit()
+    logger.info(f"Book created: {db_book.id} by user {current_user.email}")
+    return db_book
+
+
+@router.get("/", response_model=List[BookRead])
+async def list_books(
+    request: Request,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    view: View = Depends(book_view),
+    skip: int = 0,
+    limit: int = 10,
+    cursor: Optional[str] = None,
+    ids: Optional[str] = Query(None, description="Comma-separated book ids to fetch, instead of a page")
+):
+    """List all books for the current user (keyset paging and ``ids``, see books.list_books)"""
+    requested = parse_ids(ids) if ids is not None else None
+    etag = collection_etag("books", (await db.execute(book_collection_state(current_user.id))).one(), request)
+    validators = validator_headers(etag)
+    if is_not_modified(request, etag):
+        return not_modified(validators)
+
+    stmt = select(Book).options(*view.loader_options()).where(Book.owner_id == current_user.id)
+    if requested is not None:
+        books, missing = in_request_order(requested, await db.scalars(stmt.where(Book.id.in_(requested))))
+        if missing:
+            validators[MISSING_IDS_HEADER] = missing_ids_header(missing)
+        return serialized_response(view.list_adapter(), books, headers=validators)
+    if cursor:
+        owner_id, last_id = decode_cursor(cursor, (int, int))
+        if owner_id != current_user.id:
+            raise ValidationError(message="Invalid pagination cursor", error_code="INVALID_CURSOR")
+        stmt = stmt.where(Book.id > last_id)
+    elif skip:
+        stmt = stmt.offset(skip)
+
+    books = (await db.scalars(stmt.order_by(Book.id).limit(limit))).all()
+
+    cursor_value = next_cursor(books, limit, "owner_id", "id")
+    if cursor_value:
+        validators[NEXT_CURSOR_HEADER] = cursor_value
+    return serialized_response(view.list_adapter(), books, headers=validators)
+
+
+@router.get("/{book_id:int}", response_model=BookRead)
+async def get_book(
+    book_id: int,
+    request: Request,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    view: View = Depends(book_view)
+):
+    """Get a specific book (conditional: ETag / Last-Modified)"""
+    book = await _get_owned_book(book_id, current_user.id, db, view.loader_options())
+    etag = book_etag(book, view)
+    last_modified = book_last_modified(book, view)
+    validators = validator_headers(etag, last_modified)
+    if is_not_modified(request, etag, last_modified):
+        return not_modified(validators)
+    return serialized_response(view.adapter(), book, headers=validators)
+
+
+@router.put("/{book_id:int}", response_model=BookRead)
+async def update_book(
+    book_id: int,
+    book_update: BookUpdate,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Update a book"""
+    book = await _get_owned_book(book_id, current_user.id, db)
+
+    if book_update.title is not None:
+        book.title = book_update.title
+    if book_update.description is not None:
+        book.description = book_update.description
+    if book_update.isbn is not None:
+        existing_id = await db.scalar(
+            select(Book.id).where(Book.isbn == book_update.isbn, Book.id != book_id)
+        )
+        if existing_id is not None:
+            logger.warning(f"Attempt to update book with existing ISBN: {book_update.isbn}")
+            raise DuplicateResourceError(
+                message="Book with this ISBN already exists",
+                details={"isbn": book_update.isbn}
+            )
+        book.isbn = book_update.isbn
+    if book_update.published_year is not None:
+        book.published_year = book_update.published_year
+
+    if book_update.author_ids is not None:
+        authors = await db.scalars(select(Author).where(Author.id.in_(book_update.author_ids)))
+        book.authors = list(authors)
+        # relinking alone does not UPDATE the books row, so bump the version by hand
+        book.updated_at = datetime.utcnow()
+
+    await db.commit()
+    # Pick up server-side onupdate values without lazy-loading during serialization
+    await db.refresh(book, attribute_names=["updated_at"])
+    logger.info(f"Book updated: {book_id} by user {current_user.email}")
+    return book
+
+
+@router.delete("/{book_id:int}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_book(
+    book_id: int,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Delete a book"""
+    book = await _get_owned_book(book_id, current_user.id, db)
+
+    await db.delete(book)
+    await db.commit()
+    logger.info(f"Book deleted: {book_id} by user {current_user.email}")
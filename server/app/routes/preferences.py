@@ -1,21 +1,22 @@
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Request, Response, status
 from sqlalchemy.orm import Session
 
+from app.conditional import is_not_modified, not_modified, preference_etag, validator_headers
 from app.database import get_db
-from app.models import Preference, User
+from app.models import Preference
 from app.schemas import PreferenceRead, PreferenceUpdate
-from app.security import verify_token
-from app.exceptions import ResourceNotFoundError
+from app.security import CurrentUser, get_current_user
 from app.logging_config import get_logger
 
 logger = get_logger(__name__)
 router = APIRouter(prefix="/api/preferences", tags=["preferences"])
 
 
-def _get_or_create_preference(user: User, db: Session) -> Preference:
+def _get_or_create_preference(user: CurrentUser, db: Session) -> Preference:
     """Return the user's Preference row, creating defaults if absent."""
-    if user.preference:
-        return user.preference
+    pref = db.query(Preference).filter(Preference.user_id == user.id).first()
+    if pref:
+        return pref
     pref = Preference(user_id=user.id)
     db.add(pref)
     db.commit()
@@ -23,32 +24,34 @@ def _get_or_create_preference(user: User, db: Session) -> Preference:
     return pref
 
 
-def _resolve_user(email: str, db: Session) -> User:
-    user = db.query(User).filter(User.email == email).first()
-    if not user:
-        raise ResourceNotFoundError("User", email)
-    return user
-
-
 @router.get("/me", response_model=PreferenceRead)
 def get_my_preferences(
-    email: str = Depends(verify_token),
+    request: Request,
+    response: Response,
+    current_user: CurrentUser = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    """Return the current user's display preferences (auto-creates defaults on first call)."""
-    user = _resolve_user(email, db)
-    return _get_or_create_preference(user, db)
+    """Return the current user's display preferences (auto-creates defaults on first call).
+
+    Conditional: answers 304 to a matching If-None-Match / If-Modified-Since.
+    """
+    pref = _get_or_create_preference(current_user, db)
+    etag = preference_etag(pref)
+    validators = validator_headers(etag, pref.updated_at)
+    if is_not_modified(request, etag, pref.updated_at):
+        return not_modified(validators)
+    response.headers.update(validators)
+    return pref
 
 
 @router.put("/me", response_model=PreferenceRead)
 def update_my_preferences(
     payload: PreferenceUpdate,
-    email: str = Depends(verify_token),
+    current_user: CurrentUser = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
     """Upsert the current user's display preferences."""
-    user = _resolve_user(email, db)
-    pref = _get_or_create_preference(user, db)
+    pref = _get_or_create_preference(current_user, db)
 
     if payload.theme is not None:
         pref.theme = payload.theme
@@ -1,15 +1,21 @@
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Request, status
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 from datetime import timedelta
+from typing import Optional
 
 from app.database import get_db
+from app.fieldsets import View, user_view
 from app.models import User
+from app.rate_limit import auth_rate_limiter
 from app.schemas import UserCreate, UserLogin, UserRead, Token
+from app.serialization import serialized_response
 from app.security import (
-    hash_password,
-    verify_password,
+    hash_password_async,
+    verify_password_async,
     create_access_token,
-    verify_token,
+    get_current_user,
+    CurrentUser,
     ACCESS_TOKEN_EXPIRE_MINUTES
 )
 from app.exceptions import (
@@ -23,12 +29,54 @@ logger = get_logger(__name__)
 router = APIRouter(prefix="/api/users", tags=["users"])
 
 
+def _find_user(db: Session, email: str, view: View) -> Optional[User]:
+    return db.query(User).options(*view.loader_options()).filter(User.email == email).first()
+
+
+def _lookup_credentials(db: Session, email: str) -> Optional[str]:
+    """Return the stored password hash (None if unknown) and release the connection.
+
+    Hashing takes far longer than the query, so the pooled connection must
+    not stay checked out while the request waits on the hashing pool.
+    """
+    try:
+        return db.query(User.hashed_password).filter(User.email == email).scalar()
+    finally:
+        db.close()
+
+
+def _client_ip(request: Request) -> Optional[str]:
+    return request.client.host if request.client else None
+
+
+def _create_user(db: Session, email: str, hashed_password: str, view: View) -> User:
+    db_user = User(email=email, hashed_password=hashed_password)
+    db.add(db_user)
+    db.commit()
+    return _find_user(db, email, view)
+
+
+def _load_logged_in_user(db: Session, email: str, new_hash: Optional[str], view: View) -> User:
+    if new_hash:
+        db.query(User).filter(User.email == email).update({User.hashed_password: new_hash})
+        db.commit()
+    return _find_user(db, email, view)
+
+
+# register/login are async so that bcrypt, which runs on the hashing pool,
+# does not hold a threadpool slot; database work is still sent to the threadpool.
+# Both are throttled per client IP and per email (app.rate_limit) before any
+# lookup or hashing, so a burst is turned away with a cheap 429.
+# User payloads embed no books unless asked for (?include=books,books.authors,
+# see app.fieldsets), so these and /me cost one row however big the library.
 @router.post("/register", response_model=UserRead, status_code=status.HTTP_201_CREATED)
-def register(user: UserCreate, db: Session = Depends(get_db)):
+async def register(user: UserCreate, request: Request, db: Session = Depends(get_db), view: View = Depends(user_view)):
     """Register a new user"""
+    await auth_rate_limiter.check_async("register", _client_ip(request), user.email)
+
     # Check if user already exists
-    existing_user = db.query(User).filter(User.email == user.email).first()
-    if existing_user:
+    existing_hash = await run_in_threadpool(_lookup_credentials, db, user.email)
+    if existing_hash is not None:
         logger.warning(f"Registration attempt with existing email: {user.email}")
         raise DuplicateResourceError(
             message="Email already registered",
@@ -36,25 +84,32 @@ def register(user: UserCreate, db: Session = Depends(get_db)):
         )
     
     # Create new user
-    hashed_password = hash_password(user.password)
-    db_user = User(email=user.email, hashed_password=hashed_password)
-    db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    hashed_password = await hash_password_async(user.password)
+    db_user = await run_in_threadpool(_create_user, db, user.email, hashed_password, view)
     logger.info(f"User registered successfully: {user.email}")
-    return db_user
+    return serialized_response(view.adapter(), db_user, status_code=status.HTTP_201_CREATED)
 
 
 @router.post("/login", response_model=Token)
-def login(user: UserLogin, db: Session = Depends(get_db)):
+async def login(user: UserLogin, request: Request, db: Session = Depends(get_db), view: View = Depends(user_view)):
     """Login user and return JWT token"""
+    await auth_rate_limiter.check_async("login", _client_ip(request), user.email)
+
     # Find user by email
-    db_user = db.query(User).filter(User.email == user.email).first()
-    if not db_user or not verify_password(user.password, db_user.hashed_password):
+    stored_hash = await run_in_threadpool(_lookup_credentials, db, user.email)
+    valid, new_hash = (False, None)
+    if stored_hash is not None:
+        valid, new_hash = await verify_password_async(user.password, stored_hash)
+    if not valid:
         logger.warning(f"Failed login attempt for email: {user.email}")
         raise AuthenticationError(
             message="Invalid email or password"
         )
+
+    # Transparently upgrade hashes made with another bcrypt cost or scheme
+    db_user = await run_in_threadpool(_load_logged_in_user, db, user.email, new_hash, view)
+    if new_hash:
+        logger.info(f"Password hash upgraded for user: {user.email}")
     
     # Create access token
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -64,29 +119,30 @@ def login(user: UserLogin, db: Session = Depends(get_db)):
     )
     
     logger.info(f"User logged in successfully: {user.email}")
-    return {
+    return serialized_response(view.token_adapter(), {
         "access_token": access_token,
         "token_type": "bearer",
         "user": db_user
-    }
+    })
 
 
 @router.get("/me", response_model=UserRead)
-def get_current_user(
-    email: str = Depends(verify_token),
-    db: Session = Depends(get_db)
+def get_me(
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_db),
+    view: View = Depends(user_view)
 ):
     """Get current logged-in user"""
-    db_user = db.query(User).filter(User.email == email).first()
+    db_user = db.query(User).options(*view.loader_options()).filter(User.id == current_user.id).first()
     if not db_user:
-        raise ResourceNotFoundError("User", email)
-    return db_user
+        raise ResourceNotFoundError("User", current_user.email)
+    return serialized_response(view.adapter(), db_user)
 
 
 @router.get("/{user_id}", response_model=UserRead)
-def get_user(user_id: int, db: Session = Depends(get_db)):
+def get_user(user_id: int, db: Session = Depends(get_db), view: View = Depends(user_view)):
     """Get user by ID"""
-    db_user = db.query(User).filter(User.id == user_id).first()
+    db_user = db.query(User).options(*view.loader_options()).filter(User.id == user_id).first()
     if not db_user:
         raise ResourceNotFoundError("User", user_id)
-    return db_user
+    return serialized_response(view.adapter(), db_user)
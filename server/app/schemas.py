@@ -21,11 +21,27 @@ class AuthorUpdate(BaseModel):
 class AuthorRead(AuthorBase):
     id: int
     created_at: datetime
+    updated_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
 
 
+class AuthorSuggestion(BaseModel):
+    id: int
+    name: str
+
+
+class AuthorBatchGet(BaseModel):
+    ids: List[int]
+
+
+class AuthorBatchResult(BaseModel):
+    """Found authors in request order, and the requested ids that do not exist"""
+    authors: List[AuthorRead]
+    missing: List[int] = []
+
+
 # ==================== Book Schemas ====================
 class BookBase(BaseModel):
     title: str
@@ -46,6 +62,50 @@ class BookUpdate(BaseModel):
     author_ids: Optional[List[int]] = None
 
 
+class BookImportRow(BookCreate):
+    """One record of a bulk import; authors may also be given by name"""
+    author_names: Optional[List[str]] = None
+
+
+class BookImportError(BaseModel):
+    row: int
+    error: str
+    isbn: Optional[str] = None
+
+
+class BookImportResult(BaseModel):
+    processed: int
+    inserted: int
+    failed: int
+    errors: List[BookImportError] = []
+    errors_truncated: bool = False
+
+
+class BookBulkOperation(BookUpdate):
+    """Changes for one book of a bulk update"""
+    id: int
+
+
+class BookBulkUpdate(BaseModel):
+    """Either the same ``changes`` for every id in ``ids``, or one entry per book in ``operations``"""
+    ids: Optional[List[int]] = None
+    changes: Optional[BookUpdate] = None
+    operations: Optional[List[BookBulkOperation]] = None
+
+
+class BookBulkItemResult(BaseModel):
+    id: int
+    status: Literal["updated", "deleted", "not_found", "failed"]
+    error: Optional[str] = None
+
+
+class BookBulkResult(BaseModel):
+    processed: int
+    succeeded: int
+    failed: int
+    results: List[BookBulkItemResult]
+
+
 class BookRead(BookBase):
     id: int
     owner_id: int
@@ -57,6 +117,13 @@ class BookRead(BookBase):
         from_attributes = True
 
 
+class BookSearchHit(BaseModel):
+    book: BookRead
+    score: float
+    highlighted_title: str
+    snippet: str
+
+
 # ==================== User Schemas ====================
 class UserBase(BaseModel):
     email: EmailStr
@@ -0,0 +1,190 @@
+"""Full-text search over books (SQLite FTS5).
+
+``books_fts`` holds one document per book: its title and description, the
+names and biographies of its authors, and its owner id. Triggers on
+``books``, ``book_author`` and ``authors`` keep it in sync, so every write
+path (ORM, Core bulk inserts from ``app.bulk_import``, raw SQL) is covered
+without application code.
+
+Owner scoping is part of the ``MATCH`` expression (``owner_id : "<id>"``)
+rather than a join filter, so FTS5 only ranks the caller's own books instead
+of scoring every match in the corpus and discarding most of them.
+
+Highlighted titles and snippets are HTML: FTS5 marks the matches with
+control characters, the user's text is escaped, and only then are the marks
+turned into ``<mark>`` tags.
+"""
+
+import html
+import re
+from typing import List, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from app.database import reset_schema_version
+from app.exceptions import ValidationError
+
+FTS_TABLE = "books_fts"
+
+# bm25 column weights: title, description, author_names, author_bios, owner_id
+BM25_WEIGHTS = (10.0, 2.0, 5.0, 1.0, 0.0)
+HIGHLIGHT_OPEN = "<mark>"
+HIGHLIGHT_CLOSE = "</mark>"
+# What FTS5 wraps matches in; html.escape leaves them alone
+_MATCH_OPEN = "\x02"
+_MATCH_CLOSE = "\x03"
+SNIPPET_TOKENS = 16
+MAX_QUERY_TERMS = 16
+SEARCHABLE_COLUMNS = "{title description author_names author_bios}"
+
+_TERM_RE = re.compile(r"\w+", re.UNICODE)
+
+_AUTHOR_NAMES = (
+    "(SELECT coalesce(group_concat(a.name, ' '), '') FROM authors a "
+    "JOIN book_author ba ON ba.author_id = a.id WHERE ba.book_id = {book_id})"
+)
+_AUTHOR_BIOS = (
+    "(SELECT coalesce(group_concat(a.biography, ' '), '') FROM authors a "
+    "JOIN book_author ba ON ba.author_id = a.id WHERE ba.book_id = {book_id})"
+)
+
+
+def _refresh_authors(book_id: str) -> str:
+    return (
+        f"UPDATE {FTS_TABLE} SET author_names = {_AUTHOR_NAMES.format(book_id=book_id)}, "
+        f"author_bios = {_AUTHOR_BIOS.format(book_id=book_id)} WHERE rowid = {book_id};"
+    )
+
+
+SEARCH_DDL = (
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        title, description, author_names, author_bios, owner_id,
+        tokenize = 'unicode61 remove_diacritics 2'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS books_fts_insert AFTER INSERT ON books BEGIN
+        INSERT INTO {FTS_TABLE} (rowid, title, description, author_names, author_bios, owner_id)
+        VALUES (new.id, new.title, coalesce(new.description, ''), '', '', new.owner_id);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS books_fts_update AFTER UPDATE OF title, description, owner_id ON books BEGIN
+        UPDATE {FTS_TABLE} SET title = new.title, description = coalesce(new.description, ''),
+            owner_id = new.owner_id
+        WHERE rowid = new.id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS books_fts_delete AFTER DELETE ON books BEGIN
+        DELETE FROM {FTS_TABLE} WHERE rowid = old.id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS books_fts_link AFTER INSERT ON book_author BEGIN
+        {_refresh_authors("new.book_id")}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS books_fts_unlink AFTER DELETE ON book_author BEGIN
+        {_refresh_authors("old.book_id")}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS books_fts_author_update AFTER UPDATE OF name, biography ON authors BEGIN
+        UPDATE {FTS_TABLE} SET author_names = {_AUTHOR_NAMES.format(book_id=f"{FTS_TABLE}.rowid")},
+            author_bios = {_AUTHOR_BIOS.format(book_id=f"{FTS_TABLE}.rowid")}
+        WHERE rowid IN (SELECT book_id FROM book_author WHERE author_id = new.id);
+    END""",
+)
+
+SEARCH_TRIGGERS = (
+    "books_fts_insert", "books_fts_update", "books_fts_delete",
+    "books_fts_link", "books_fts_unlink", "books_fts_author_update",
+)
+
+# Backfill for databases created before the index existed
+SEARCH_BACKFILL = f"""
+    INSERT INTO {FTS_TABLE} (rowid, title, description, author_names, author_bios, owner_id)
+    SELECT b.id, b.title, coalesce(b.description, ''),
+        {_AUTHOR_NAMES.format(book_id="b.id")}, {_AUTHOR_BIOS.format(book_id="b.id")}, b.owner_id
+    FROM books b
+"""
+
+SEARCH_QUERY = text(f"""
+    SELECT rowid,
+        bm25({FTS_TABLE}, {", ".join(str(w) for w in BM25_WEIGHTS)}) AS rank,
+        highlight({FTS_TABLE}, 0, :open, :close) AS title,
+        snippet({FTS_TABLE}, 1, :open, :close, '…', :tokens) AS snippet
+    FROM {FTS_TABLE}
+    WHERE {FTS_TABLE} MATCH :query
+    ORDER BY rank
+    LIMIT :limit OFFSET :skip
+""")
+
+
+def create_search_index(conn: Connection) -> None:
+    """Create the FTS5 table and its triggers on ``conn``, backfilling it on first creation"""
+    if conn.dialect.name != "sqlite":
+        return
+    exists = conn.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+        {"name": FTS_TABLE},
+    ).first()
+    for statement in SEARCH_DDL:
+        conn.execute(text(statement))
+    if not exists:
+        conn.execute(text(SEARCH_BACKFILL))
+
+
+def init_search_index(bind: Engine) -> None:
+    """Create the FTS5 table and its triggers in their own transaction"""
+    with bind.begin() as conn:
+        create_search_index(conn)
+
+
+def drop_search_index(bind: Engine) -> None:
+    """Drop the FTS5 table and its triggers, e.g. before a bulk load.
+
+    ``init_search_index`` recreates and backfills it in one pass, which is
+    much faster than maintaining it row by row through the triggers.
+    """
+    if bind.dialect.name != "sqlite":
+        return
+    with bind.begin() as conn:
+        for trigger in SEARCH_TRIGGERS:
+            conn.execute(text(f"DROP TRIGGER IF EXISTS {trigger}"))
+        conn.execute(text(f"DROP TABLE IF EXISTS {FTS_TABLE}"))
+        # Otherwise init_db would find its schema version current and skip the rebuild
+        reset_schema_version(conn)
+
+
+def build_match_query(q: str, owner_id: int) -> str:
+    """Turn free text into a safe FTS5 expression scoped to one owner.
+
+    Words are quoted (so FTS5 operators in user input are inert) and AND-ed;
+    the last one matches as a prefix for search-as-you-type.
+    """
+    terms = _TERM_RE.findall(q)[:MAX_QUERY_TERMS]
+    if not terms:
+        raise ValidationError(
+            message="Search query must contain at least one word",
+            error_code="INVALID_SEARCH_QUERY",
+        )
+    phrases = [f'"{term}"' for term in terms]
+    phrases[-1] += "*"
+    return f'owner_id : "{owner_id}" AND {SEARCHABLE_COLUMNS} : ({" ".join(phrases)})'
+
+
+def render_highlight(value: str) -> str:
+    """Escape FTS5 output for HTML and wrap its matches in ``<mark>``"""
+    return html.escape(value).replace(_MATCH_OPEN, HIGHLIGHT_OPEN).replace(_MATCH_CLOSE, HIGHLIGHT_CLOSE)
+
+
+def search_book_ids(db: Session, owner_id: int, q: str, limit: int, skip: int = 0) -> List[Tuple[int, float, str, str]]:
+    """Return ``(book_id, score, highlighted_title, snippet)`` best match first"""
+    if db.get_bind().dialect.name != "sqlite":
+        raise ValidationError(message="Full-text search requires SQLite", error_code="SEARCH_UNAVAILABLE")
+    rows = db.execute(SEARCH_QUERY, {
+        "query": build_match_query(q, owner_id),
+        "open": _MATCH_OPEN,
+        "close": _MATCH_CLOSE,
+        "tokens": SNIPPET_TOKENS,
+        "limit": limit,
+        "skip": skip,
+    })
+    # bm25 is negative, lower is better; expose a positive "higher is better" score
+    return [
+        (book_id, -rank, render_highlight(title), render_highlight(snippet))
+        for book_id, rank, title, snippet in rows
+    ]
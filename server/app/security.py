@@ -1,18 +1,31 @@
-from passlib.context import CryptContext
+from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import Optional
-from jose import JWTError, jwt
+from typing import Optional, Tuple
+import hashlib
+import os
+import time
 from fastapi import Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, object_session
+from starlette.concurrency import run_in_threadpool
 
-from app.exceptions import InvalidTokenError
+from app.cache import TTLCache
+from app.database import SessionLocal
+from app.models import User
+from app.exceptions import InvalidTokenError, ResourceNotFoundError, ServiceUnavailableError
+from app.password_hashing import (
+    HashingOverloaded,
+    PASSWORD_HASH_RETRY_AFTER,
+    hash_password,
+    password_hasher,
+    verify_and_update_password,
+)
 from app.logging_config import get_logger
+from app.metrics import PASSWORD_HASH_DURATION
 
 logger = get_logger(__name__)
 
-# Password hashing configuration
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 # JWT configuration
 SECRET_KEY = "your-secret-key-change-this-in-production"  # Change this!
 ALGORITHM = "HS256"
@@ -20,15 +33,51 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
 security = HTTPBearer()
 
+# Verified-token cache: sha256(token) -> subject, never kept past the token's exp
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "4096"))
+token_cache = TTLCache(maxsize=TOKEN_CACHE_SIZE, ttl=ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+
+# Token subject (email) -> CurrentUser, so protected routes skip the user lookup.
+# Changes are invalidated in this process only: other workers and replicas keep
+# a changed email or a deleted user until the TTL expires, so keep it short.
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "1024"))
+USER_CACHE_TTL_SECONDS = float(os.getenv("USER_CACHE_TTL_SECONDS", "30"))
+user_cache = TTLCache(maxsize=USER_CACHE_SIZE, ttl=USER_CACHE_TTL_SECONDS)
+
+
+@dataclass(frozen=True)
+class CurrentUser:
+    """Lightweight authenticated user record (no ORM session attached)"""
+    id: int
+    email: str
+
 
-def hash_password(password: str) -> str:
-    """Hash a password using bcrypt"""
-    return pwd_context.hash(password)
+async def _run_hashing(operation: str, func, *args):
+    start = time.perf_counter()
+    try:
+        result = await password_hasher.run(func, *args)
+    except HashingOverloaded:
+        logger.warning("Password hashing backlog full, rejecting request")
+        raise ServiceUnavailableError(
+            message="Server busy, please retry shortly",
+            retry_after=PASSWORD_HASH_RETRY_AFTER,
+        )
+    PASSWORD_HASH_DURATION.observe(time.perf_counter() - start, operation)
+    return result
+
+
+async def hash_password_async(password: str) -> str:
+    """Hash a password on the hashing pool (503 when its backlog is full)"""
+    return await _run_hashing("hash", hash_password, password)
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a password against its hash"""
-    return pwd_context.verify(plain_password, hashed_password)
+async def verify_password_async(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verify a password on the hashing pool.
+
+    Returns ``(valid, new_hash)`` where ``new_hash`` is set when the stored
+    hash uses an outdated scheme or bcrypt cost and should be replaced.
+    """
+    return await _run_hashing("verify", verify_and_update_password, plain_password, hashed_password)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -39,20 +88,110 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     else:
         expire = datetime.utcnow() + timedelta(minutes=15)
     to_encode.update({"exp": expire})
+    from jose import jwt  # deferred: python-jose pulls in its RSA/EC backends
+
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
 
-def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)) -> str:
-    """Verify JWT token and return user email"""
-    token = credentials.credentials
+def decode_token_subject(token: str) -> str:
+    """Verify a JWT and return its 'sub' claim, using the verified-token cache.
+
+    Only tokens that passed signature and claim checks are cached, keyed by a
+    digest of the exact token bytes, and each entry expires with its ``exp``.
+    """
+    key = hashlib.sha256(token.encode()).digest()
+    email = token_cache.get(key)
+    if email is not None:
+        return email
+
+    from jose import JWTError, jwt
+
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
-            logger.warning("Token missing 'sub' claim")
-            raise InvalidTokenError()
-        return email
     except JWTError as e:
         logger.warning(f"Invalid JWT token: {str(e)}")
         raise InvalidTokenError()
+
+    email = payload.get("sub")
+    if email is None:
+        logger.warning("Token missing 'sub' claim")
+        raise InvalidTokenError()
+
+    exp = payload.get("exp")
+    ttl = token_cache.ttl if exp is None else min(token_cache.ttl, exp - time.time())
+    if ttl > 0:
+        token_cache.set(key, email, ttl=ttl)
+    return email
+
+
+async def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)) -> str:
+    """Verify JWT token and return user email.
+
+    Declared async so the (CPU-only) decode runs on the event loop instead of
+    taking a threadpool slot, which async handlers rely on.
+    """
+    return decode_token_subject(credentials.credentials)
+
+
+def _load_current_user(email: str) -> Optional[CurrentUser]:
+    db = SessionLocal()
+    try:
+        row = db.query(User.id, User.email).filter(User.email == email).first()
+    finally:
+        db.close()
+    return CurrentUser(id=row.id, email=row.email) if row else None
+
+
+async def get_current_user(email: str = Depends(verify_token)) -> CurrentUser:
+    """Resolve the token subject to a user, served from user_cache when possible"""
+    current_user = user_cache.get(email)
+    if current_user is None:
+        current_user = await run_in_threadpool(_load_current_user, email)
+        if current_user is None:
+            raise ResourceNotFoundError("User", email)
+        user_cache.set(email, current_user)
+    return current_user
+
+
+def invalidate_user_cache(email: str) -> None:
+    """Drop a cached user record (email/password change, deletion)"""
+    user_cache.pop(email)
+
+
+# Users changed by a session are collected at flush and dropped from the cache
+# only once the transaction commits: dropping them at flush would let a
+# concurrent request cache the old row again before the commit, and a rollback
+# would drop entries that are still valid.
+_STALE_USERS_KEY = "stale_user_emails"
+
+
+def _mark_stale(target: User, *emails: Optional[str]) -> None:
+    session = object_session(target)
+    if session is None:
+        return
+    session.info.setdefault(_STALE_USERS_KEY, set()).update(email for email in emails if email)
+
+
+@event.listens_for(User, "after_update")
+def _invalidate_on_update(_mapper, _connection, target: User) -> None:
+    state = inspect(target)
+    email_history = state.attrs.email.history
+    if email_history.has_changes() or state.attrs.hashed_password.history.has_changes():
+        _mark_stale(target, *email_history.deleted, target.email)
+
+
+@event.listens_for(User, "after_delete")
+def _invalidate_on_delete(_mapper, _connection, target: User) -> None:
+    _mark_stale(target, target.email)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session: Session) -> None:
+    for email in session.info.pop(_STALE_USERS_KEY, ()):
+        invalidate_user_cache(email)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_after_rollback(session: Session) -> None:
+    session.info.pop(_STALE_USERS_KEY, None)
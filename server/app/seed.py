@@ -0,0 +1,230 @@
+"""
+Deterministic synthetic dataset for benchmarks.
+
+Generates ``--users`` users, ``--authors`` authors and ``--books`` books in
+the database of ``DATABASE_URL`` (created if needed):
+
+- book ownership and author popularity follow Zipf-like distributions, and
+  books have 1 to 3 authors (80% / 15% / 5%);
+- ISBN-13s with valid check digits, derived from the book id;
+- titles, descriptions and biographies of varied lengths (some empty),
+  drawn from a generated vocabulary.
+
+Rows go through SQLAlchemy Core ``executemany`` inserts of ``--batch-size``
+rows, all in one transaction. On SQLite the full-text index and its
+triggers are dropped for the whole load and rebuilt in a single pass at the
+end (``--skip-search-index`` leaves it out).
+
+This is not a matter of seconds at the top end: generating rows and binding
+their parameters in Python bounds the load at roughly 10,000 books (with
+their author links) per second, and the index rebuild adds about as much
+again, so 1M books take a few minutes. Ids continue after the existing rows, and everything
+(text, timestamps, relationships) derives from ``--seed``, so the same
+command on the same database produces the same data.
+
+Every user gets the password ``--password``, hashed once.
+
+Usage (from the server directory):
+    DATABASE_URL=sqlite:///./bench.db python -m app.seed --users 1000 --authors 50000 --books 1000000
+"""
+
+import argparse
+import itertools
+import random
+import time
+from bisect import bisect
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.engine import Connection
+
+from app import sql_profiler
+from app.database import engine, init_db
+from app.models import Author, Book, User, book_author_association
+from app.password_hashing import hash_password
+
+EPOCH = datetime(2015, 1, 1)
+SPAN_SECONDS = 10 * 365 * 24 * 3600
+STREAM_WORDS = 1 << 18
+AUTHOR_FANOUT = ((1, 80), (2, 15), (3, 5))
+SYLLABLES = [c + v for c in "bcdfglmnprstv" for v in ("a", "e", "i", "o", "u", "ou", "ai", "an", "on")]
+
+
+class Generator:
+    """Random text and distributions, all derived from one seed"""
+
+    def __init__(self, seed: int, vocabulary_size: int = 5000) -> None:
+        self.rng = random.Random(seed)
+        words = set()
+        while len(words) < vocabulary_size:
+            words.add("".join(self.rng.choices(SYLLABLES, k=self.rng.randint(1, 4))))
+        self.vocabulary = sorted(words)
+        self.word_weights = _zipf_cum_weights(len(self.vocabulary), 1.0)
+        self.first_names = [w.capitalize() for w in self.rng.sample(self.vocabulary, 300)]
+        self.last_names = [w.capitalize() for w in self.rng.sample(self.vocabulary, 1000)]
+        # Texts are random slices of one Zipf-distributed word stream, much
+        # cheaper than drawing every word of a million descriptions
+        self.stream = self.rng.choices(self.vocabulary, cum_weights=self.word_weights, k=STREAM_WORDS)
+
+    def _slice(self, count: int) -> str:
+        count = min(count, STREAM_WORDS)
+        start = self.rng.randrange(STREAM_WORDS - count + 1)
+        return " ".join(self.stream[start:start + count])
+
+    def words(self, low: int, high: int) -> str:
+        return self._slice(self.rng.randint(low, high))
+
+    def text(self, median_words: int, empty_ratio: float) -> Any:
+        if self.rng.random() < empty_ratio:
+            return None
+        # Log-normal lengths: mostly short, with a long tail
+        count = max(1, int(self.rng.lognormvariate(0, 0.6) * median_words))
+        return self._slice(count).capitalize() + "."
+
+    def timestamp(self) -> datetime:
+        return EPOCH + timedelta(seconds=self.rng.randrange(SPAN_SECONDS))
+
+    def pick(self, first_id: int, cum_weights: Sequence[float]) -> int:
+        """Id drawn from ``first_id, first_id + 1, ...`` with ``cum_weights``"""
+        return first_id + bisect(cum_weights, self.rng.random() * cum_weights[-1])
+
+
+def _zipf_cum_weights(size: int, exponent: float) -> List[float]:
+    return list(itertools.accumulate(1 / (rank + 1) ** exponent for rank in range(size)))
+
+
+def isbn13(number: int) -> str:
+    digits = f"978{number % 10 ** 9:09d}"
+    total = sum(map(int, digits[::2])) + 3 * sum(map(int, digits[1::2]))
+    return f"{digits}{(10 - total % 10) % 10}"
+
+
+def _next_id(column) -> int:
+    with engine.connect() as conn:
+        return (conn.execute(select(func.max(column))).scalar() or 0) + 1
+
+
+def _load(conn: Connection, table, rows: Iterable[Dict[str, Any]], batch_size: int) -> int:
+    """Insert ``rows`` on ``conn`` with one executemany per batch"""
+    total = 0
+    iterator = iter(rows)
+    while batch := list(itertools.islice(iterator, batch_size)):
+        conn.execute(insert(table), batch)
+        total += len(batch)
+    return total
+
+
+def user_rows(gen: Generator, first_id: int, count: int, password_hash: str) -> Iterator[Dict[str, Any]]:
+    for user_id in range(first_id, first_id + count):
+        created = gen.timestamp()
+        yield {
+            "id": user_id, "email": f"user{user_id}@seed.example.com", "hashed_password": password_hash,
+            "created_at": created, "updated_at": created, "demo": 0,
+        }
+
+
+def author_rows(gen: Generator, first_id: int, count: int) -> Iterator[Dict[str, Any]]:
+    for author_id in range(first_id, first_id + count):
+        created = gen.timestamp()
+        yield {
+            "id": author_id,
+            "name": f"{gen.rng.choice(gen.first_names)} {gen.rng.choice(gen.last_names)}",
+            "biography": gen.text(60, empty_ratio=0.3),
+            "created_at": created, "updated_at": created,
+        }
+
+
+def book_and_link_rows(gen: Generator, first_id: int, count: int, users: range, authors: range,
+                       links: List[Dict[str, int]]) -> Iterator[Dict[str, Any]]:
+    """Yield book rows and append their author links to ``links``"""
+    owner_weights = _zipf_cum_weights(len(users), 0.8)
+    author_weights = _zipf_cum_weights(len(authors), 0.9)
+    fanouts, fanout_weights = zip(*AUTHOR_FANOUT)
+    for book_id in range(first_id, first_id + count):
+        created = gen.timestamp()
+        # Mostly recent publications, a few undated
+        year = None if gen.rng.random() < 0.05 else max(1450, 2024 - int(gen.rng.expovariate(1 / 30)))
+        yield {
+            "id": book_id,
+            "title": gen.words(1, 8).capitalize(),
+            "description": gen.text(80, empty_ratio=0.1),
+            "isbn": isbn13(book_id),
+            "published_year": year,
+            "owner_id": gen.pick(users.start, owner_weights),
+            "created_at": created, "updated_at": created,
+        }
+        chosen = set()
+        for _ in range(gen.rng.choices(fanouts, fanout_weights)[0]):
+            chosen.add(gen.pick(authors.start, author_weights))
+        links.extend({"book_id": book_id, "author_id": author_id} for author_id in sorted(chosen))
+
+
+def _timed(label: str, step: Callable[[], Optional[int]]) -> None:
+    start = time.perf_counter()
+    rows = step()
+    elapsed = time.perf_counter() - start
+    if rows is None:
+        print(f"{label:<14}{'':>17} {elapsed:7.1f}s")
+        return
+    rate = f", {rows / elapsed:,.0f} rows/s" if rows and elapsed else ""
+    print(f"{label:<14}{rows:>12,} rows in {elapsed:7.1f}s{rate}")
+
+
+def seed(users: int, authors: int, books: int, seed_value: int = 42, batch_size: int = 100_000,
+         password: str = "password", search_index: bool = True) -> None:
+    init_db()
+    from app.search import drop_search_index, init_search_index
+
+    gen = Generator(seed_value)
+    first_user, first_author, first_book = _next_id(User.id), _next_id(Author.id), _next_id(Book.id)
+    user_ids = range(first_user, first_user + users)
+    author_ids = range(first_author, first_author + authors)
+    if books and (not users or not authors):
+        raise SystemExit("books need at least one user and one author")
+
+    drop_search_index(engine)
+    password_hash = hash_password(password)
+
+    def load_books(conn: Connection) -> int:
+        # Links are written per book batch so they never pile up in memory
+        links: List[Dict[str, int]] = []
+        rows = book_and_link_rows(gen, first_book, books, user_ids, author_ids, links)
+        total = 0
+        while batch := list(itertools.islice(rows, batch_size)):
+            conn.execute(insert(Book.__table__), batch)
+            conn.execute(insert(book_author_association), links)
+            total += len(batch)
+            links.clear()
+        return total
+
+    # One transaction for the whole load: no commit (and fsync) per batch
+    with engine.begin() as conn:
+        _timed("users", lambda: _load(conn, User.__table__, user_rows(gen, first_user, users, password_hash), batch_size))
+        _timed("authors", lambda: _load(conn, Author.__table__, author_rows(gen, first_author, authors), batch_size))
+        _timed("books+links", lambda: load_books(conn))
+    if search_index:
+        _timed("search index", lambda: init_search_index(engine))
+    else:
+        print("search index  skipped (run init_db to rebuild it)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--authors", type=int, default=10_000)
+    parser.add_argument("--books", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--batch-size", type=int, default=100_000, help="rows per executemany")
+    parser.add_argument("--password", default="password", help="password of every generated user")
+    parser.add_argument("--skip-search-index", action="store_true")
+    args = parser.parse_args()
+
+    # Every batch is a "slow query"; the warnings would drown the timings
+    sql_profiler.SLOW_QUERY_THRESHOLD_MS = 0
+    print(f"seeding {engine.url.render_as_string(hide_password=True)}")
+    seed(args.users, args.authors, args.books, args.seed, args.batch_size, args.password, not args.skip_search_index)
+
+
+if __name__ == "__main__":
+    main()
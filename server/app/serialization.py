@@ -0,0 +1,52 @@
+"""Fast serialization path for list responses.
+
+By default FastAPI validates a returned ORM list against ``response_model``
+and then JSON-encodes the result in a second pass. The helpers here validate
+once through a precompiled ``TypeAdapter`` (reading ORM attributes directly)
+and let pydantic-core emit the JSON bytes, which handlers return as-is.
+"""
+
+from typing import Any, List, Mapping, Optional
+
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from app.schemas import AuthorBatchResult, AuthorRead, BookRead, BookSearchHit
+
+try:  # optional, faster JSON encoder
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+BOOK_LIST_ADAPTER = TypeAdapter(List[BookRead])
+AUTHOR_ADAPTER = TypeAdapter(AuthorRead)
+AUTHOR_LIST_ADAPTER = TypeAdapter(List[AuthorRead])
+AUTHOR_BATCH_ADAPTER = TypeAdapter(AuthorBatchResult)
+SEARCH_HIT_LIST_ADAPTER = TypeAdapter(List[BookSearchHit])
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse that passes pre-serialized bytes through untouched and
+    encodes anything else with orjson when available."""
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        if orjson is not None:
+            return orjson.dumps(content)
+        return super().render(content)
+
+
+def dump_json(adapter: TypeAdapter, objects: Any) -> bytes:
+    """Validate ORM objects against ``adapter`` once and return JSON bytes"""
+    return adapter.dump_json(adapter.validate_python(objects, from_attributes=True))
+
+
+def serialized_response(
+    adapter: TypeAdapter,
+    objects: Any,
+    status_code: int = 200,
+    headers: Optional[Mapping[str, str]] = None,
+) -> FastJSONResponse:
+    """Build a response from ORM objects, skipping FastAPI's second validation pass"""
+    return FastJSONResponse(dump_json(adapter, objects), status_code=status_code, headers=headers)
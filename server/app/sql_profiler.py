@@ -0,0 +1,117 @@
+"""Per-request SQL profiling and slow-query log.
+
+``RequestContextMiddleware`` opens a ``RequestProfile`` for every request
+(in a context variable, so it follows the request into threadpool workers
+and SQLAlchemy's async greenlets), and the cursor events registered by
+``profile_engine`` add each statement's count and time to it. The totals
+are logged with the access line (``db_queries`` / ``db_time_ms``) and, with
+``SQL_PROFILER_HEADERS`` (on when ``DEBUG`` is), returned as the
+``X-DB-Queries`` / ``X-DB-Time`` response headers. Headers are written when
+the response starts, so statements run while streaming a body only show up
+in the log.
+
+Statements slower than ``SLOW_QUERY_THRESHOLD_MS`` are logged as a warning
+with the request ID, their normalized SQL (literals and ``IN`` lists
+collapsed, so occurrences group together) and, on SQLite, the
+``EXPLAIN QUERY PLAN`` output.
+"""
+
+import os
+import re
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+SQL_PROFILER_HEADERS = os.getenv("SQL_PROFILER_HEADERS", os.getenv("DEBUG", "false")).lower() == "true"
+# 0 disables the slow-query log
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", "100"))
+SLOW_QUERY_EXPLAIN = os.getenv("SLOW_QUERY_EXPLAIN", "true").lower() == "true"
+
+DB_QUERIES_HEADER = "X-DB-Queries"
+DB_TIME_HEADER = "X-DB-Time"
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_PARAMS_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_SPACE_RE = re.compile(r"\s+")
+
+
+@dataclass
+class RequestProfile:
+    request_id: Optional[str] = None
+    queries: int = 0
+    seconds: float = 0.0
+
+    @property
+    def milliseconds(self) -> float:
+        return round(self.seconds * 1000, 3)
+
+    def headers(self) -> List[tuple]:
+        return [(DB_QUERIES_HEADER, str(self.queries)), (DB_TIME_HEADER, f"{self.milliseconds:.3f}")]
+
+
+current_profile: ContextVar[Optional[RequestProfile]] = ContextVar("sql_request_profile", default=None)
+
+
+def normalize_sql(statement: str) -> str:
+    """Collapse whitespace, literals and parameter lists so similar statements compare equal"""
+    normalized = _STRING_RE.sub("?", statement)
+    normalized = _NUMBER_RE.sub("?", normalized)
+    normalized = _SPACE_RE.sub(" ", normalized).strip()
+    return _PARAMS_RE.sub("(...)", normalized)
+
+
+def _explain(conn: Any, statement: str, parameters: Any, executemany: bool) -> Optional[List[str]]:
+    if not SLOW_QUERY_EXPLAIN or conn.dialect.name != "sqlite":
+        return None
+    if executemany and parameters:
+        parameters = parameters[0]
+    try:
+        cursor = conn.connection.dbapi_connection.cursor()
+        try:
+            cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters or ())
+            return [row[-1] for row in cursor.fetchall()]
+        finally:
+            cursor.close()
+    except Exception as exc:  # DDL, PRAGMA, ... have no plan
+        return [f"unavailable: {exc}"]
+
+
+def profile_engine(engine: Engine) -> None:
+    """Attribute statements of ``engine`` to the current request and log slow ones"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context._profile_start = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        start = getattr(context, "_profile_start", None)
+        if start is None:
+            return
+        elapsed = time.perf_counter() - start
+        profile = current_profile.get()
+        if profile is not None:
+            profile.queries += 1
+            profile.seconds += elapsed
+
+        if SLOW_QUERY_THRESHOLD_MS > 0 and elapsed * 1000 >= SLOW_QUERY_THRESHOLD_MS:
+            normalized = normalize_sql(statement)
+            logger.warning(
+                f"Slow query ({elapsed * 1000:.1f} ms): {normalized[:200]}",
+                extra={'extra_data': {
+                    'request_id': profile.request_id if profile else None,
+                    'duration_ms': round(elapsed * 1000, 3),
+                    'statement': normalized,
+                    'executemany': executemany,
+                    'query_plan': _explain(conn, statement, parameters, executemany),
+                }}
+            )
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Load test comparing the sync (threadpool) and async (aiosqlite) data paths.
+
+Spawns a uvicorn worker per mode on a throwaway database, seeds one user with
+books and authors, then drives concurrent GETs on /api/books/ and
+/api/authors/ and reports requests/sec with p50/p99 latency.
+
+Requires httpx and aiosqlite. Usage (from the server directory):
+    python -m benchmarks.async_vs_sync --concurrency 200 --duration 10
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Dict, List
+
+import httpx
+
+from benchmarks.common import free_port, percentile, start_server, wait_ready
+
+
+async def _seed(client: httpx.AsyncClient, books: int) -> Dict[str, str]:
+    creds = {"email": "bench@example.com", "password": "bench-password"}
+    await client.post("/api/users/register", json=creds)
+    token = (await client.post("/api/users/login", json=creds)).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    author_ids = []
+    for i in range(10):
+        resp = await client.post("/api/authors/", json={"name": f"Author {i}"}, headers=headers)
+        author_ids.append(resp.json()["id"])
+    for i in range(books):
+        await client.post(
+            "/api/books/",
+            json={"title": f"Book {i}", "author_ids": author_ids[i % 10:i % 10 + 2]},
+            headers=headers,
+        )
+    return headers
+
+
+async def _drive(base_url: str, headers: Dict[str, str], concurrency: int, duration: float) -> Dict[str, float]:
+    latencies: List[float] = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+    paths = ["/api/books/?limit=20", "/api/authors/?limit=20"]
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, headers=headers, limits=limits, timeout=30) as client:
+        async def user(n: int) -> None:
+            nonlocal errors
+            i = n
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                try:
+                    resp = await client.get(paths[i % len(paths)])
+                    if resp.status_code != 200:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - start)
+                i += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(user(n) for n in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+    }
+
+
+async def run_mode(async_mode: bool, args: argparse.Namespace) -> Dict[str, float]:
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    proc = start_server(port, {"ASYNC_DB": "true" if async_mode else "false"})
+    try:
+        async with httpx.AsyncClient(base_url=base_url, timeout=30) as client:
+            await wait_ready(client)
+            headers = await _seed(client, args.books)
+        return await _drive(base_url, headers, args.concurrency, args.duration)
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--books", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'mode':<8}{'requests':>10}{'errors':>8}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    for label, async_mode in (("sync", False), ("async", True)):
+        r = asyncio.run(run_mode(async_mode, args))
+        print(
+            f"{label:<8}{r['requests']:>10}{r['errors']:>8}{r['rps']:>10.1f}"
+            f"{r['p50_ms']:>10.1f}{r['p99_ms']:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
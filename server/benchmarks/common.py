@@ -0,0 +1,71 @@
+"""Helpers shared by the HTTP benchmarks: spawn a throwaway API server."""
+
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+from typing import Dict, List, Optional
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def temp_database_url() -> str:
+    return f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='bench-'), 'bench.db')}"
+
+
+def start_server(
+    port: int, env_overrides: Optional[Dict[str, str]] = None, workers: int = 1, stdout: Optional[int] = None
+) -> subprocess.Popen:
+    """Run uvicorn on ``port`` with a fresh database unless one is given.
+
+    With ``stdout=subprocess.PIPE`` the server's output (stderr included) is
+    captured as text, e.g. to read its JSON log lines.
+    """
+    env = dict(os.environ)
+    env.update({
+        "DATABASE_URL": temp_database_url(),
+        "LOG_MODE": "PROD",
+        "LOG_LEVEL": "WARNING",
+        # Benchmarks log in from one address far faster than any client would
+        "AUTH_RATE_LIMIT_ENABLED": "false",
+    })
+    env.update(env_overrides or {})
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning",
+         "--workers", str(workers)],
+        cwd=SERVER_DIR,
+        env=env,
+        stdout=stdout,
+        stderr=subprocess.STDOUT if stdout is not None else None,
+        text=stdout is not None,
+    )
+
+
+async def wait_ready(client, attempts: int = 100) -> None:
+    """Poll the health endpoint with an httpx.AsyncClient until it answers"""
+    import httpx
+
+    for _ in range(attempts):
+        try:
+            if (await client.get("/")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.1)
+    raise RuntimeError("server did not start")
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Server memory while exporting a whole library.
+
+For each library size, spawns a uvicorn worker on a fresh database, imports
+that many books through POST /api/books/bulk, then downloads
+GET /api/books/export in each format while sampling the server's resident
+set size. Reports the peak RSS growth over the process right after the
+import, which should stay roughly flat as the library grows (what growth
+remains is SQLite's page cache and memory-mapped database pages). For
+reference, the same books fetched as one buffered ``GET /api/books/?limit=N``
+page are measured too.
+
+Linux only (reads /proc/<pid>/status). Requires httpx. Usage (from the
+server directory):
+    python -m benchmarks.export_memory --sizes 10000 50000 100000
+"""
+
+import argparse
+import asyncio
+import json
+import threading
+import time
+from typing import Dict, List
+
+import httpx
+
+from benchmarks.common import free_port, start_server, wait_ready
+
+CREDS = {"email": "export@example.com", "password": "export-password"}
+
+
+def rss_kb(pid: int) -> int:
+    with open(f"/proc/{pid}/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    return 0
+
+
+class RSSSampler:
+    """Samples a process' RSS in a background thread and keeps the peak"""
+
+    def __init__(self, pid: int, interval: float = 0.01) -> None:
+        self.pid = pid
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.peak = max(self.peak, rss_kb(self.pid))
+            time.sleep(self.interval)
+
+    def __enter__(self) -> "RSSSampler":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+
+
+def _ndjson_books(count: int):
+    for i in range(count):
+        line = {
+            "title": f"Book {i}",
+            "description": "Lorem ipsum dolor sit amet " * 4,
+            "isbn": f"978{i:010d}",
+            "published_year": 1900 + i % 120,
+            "author_names": [f"Author {i % 50}", f"Author {(i + 1) % 50}"],
+        }
+        yield (json.dumps(line) + "\n").encode()
+
+
+async def _download(client: httpx.AsyncClient, path: str, headers: Dict[str, str]) -> int:
+    size = 0
+    async with client.stream("GET", path, headers=headers) as resp:
+        resp.raise_for_status()
+        async for chunk in resp.aiter_raw():
+            size += len(chunk)
+    return size
+
+
+async def run_size(count: int, formats: List[str]) -> Dict[str, Dict[str, float]]:
+    port = free_port()
+    proc = start_server(port)
+    results: Dict[str, Dict[str, float]] = {}
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=600) as client:
+            await wait_ready(client)
+            await client.post("/api/users/register", json=CREDS)
+            token = (await client.post("/api/users/login", json=CREDS)).json()["access_token"]
+            headers = {"Authorization": f"Bearer {token}"}
+
+            async def body():
+                for line in _ndjson_books(count):
+                    yield line
+
+            resp = await client.post(
+                "/api/books/bulk",
+                content=body(),
+                headers={**headers, "Content-Type": "application/x-ndjson"},
+            )
+            assert resp.json()["inserted"] == count, resp.text
+
+            paths = {fmt: f"/api/books/export?format={fmt}" for fmt in formats}
+            paths["list (buffered)"] = f"/api/books/?limit={count}"
+            # the buffered page goes last: memory it grabs is not handed back to the OS
+            baseline = rss_kb(proc.pid)
+            for label, path in paths.items():
+                start = time.perf_counter()
+                with RSSSampler(proc.pid) as sampler:
+                    size = await _download(client, path, headers)
+                results[label] = {
+                    "seconds": time.perf_counter() - start,
+                    "mb": size / 1e6,
+                    "peak_growth_mb": max(0, sampler.peak - baseline) / 1024,
+                }
+    finally:
+        proc.terminate()
+        proc.wait()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 50000, 100000])
+    parser.add_argument("--formats", nargs="+", default=["ndjson", "csv", "json"])
+    args = parser.parse_args()
+
+    print(f"{'books':>8}  {'endpoint':<16}{'seconds':>9}{'body MB':>9}{'peak RSS +MB':>14}")
+    for count in args.sizes:
+        for label, r in asyncio.run(run_size(count, args.formats)).items():
+            print(f"{count:>8}  {label:<16}{r['seconds']:>9.2f}{r['mb']:>9.1f}{r['peak_growth_mb']:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
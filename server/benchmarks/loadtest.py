@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+Reproducible HTTP load test with JSON reports and baseline comparison.
+
+Targets (``--target``):
+- ``asgi`` (default): the app in this process through ``httpx.ASGITransport``
+  (lifespan included), on a throwaway database;
+- ``uvicorn``: a spawned uvicorn (``--workers``) on a throwaway database;
+- any ``http(s)://`` URL: an already running server.
+
+Each of the ``--concurrency`` virtual users registers its own account and
+seeds a few books, then runs operations drawn from a weighted ``--mix``
+until ``--duration`` elapses (``--warmup`` seconds are run first and not
+measured). Every operation checks its status code, so the run doubles as a
+happy-path check of the API. Mixes are named (``browse``, ``write``,
+``login``) or given inline, e.g. ``--mix list_books=6,create_book=1``.
+
+The report (``--output``) holds throughput, error counts and p50/p95/p99
+latencies overall and per operation. With ``--baseline`` the run is
+compared to a stored report: a p95 more than ``--tolerance`` above the
+baseline, a throughput more than ``--tolerance`` below it or new errors are
+regressions, and the exit status is 1.
+
+Requires httpx. Usage (from the server directory):
+    python -m benchmarks.loadtest --duration 30 --output loadtest.json
+    python -m benchmarks.loadtest --duration 30 --baseline loadtest.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+from benchmarks.common import SERVER_DIR, free_port, percentile, start_server, temp_database_url, wait_ready
+
+MIXES: Dict[str, Dict[str, int]] = {
+    "browse": {"list_books": 40, "get_book": 20, "list_authors": 15, "search_books": 10,
+               "create_book": 8, "update_book": 5, "login": 2},
+    "write": {"create_book": 40, "update_book": 30, "list_books": 20, "get_book": 10},
+    "login": {"login": 1},
+}
+SEED_BOOKS = 5
+PASSWORD = "loadtest-password"
+
+
+@dataclass
+class VirtualUser:
+    index: int
+    email: str
+    headers: Dict[str, str] = field(default_factory=dict)
+    book_ids: List[int] = field(default_factory=list)
+    created: int = 0
+
+
+class Stats:
+    def __init__(self) -> None:
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.statuses: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+    def record(self, operation: str, elapsed: float, status: str, ok: bool) -> None:
+        self.latencies[operation].append(elapsed)
+        self.statuses[operation][status] += 1
+        if not ok:
+            self.errors[operation] += 1
+
+
+# ---- operations: (client, user, rng) -> response ----
+
+async def op_login(client: httpx.AsyncClient, user: VirtualUser, rng: random.Random) -> httpx.Response:
+    return await client.post("/api/users/login", json={"email": user.email, "password": PASSWORD})
+
+
+async def op_list_books(client: httpx.AsyncClient, user: VirtualUser, rng: random.Random) -> httpx.Response:
+    return await client.get("/api/books/", params={"limit": 20}, headers=user.headers)
+
+
+async def op_get_book(client: httpx.AsyncClient, user: VirtualUser, rng: random.Random) -> httpx.Response:
+    return await client.get(f"/api/books/{rng.choice(user.book_ids)}", headers=user.headers)
+
+
+async def op_list_authors(client: httpx.AsyncClient, user: VirtualUser, rng: random.Random) -> httpx.Response:
+    return await client.get("/api/authors/", params={"limit": 20}, headers=user.headers)
+
+
+async def op_search_books(client: httpx.AsyncClient, user: VirtualUser, rng: random.Random) -> httpx.Response:
+    return await client.get("/api/books/search", params={"q": rng.choice(["roman", "histoire", "nuit"])}, headers=user.headers)
+
+
+async def op_create_book(client: httpx.AsyncClient, user: VirtualUser, rng: random.Random) -> httpx.Response:
+    user.created += 1
+    response = await client.post("/api/books/", json=_book_payload(user, user.created), headers=user.headers)
+    if response.status_code == 201:
+        user.book_ids.append(response.json()["id"])
+    return response
+
+
+async def op_update_book(client: httpx.AsyncClient, user: VirtualUser, rng: random.Random) -> httpx.Response:
+    payload = {"description": f"Relu le {time.time():.0f}", "published_year": rng.randint(1800, 2024)}
+    return await client.put(f"/api/books/{rng.choice(user.book_ids)}", json=payload, headers=user.headers)
+
+
+Operation = Callable[[httpx.AsyncClient, VirtualUser, random.Random], Awaitable[httpx.Response]]
+OPERATIONS: Dict[str, Tuple[Operation, int]] = {
+    "login": (op_login, 200),
+    "list_books": (op_list_books, 200),
+    "get_book": (op_get_book, 200),
+    "list_authors": (op_list_authors, 200),
+    "search_books": (op_search_books, 200),
+    "create_book": (op_create_book, 201),
+    "update_book": (op_update_book, 200),
+}
+
+
+def _book_payload(user: VirtualUser, n: int) -> Dict[str, Any]:
+    words = ["Roman", "Histoire", "Nuit", "Voyage", "Mémoires"]
+    return {
+        "title": f"{words[n % len(words)]} {user.index}-{n}",
+        "description": f"{words[(n + 2) % len(words)].lower()} de la collection {user.index}",
+        "isbn": f"LT-{user.email.split('@')[0]}-{n}",
+    }
+
+
+def parse_mix(value: str) -> Dict[str, int]:
+    if value in MIXES:
+        return MIXES[value]
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise argparse.ArgumentTypeError(f"unknown operation {name!r} (known: {', '.join(OPERATIONS)})")
+        mix[name] = int(weight or 1)
+    return mix
+
+
+# ---- run ----
+
+async def _setup_user(client: httpx.AsyncClient, index: int, run_id: str) -> VirtualUser:
+    user = VirtualUser(index, f"vu{index}-{run_id}@loadtest.example.com")
+    credentials = {"email": user.email, "password": PASSWORD}
+    response = await client.post("/api/users/register", json=credentials)
+    response.raise_for_status()
+    response = await client.post("/api/users/login", json=credentials)
+    response.raise_for_status()
+    user.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    author = await client.post("/api/authors/", json={"name": f"Auteur {run_id} {index}"}, headers=user.headers)
+    author.raise_for_status()
+    for n in range(SEED_BOOKS):
+        user.created += 1
+        payload = {**_book_payload(user, user.created), "author_ids": [author.json()["id"]]}
+        response = await client.post("/api/books/", json=payload, headers=user.headers)
+        response.raise_for_status()
+        user.book_ids.append(response.json()["id"])
+    return user
+
+
+async def _virtual_user(client: httpx.AsyncClient, user: VirtualUser, mix: Dict[str, int], stats: Optional[Stats],
+                        deadline: float, seed: int) -> None:
+    rng = random.Random(seed)
+    names, weights = list(mix), list(mix.values())
+    while time.perf_counter() < deadline:
+        name = rng.choices(names, weights)[0]
+        operation, expected = OPERATIONS[name]
+        start = time.perf_counter()
+        try:
+            response = await operation(client, user, rng)
+            status, ok = str(response.status_code), response.status_code == expected
+        except httpx.HTTPError as exc:
+            status, ok = type(exc).__name__, False
+        if stats is not None:
+            stats.record(name, time.perf_counter() - start, status, ok)
+
+
+def _summary(latencies: List[float], errors: int, elapsed: float) -> Dict[str, Any]:
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+    }
+
+
+async def drive(client: httpx.AsyncClient, args: argparse.Namespace) -> Dict[str, Any]:
+    run_id = f"{int(time.time())}{os.getpid()}"
+    users = [await _setup_user(client, i, run_id) for i in range(args.concurrency)]
+
+    if args.warmup > 0:
+        deadline = time.perf_counter() + args.warmup
+        await asyncio.gather(*(_virtual_user(client, u, args.mix, None, deadline, args.seed + u.index) for u in users))
+
+    stats = Stats()
+    started = time.perf_counter()
+    deadline = started + args.duration
+    await asyncio.gather(*(
+        _virtual_user(client, u, args.mix, stats, deadline, args.seed * 1000 + u.index) for u in users
+    ))
+    elapsed = time.perf_counter() - started
+
+    all_latencies = [sample for samples in stats.latencies.values() for sample in samples]
+    return {
+        "meta": {
+            "target": args.target,
+            "mix": args.mix,
+            "concurrency": args.concurrency,
+            "duration_seconds": args.duration,
+            "workers": args.workers,
+            "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "env": {
+                name: os.environ[name]
+                for name in ("ASYNC_DB", "BCRYPT_ROUNDS", "AUTH_RATE_LIMIT_ENABLED") if name in os.environ
+            },
+        },
+        "total": _summary(all_latencies, sum(stats.errors.values()), elapsed),
+        "operations": {
+            name: {**_summary(samples, stats.errors[name], elapsed), "statuses": dict(stats.statuses[name])}
+            for name, samples in sorted(stats.latencies.items())
+        },
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=SERVER_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run_asgi(args: argparse.Namespace) -> Dict[str, Any]:
+    os.environ["DATABASE_URL"] = temp_database_url()
+    os.environ.setdefault("LOG_MODE", "PROD")
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    os.environ.setdefault("AUTH_RATE_LIMIT_ENABLED", "false")
+    # Imported after DATABASE_URL is set: the engine is created at import time
+    from main import app
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=60) as client:
+            return await drive(client, args)
+
+
+async def run_http(base_url: str, args: argparse.Namespace) -> Dict[str, Any]:
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        await wait_ready(client)
+        return await drive(client, args)
+
+
+async def run_uvicorn(args: argparse.Namespace) -> Dict[str, Any]:
+    port = free_port()
+    proc = start_server(port, workers=args.workers)
+    try:
+        return await run_http(f"http://127.0.0.1:{port}", args)
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+# ---- reporting ----
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Return the regressions of ``report`` against ``baseline``"""
+    regressions = []
+    pairs = [("total", report["total"], baseline.get("total"))]
+    pairs += [(name, result, baseline.get("operations", {}).get(name)) for name, result in report["operations"].items()]
+    for name, current, previous in pairs:
+        if not previous:
+            continue
+        if previous["p95_ms"] and current["p95_ms"] > previous["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {current['p95_ms']:.1f} ms vs {previous['p95_ms']:.1f} ms")
+        if name == "total" and current["rps"] < previous["rps"] * (1 - tolerance):
+            regressions.append(f"{name}: {current['rps']:.1f} req/s vs {previous['rps']:.1f} req/s")
+        if current["errors"] > previous["errors"]:
+            regressions.append(f"{name}: {current['errors']} errors vs {previous['errors']}")
+    return regressions
+
+
+def print_report(report: Dict[str, Any], baseline: Optional[Dict[str, Any]]) -> None:
+    print(f"{'operation':<14}{'requests':>9}{'errors':>8}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'base p95':>10}")
+    rows = list(report["operations"].items()) + [("total", report["total"])]
+    for name, r in rows:
+        previous = (baseline or {}).get("total") if name == "total" else (baseline or {}).get("operations", {}).get(name)
+        base = f"{previous['p95_ms']:>10.1f}" if previous else f"{'-':>10}"
+        print(f"{name:<14}{r['requests']:>9}{r['errors']:>8}{r['rps']:>9.1f}{r['p50_ms']:>9.1f}{r['p95_ms']:>9.1f}{r['p99_ms']:>9.1f}{base}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", default="asgi", help="asgi, uvicorn or a base URL")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers (--target uvicorn)")
+    parser.add_argument("--mix", type=parse_mix, default="browse", help=f"{', '.join(MIXES)} or op=weight,...")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--warmup", type=float, default=2.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write the JSON report here")
+    parser.add_argument("--baseline", help="JSON report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative regression (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    if args.target == "asgi":
+        report = asyncio.run(run_asgi(args))
+    elif args.target == "uvicorn":
+        report = asyncio.run(run_uvicorn(args))
+    else:
+        report = asyncio.run(run_http(args.target, args))
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+    print_report(report, baseline)
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump(report, output_file, indent=2)
+        print(f"report written to {args.output}")
+
+    failed = report["total"]["errors"] > 0
+    if baseline is not None:
+        regressions = compare(report, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        failed = failed or bool(regressions)
+        if not regressions:
+            print(f"no regression against {args.baseline} (tolerance {args.tolerance:.0%})")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Latency of cheap endpoints during a login storm.
+
+For each hashing mode, spawns a uvicorn worker, starts ``--logins`` concurrent
+login loops, and meanwhile probes GET /api/authors/ sequentially. Reports the
+probe's p50/p99 next to a quiet baseline, plus login throughput and 503s.
+
+Modes: ``inline`` (PASSWORD_HASH_WORKERS=0, bcrypt in the anyio threadpool)
+and ``pool`` (dedicated process pool). Requires httpx.
+
+Usage (from the server directory):
+    python -m benchmarks.login_storm --logins 64 --duration 10
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Dict, List
+
+import httpx
+
+from benchmarks.common import free_port, percentile, start_server, wait_ready
+
+CREDS = {"email": "storm@example.com", "password": "storm-password"}
+
+
+async def _probe(client: httpx.AsyncClient, headers: Dict[str, str], until: float) -> List[float]:
+    latencies = []
+    while time.perf_counter() < until:
+        start = time.perf_counter()
+        await client.get("/api/authors/", headers=headers)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+async def _login_loop(client: httpx.AsyncClient, until: float, stats: Dict[str, int]) -> None:
+    while time.perf_counter() < until:
+        resp = await client.post("/api/users/login", json=CREDS)
+        if resp.status_code == 200:
+            stats["ok"] += 1
+        elif resp.status_code == 503:
+            stats["rejected"] += 1
+            await asyncio.sleep(float(resp.headers.get("Retry-After", "1")))
+        else:
+            stats["errors"] += 1
+
+
+async def run_mode(workers: int, args: argparse.Namespace) -> Dict[str, float]:
+    port = free_port()
+    proc = start_server(port, {"PASSWORD_HASH_WORKERS": str(workers)})
+    limits = httpx.Limits(max_connections=args.logins + 10)
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=60, limits=limits) as client:
+            await wait_ready(client)
+            await client.post("/api/users/register", json=CREDS)
+            token = (await client.post("/api/users/login", json=CREDS)).json()["access_token"]
+            headers = {"Authorization": f"Bearer {token}"}
+
+            quiet = await _probe(client, headers, time.perf_counter() + 2)
+
+            stats = {"ok": 0, "rejected": 0, "errors": 0}
+            until = time.perf_counter() + args.duration
+            storm = [asyncio.create_task(_login_loop(client, until, stats)) for _ in range(args.logins)]
+            loaded = await _probe(client, headers, until)
+            await asyncio.gather(*storm)
+    finally:
+        proc.terminate()
+        proc.wait()
+
+    return {
+        "quiet_p50": percentile(quiet, 50) * 1000,
+        "quiet_p99": percentile(quiet, 99) * 1000,
+        "storm_p50": percentile(loaded, 50) * 1000,
+        "storm_p99": percentile(loaded, 99) * 1000,
+        "logins_per_sec": stats["ok"] / args.duration,
+        "rejected": stats["rejected"],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=64, help="concurrent login loops")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--workers", type=int, default=2, help="hashing pool size for the pool mode")
+    args = parser.parse_args()
+
+    print(
+        f"{'mode':<8}{'quiet p50':>11}{'quiet p99':>11}{'storm p50':>11}{'storm p99':>11}"
+        f"{'logins/s':>10}{'503s':>7}"
+    )
+    for label, workers in (("inline", 0), ("pool", args.workers)):
+        r = asyncio.run(run_mode(workers, args))
+        print(
+            f"{label:<8}{r['quiet_p50']:>11.1f}{r['quiet_p99']:>11.1f}{r['storm_p50']:>11.1f}"
+            f"{r['storm_p99']:>11.1f}{r['logins_per_sec']:>10.1f}{r['rejected']:>7}"
+        )
+    print("latencies in ms")
+
+
+if __name__ == "__main__":
+    main()
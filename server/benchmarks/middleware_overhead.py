@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Per-request overhead of the request-tracking middleware.
+
+Runs a trivial POST endpoint in-process (httpx ASGITransport) behind:
+  - no middleware (floor)
+  - the former stack: three BaseHTTPMiddleware layers (request ID, logging
+    with body buffering, correlation ID), reproduced here for comparison
+  - app.middleware.RequestContextMiddleware
+and reports the mean cost per request above the floor. Access logs are
+discarded so only middleware work is measured. Requires httpx.
+
+Usage (from the server directory):
+    python -m benchmarks.middleware_overhead --requests 5000 --body-kb 64
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+import uuid
+
+import httpx
+from fastapi import FastAPI, Request
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.middleware import RequestContextMiddleware
+
+access_logger = logging.getLogger("app.middleware")
+
+
+class LegacyRequestIDMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        request_id = request.headers.get("X-Request-ID") or str(uuid.uuid4())
+        request.state.request_id = request_id
+        response = await call_next(request)
+        response.headers["X-Request-ID"] = request_id
+        return response
+
+
+class LegacyLoggingMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        start_time = time.time()
+        request_id = getattr(request.state, "request_id", "unknown")
+        body = await request.body() if request.method in ["POST", "PUT", "PATCH"] else None  # noqa: F841
+        response = await call_next(request)
+        process_time = time.time() - start_time
+        access_logger.info(
+            f"{request.method} {request.url.path}",
+            extra={'extra_data': {'request_id': request_id, 'status_code': response.status_code}},
+        )
+        response.headers["X-Process-Time"] = str(process_time)
+        return response
+
+
+class LegacyCorrelationIDMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        correlation_id = request.headers.get("X-Correlation-ID") or str(uuid.uuid4())
+        request.state.correlation_id = correlation_id
+        response = await call_next(request)
+        response.headers["X-Correlation-ID"] = correlation_id
+        return response
+
+
+def build_app(variant: str) -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/echo")
+    async def echo(request: Request):
+        total = 0
+        async for chunk in request.stream():
+            total += len(chunk)
+        return {"received": total}
+
+    if variant == "legacy":
+        app.add_middleware(LegacyCorrelationIDMiddleware)
+        app.add_middleware(LegacyLoggingMiddleware)
+        app.add_middleware(LegacyRequestIDMiddleware)
+    elif variant == "asgi":
+        app.add_middleware(RequestContextMiddleware)
+    return app
+
+
+async def measure(variant: str, requests: int, body: bytes) -> float:
+    transport = httpx.ASGITransport(app=build_app(variant))
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for _ in range(50):  # warm-up
+            await client.post("/echo", content=body)
+        start = time.perf_counter()
+        for _ in range(requests):
+            await client.post("/echo", content=body)
+        return (time.perf_counter() - start) / requests
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--body-kb", type=int, default=64)
+    args = parser.parse_args()
+
+    access_logger.addHandler(logging.NullHandler())
+    access_logger.propagate = False
+    access_logger.setLevel(logging.INFO)
+
+    body = b"x" * (args.body_kb * 1024)
+    results = {v: asyncio.run(measure(v, args.requests, body)) for v in ("none", "legacy", "asgi")}
+
+    floor = results["none"]
+    print(f"{'stack':<10}{'us/request':>12}{'overhead us':>14}")
+    for variant, per_request in results.items():
+        print(f"{variant:<10}{per_request * 1e6:>12.1f}{(per_request - floor) * 1e6:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Full-text search latency on a synthetic corpus (default 1M books).
+
+Builds a throwaway SQLite database with ``--owners`` users, ``--authors``
+authors and ``--rows`` books whose titles and descriptions draw words from a
+Zipf-distributed vocabulary, then builds the FTS5 index (timed, this is the
+backfill an existing database goes through). Each query class (frequent,
+mid-frequency, rare word, two words, prefix) then runs ``--repeat`` times
+for random owners through ``app.search.search_book_ids`` and, for
+comparison, as an owner-scoped ``LIKE`` scan over title and description.
+
+Usage (from the server directory):
+    python -m benchmarks.search --rows 1000000
+"""
+
+import argparse
+import itertools
+import os
+import random
+import sqlite3
+import statistics
+import time
+from typing import Callable, Dict, List
+
+from benchmarks.common import percentile, temp_database_url
+
+TITLE_WORDS = (3, 6)
+DESCRIPTION_WORDS = (20, 40)
+
+
+def make_vocabulary(rng: random.Random, size: int) -> List[str]:
+    consonants, vowels = "bcdfghjklmnprstvz", "aeiou"
+    words = set()
+    while len(words) < size:
+        length = rng.randint(2, 4)
+        words.add("".join(rng.choice(consonants) + rng.choice(vowels) for _ in range(length)))
+    return sorted(words, key=lambda w: (len(w), w))
+
+
+def build_corpus(path: str, args: argparse.Namespace, vocabulary: List[str]) -> None:
+    rng = random.Random(args.seed)
+    cum_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(vocabulary))))
+
+    def words(bounds) -> str:
+        return " ".join(rng.choices(vocabulary, cum_weights=cum_weights, k=rng.randint(*bounds)))
+
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.executemany(
+            "INSERT INTO users (id, email, hashed_password) VALUES (?, ?, 'x')",
+            ((i, f"user{i}@example.com") for i in range(1, args.owners + 1)),
+        )
+        conn.executemany(
+            "INSERT INTO authors (id, name, biography) VALUES (?, ?, ?)",
+            ((i, words((2, 3)).title(), words((10, 20))) for i in range(1, args.authors + 1)),
+        )
+        conn.executemany(
+            "INSERT INTO books (id, title, description, owner_id) VALUES (?, ?, ?, ?)",
+            (
+                (i, words(TITLE_WORDS), words(DESCRIPTION_WORDS), rng.randint(1, args.owners))
+                for i in range(1, args.rows + 1)
+            ),
+        )
+        conn.executemany(
+            "INSERT INTO book_author (book_id, author_id) VALUES (?, ?)",
+            ((i, rng.randint(1, args.authors)) for i in range(1, args.rows + 1)),
+        )
+    conn.close()
+
+
+def measure(fn: Callable[[int], object], owners: int, repeat: int, rng: random.Random) -> Dict[str, float]:
+    samples = []
+    for _ in range(repeat):
+        owner = rng.randint(1, owners)
+        start = time.perf_counter()
+        fn(owner)
+        samples.append(time.perf_counter() - start)
+    return {
+        "p50": statistics.median(samples) * 1000,
+        "p95": percentile(samples, 95) * 1000,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--owners", type=int, default=100)
+    parser.add_argument("--authors", type=int, default=20_000)
+    parser.add_argument("--vocabulary", type=int, default=20_000)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    url = temp_database_url()
+    os.environ["DATABASE_URL"] = url
+    # Imported after DATABASE_URL is set: the engine is created at import time
+    import app.models  # noqa: F401  (registers the tables)
+    from app.database import Base, SessionLocal, engine
+    from app.search import init_search_index, search_book_ids
+    from sqlalchemy import text
+
+    Base.metadata.create_all(bind=engine)
+    vocabulary = make_vocabulary(random.Random(args.seed), args.vocabulary)
+
+    start = time.perf_counter()
+    build_corpus(url.replace("sqlite:///", "", 1), args, vocabulary)
+    print(f"corpus: {args.rows} books in {time.perf_counter() - start:.1f}s")
+    start = time.perf_counter()
+    init_search_index(engine)
+    print(f"FTS5 index build: {time.perf_counter() - start:.1f}s")
+
+    queries = {
+        "frequent": vocabulary[0],
+        "mid": vocabulary[len(vocabulary) // 20],
+        "rare": vocabulary[-1],
+        "two words": f"{vocabulary[3]} {vocabulary[200]}",
+        "prefix": vocabulary[len(vocabulary) // 20][:3],
+    }
+    like_sql = text(
+        "SELECT id FROM books WHERE owner_id = :owner AND (title LIKE :pattern OR description LIKE :pattern) "
+        "ORDER BY id LIMIT 10"
+    )
+
+    rng = random.Random(args.seed)
+    print(f"{'query':<11}{'term':<18}{'fts p50':>9}{'fts p95':>9}{'like p50':>10}{'like p95':>10}")
+    with SessionLocal() as db:
+        for label, q in queries.items():
+            pattern = f"%{q.split()[0]}%"
+            fts = measure(lambda owner: search_book_ids(db, owner, q, 10), args.owners, args.repeat, rng)
+            like = measure(
+                lambda owner: db.execute(like_sql, {"owner": owner, "pattern": pattern}).all(),
+                args.owners, args.repeat, rng,
+            )
+            print(
+                f"{label:<11}{q:<18}{fts['p50']:>9.2f}{fts['p95']:>9.2f}"
+                f"{like['p50']:>10.2f}{like['p95']:>10.2f}"
+            )
+    print("latencies in ms; LIKE rows are unranked and cannot match author fields")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Serialization cost of list_books responses at 10, 100 and 1000 items.
+
+Serves the same in-memory ORM objects (no database) through two in-process
+routes: the default FastAPI path (``response_model`` validation, then JSON
+encoding) and ``app.serialization.serialized_response``. Requires httpx.
+
+Usage (from the server directory):
+    python -m benchmarks.serialization --sizes 10 100 1000
+"""
+
+import argparse
+import asyncio
+import time
+from datetime import datetime
+from typing import List
+
+import httpx
+from fastapi import FastAPI
+
+from app.models import Author, Book
+from app.schemas import BookRead
+from app.serialization import BOOK_LIST_ADAPTER, serialized_response
+
+
+def make_books(count: int) -> List[Book]:
+    now = datetime.utcnow()
+    authors = [
+        Author(id=i, name=f"Author {i}", biography="Lorem ipsum " * 20, created_at=now)
+        for i in range(20)
+    ]
+    return [
+        Book(
+            id=i,
+            title=f"Book {i}",
+            description="Dolor sit amet " * 30,
+            isbn=f"978{i:010d}",
+            published_year=1900 + i % 120,
+            owner_id=1,
+            created_at=now,
+            updated_at=now,
+            authors=authors[i % 20:i % 20 + 2],
+        )
+        for i in range(count)
+    ]
+
+
+def build_app(books: List[Book]) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/default", response_model=List[BookRead])
+    def default_path():
+        return books
+
+    @app.get("/fast", response_model=List[BookRead])
+    def fast_path():
+        return serialized_response(BOOK_LIST_ADAPTER, books)
+
+    return app
+
+
+async def measure(app: FastAPI, path: str, iterations: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for _ in range(5):
+            await client.get(path)
+        start = time.perf_counter()
+        for _ in range(iterations):
+            await client.get(path)
+        return (time.perf_counter() - start) / iterations
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--budget", type=float, default=2.0, help="seconds per measurement (approx.)")
+    args = parser.parse_args()
+
+    print(f"{'items':>6}{'default ms':>12}{'fast ms':>10}{'speedup':>9}")
+    for size in args.sizes:
+        app = build_app(make_books(size))
+        iterations = max(5, int(args.budget / (size * 50e-6)))
+        default = asyncio.run(measure(app, "/default", iterations))
+        fast = asyncio.run(measure(app, "/fast", iterations))
+        print(f"{size:>6}{default * 1000:>12.2f}{fast * 1000:>10.2f}{default / fast:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Concurrent read/write throughput against a shared SQLite file.
+
+Compares a stock SQLite engine (rollback journal, no busy timeout) with the
+tuned engine built by ``app.database.create_db_engine``. Two engines share the
+same file to mimic the two API replicas in docker-compose.prod.yml.
+
+Usage (from the server directory):
+    python -m benchmarks.sqlite_concurrency --duration 5 --readers 8 --writers 4
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text  # noqa: E402
+from sqlalchemy.exc import OperationalError  # noqa: E402
+
+from app.database import SQLITE_PRAGMAS, create_db_engine  # noqa: E402
+
+STOCK_PRAGMAS: Dict[str, Any] = {}
+
+
+def _prepare(path: str) -> None:
+    engine = create_db_engine(f"sqlite:///{path}", pragmas={})
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE items (id INTEGER PRIMARY KEY, owner_id INTEGER, payload TEXT)"
+        ))
+        conn.execute(
+            text("INSERT INTO items (owner_id, payload) VALUES (:o, :p)"),
+            [{"o": i % 50, "p": "x" * 200} for i in range(5000)],
+        )
+    engine.dispose()
+
+
+def _worker(engine, kind: str, stop: threading.Event, stats: Dict[str, int], lock: threading.Lock) -> None:
+    ops = errors = 0
+    n = 0
+    while not stop.is_set():
+        n += 1
+        try:
+            with engine.begin() as conn:
+                if kind == "read":
+                    conn.execute(
+                        text("SELECT id, payload FROM items WHERE owner_id = :o LIMIT 20"),
+                        {"o": n % 50},
+                    ).fetchall()
+                else:
+                    conn.execute(
+                        text("INSERT INTO items (owner_id, payload) VALUES (:o, :p)"),
+                        {"o": n % 50, "p": "y" * 200},
+                    )
+            ops += 1
+        except OperationalError:
+            errors += 1
+    with lock:
+        stats[f"{kind}_ops"] += ops
+        stats[f"{kind}_errors"] += errors
+
+
+def run(label: str, pragmas: Dict[str, Any], args: argparse.Namespace) -> Dict[str, Any]:
+    workdir = tempfile.mkdtemp(prefix="bench-sqlite-")
+    path = os.path.join(workdir, "bench.db")
+    _prepare(path)
+
+    pool = args.readers + args.writers
+    engines = [
+        create_db_engine(f"sqlite:///{path}", pragmas=pragmas, pool_size=pool, max_overflow=0)
+        for _ in range(2)
+    ]
+    stats = {"read_ops": 0, "read_errors": 0, "write_ops": 0, "write_errors": 0}
+    lock = threading.Lock()
+    stop = threading.Event()
+
+    threads: List[threading.Thread] = []
+    for i in range(args.readers):
+        threads.append(threading.Thread(
+            target=_worker, args=(engines[i % 2], "read", stop, stats, lock)
+        ))
+    for i in range(args.writers):
+        threads.append(threading.Thread(
+            target=_worker, args=(engines[i % 2], "write", stop, stats, lock)
+        ))
+
+    for thread in threads:
+        thread.start()
+    time.sleep(args.duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    for engine in engines:
+        engine.dispose()
+
+    return {
+        "label": label,
+        "reads_per_sec": round(stats["read_ops"] / args.duration, 1),
+        "writes_per_sec": round(stats["write_ops"] / args.duration, 1),
+        "read_errors": stats["read_errors"],
+        "write_errors": stats["write_errors"],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=4)
+    args = parser.parse_args()
+
+    results = [
+        run("stock (rollback journal)", STOCK_PRAGMAS, args),
+        run("tuned (WAL + pragmas)", SQLITE_PRAGMAS, args),
+    ]
+
+    print(f"{'config':<28}{'reads/s':>12}{'writes/s':>12}{'read err':>10}{'write err':>11}")
+    for r in results:
+        print(
+            f"{r['label']:<28}{r['reads_per_sec']:>12}{r['writes_per_sec']:>12}"
+            f"{r['read_errors']:>10}{r['write_errors']:>11}"
+        )
+
+
+if __name__ == "__main__":
+    main()
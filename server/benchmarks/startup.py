@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Worker startup: import cost and time-to-first-request.
+
+1. Import profile: runs ``python -X importtime -c "import main"`` and sums
+   the self time of every module by top-level package, so a new eager
+   import of a heavy dependency shows up at once.
+2. Time-to-first-request: spawns ``uvicorn --workers N`` against a fresh
+   database (``cold``: the schema has to be created) and then again on the
+   same one (``warm``: the recorded schema version matches and DDL is
+   skipped). Reports when the first ``GET /`` succeeded and, from each
+   worker's "Worker ready" log line, when that worker was ready, its own
+   import and lifespan times, and whether it applied the schema. A worker
+   that crashes at boot (e.g. racing another one on DDL) makes the run fail.
+
+Usage (from the server directory):
+    python -m benchmarks.startup --workers 4 --runs 3
+"""
+
+import argparse
+import json
+import os
+import queue
+import re
+import subprocess
+import sys
+import threading
+import time
+from collections import defaultdict
+from statistics import median
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from benchmarks.common import SERVER_DIR, free_port, start_server, temp_database_url
+
+_IMPORTTIME_RE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def import_profile(top: int) -> None:
+    env = dict(os.environ, DATABASE_URL=temp_database_url(), LOG_LEVEL="WARNING")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=SERVER_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+    by_package: Dict[str, int] = defaultdict(int)
+    total = 0
+    for line in result.stderr.splitlines():
+        match = _IMPORTTIME_RE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, module = int(match[1]), int(match[2]), match[3], match[4]
+        by_package[module.split(".")[0]] += self_us
+        if module == "main" and not indent:
+            total = cumulative_us
+
+    print(f"import main: {total / 1000:.0f} ms")
+    print(f"{'package':<24}{'self ms':>9}")
+    for package, self_us in sorted(by_package.items(), key=lambda item: -item[1])[:top]:
+        print(f"{package:<24}{self_us / 1000:>9.1f}")
+
+
+def _pump(stream, lines: "queue.Queue[str]") -> None:
+    for line in stream:
+        lines.put(line)
+
+
+def _ready_record(line: str) -> Optional[Dict[str, Any]]:
+    try:
+        record = json.loads(line)
+    except ValueError:
+        return None
+    if not isinstance(record, dict) or record.get("message") != "Worker ready":
+        return None
+    return record.get("extra")
+
+
+def boot(database_url: str, workers: int, timeout: float) -> Dict[str, Any]:
+    """Start uvicorn, wait for every worker to report ready, and return the timings"""
+    port = free_port()
+    started = time.time()
+    proc = start_server(
+        port, {"DATABASE_URL": database_url, "LOG_LEVEL": "INFO"}, workers=workers, stdout=subprocess.PIPE
+    )
+    lines: "queue.Queue[str]" = queue.Queue()
+    threading.Thread(target=_pump, args=(proc.stdout, lines), daemon=True).start()
+    deadline = started + timeout
+    first_response = None
+    ready: List[Dict[str, Any]] = []
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=1) as client:
+            while time.time() < deadline and (first_response is None or len(ready) < workers):
+                if proc.poll() is not None:
+                    raise RuntimeError(f"server exited with status {proc.returncode}")
+                while not lines.empty():
+                    record = _ready_record(lines.get())
+                    if record is not None:
+                        ready.append(record)
+                if first_response is None:
+                    try:
+                        if client.get("/").status_code == 200:
+                            first_response = time.time()
+                    except httpx.TransportError:
+                        pass
+                time.sleep(0.005)
+    finally:
+        proc.terminate()
+        proc.wait()
+    if first_response is None or len(ready) < workers:
+        raise RuntimeError(f"{len(ready)}/{workers} workers ready after {timeout:.0f}s")
+    return {
+        "first_response_ms": (first_response - started) * 1000,
+        "workers": [
+            {**record, "ready_ms": (record["ready_at"] - started) * 1000}
+            for record in sorted(ready, key=lambda record: record["ready_at"])
+        ],
+    }
+
+
+def print_boot(label: str, result: Dict[str, Any]) -> None:
+    print(f"\n{label}: first response after {result['first_response_ms']:.0f} ms")
+    print(f"{'worker':>8}{'ready ms':>10}{'import ms':>11}{'lifespan ms':>13}{'schema':>9}")
+    for worker in result["workers"]:
+        schema = "applied" if worker["schema_applied"] else "current"
+        print(f"{worker['pid']:>8}{worker['ready_ms']:>10.0f}{worker['import_ms']:>11.0f}"
+              f"{worker['startup_ms']:>13.1f}{schema:>9}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--top", type=int, default=12, help="packages shown in the import profile")
+    args = parser.parse_args()
+
+    import_profile(args.top)
+
+    summary: Dict[str, List[float]] = defaultdict(list)
+    for run in range(1, args.runs + 1):
+        database_url = temp_database_url()
+        for scenario in ("cold", "warm"):
+            result = boot(database_url, args.workers, args.timeout)
+            print_boot(f"run {run}, {scenario}", result)
+            applied = sum(worker["schema_applied"] for worker in result["workers"])
+            if applied != (1 if scenario == "cold" else 0):
+                raise SystemExit(f"{scenario} start: {applied} workers applied the schema")
+            summary[f"{scenario} first response"].append(result["first_response_ms"])
+            summary[f"{scenario} last worker"].append(result["workers"][-1]["ready_ms"])
+
+    print(f"\nmedian over {args.runs} runs, {args.workers} workers")
+    for label, samples in summary.items():
+        print(f"  {label:<22}{median(samples):>8.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Per-request auth cost with and without the verified-token cache.
+
+Times ``app.security.decode_token_subject`` on one bearer token, the way the
+SPA repeats the same token on every call, with the cache disabled and enabled.
+
+Usage (from the server directory):
+    python -m benchmarks.token_cache --iterations 50000
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import security  # noqa: E402
+
+
+def _time_per_call(token: str, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        security.decode_token_subject(token)
+    return (time.perf_counter() - start) / iterations
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=50000)
+    args = parser.parse_args()
+
+    token = security.create_access_token({"sub": "bench@example.com"}, timedelta(minutes=30))
+
+    cache_size = security.token_cache.maxsize
+    security.token_cache.maxsize = 0
+    security.token_cache.clear()
+    uncached = _time_per_call(token, args.iterations)
+
+    security.token_cache.maxsize = cache_size
+    security.decode_token_subject(token)  # warm the entry
+    cached = _time_per_call(token, args.iterations)
+
+    print(f"{'mode':<10}{'us/request':>12}")
+    print(f"{'no cache':<10}{uncached * 1e6:>12.2f}")
+    print(f"{'cache':<10}{cached * 1e6:>12.2f}")
+    print(f"speedup: {uncached / cached:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
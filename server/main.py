@@ -1,13 +1,26 @@
+import time
+
+# Set before the imports below so worker startup logs include import time
+_IMPORT_STARTED = time.perf_counter()
+
 from fastapi import FastAPI
+from fastapi.responses import Response
 from fastapi.middleware.cors import CORSMiddleware
 import os
 from contextlib import asynccontextmanager
 
-from app.database import init_db
+from app.database import init_db, ASYNC_DB_ENABLED, SessionLocal
+from app.author_index import author_index
 from app.routes import users, books, authors, preferences, demos
-from app.logging_config import setup_logging, get_logger
+from app.logging_config import setup_logging, get_logger, get_logging_stats, shutdown_logging
 from app.exception_handlers import register_exception_handlers
-from app.middleware import RequestIDMiddleware, LoggingMiddleware, CorrelationIDMiddleware
+from app.security import token_cache, user_cache
+from app.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, METRICS_ENABLED, registry as metrics_registry
+from app.response_cache import response_cache
+from app.rate_limit import auth_rate_limiter
+from app.password_hashing import password_hasher
+from app.serialization import FastJSONResponse
+from app.middleware import RequestContextMiddleware
 
 # Setup logging
 setup_logging(
@@ -20,10 +33,35 @@ logger = get_logger(__name__)
 @asynccontextmanager
 async def lifespan(_app: FastAPI):
     """Initialize application resources once per worker process."""
-    logger.info("Initializing database...")
-    init_db()
-    logger.info("Database initialized successfully")
+    started = time.perf_counter()
+    # Skips DDL when the database already carries the current schema version
+    schema_applied = init_db()
+    logger.info("Database schema applied" if schema_applied else "Database schema up to date")
+    with SessionLocal() as db:
+        author_index.rebuild(db)
+    logger.info(f"Author suggestion index built ({len(author_index)} authors)")
+    password_hasher.start()
+    metrics_registry.start()
+    ready = time.perf_counter()
+    logger.info(
+        "Worker ready",
+        extra={'extra_data': {
+            'pid': os.getpid(),
+            'import_ms': round((_IMPORTED - _IMPORT_STARTED) * 1000, 1),
+            'startup_ms': round((ready - started) * 1000, 1),
+            'schema_applied': schema_applied,
+            'ready_at': time.time(),
+        }}
+    )
     yield
+    password_hasher.shutdown()
+    metrics_registry.shutdown()
+    logger.info("User cache stats", extra={'extra_data': user_cache.stats()})
+    logger.info("Response cache stats", extra={'extra_data': response_cache.stats()})
+    logger.info("Auth rate limiter stats", extra={'extra_data': auth_rate_limiter.stats()})
+    logger.info("Logging pipeline stats", extra={'extra_data': get_logging_stats()})
+    # Flush queued log records before the worker exits
+    shutdown_logging()
 
 # Create FastAPI app
 app = FastAPI(
@@ -31,15 +69,14 @@ app = FastAPI(
     description="A clean API for managing books, authors, and users with authentication",
     version="1.0.0",
     lifespan=lifespan,
+    default_response_class=FastJSONResponse,
 )
 
 # Register exception handlers
 register_exception_handlers(app)
 
 # Add middlewares (order matters - they execute in reverse order)
-app.add_middleware(CorrelationIDMiddleware)
-app.add_middleware(LoggingMiddleware)
-app.add_middleware(RequestIDMiddleware)
+app.add_middleware(RequestContextMiddleware)
 
 # Configure CORS
 app.add_middleware(
@@ -48,16 +85,52 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Missing-Ids", "ETag", "X-DB-Queries", "X-DB-Time"],
 )
 
 # Include routes
 app.include_router(users.router)
+if ASYNC_DB_ENABLED:
+    # Registered first so the async CRUD handlers take precedence over the sync ones
+    from app.routes import books_async, authors_async
+
+    app.include_router(books_async.router)
+    app.include_router(authors_async.router)
 app.include_router(books.router)
 app.include_router(authors.router)
 app.include_router(preferences.router)
 app.include_router(demos.router)
 
 
+def _register_callback_metrics() -> None:
+    for name, cache in (("token_cache", token_cache), ("user_cache", user_cache)):
+        metrics_registry.callback(f"{name}_hits_total", f"{name} hits", lambda cache=cache: cache.hits, "counter")
+        metrics_registry.callback(f"{name}_misses_total", f"{name} misses", lambda cache=cache: cache.misses, "counter")
+    metrics_registry.callback("response_cache_hits_total", "response_cache hits", lambda: response_cache.hits, "counter")
+    metrics_registry.callback("response_cache_misses_total", "response_cache misses", lambda: response_cache.misses, "counter")
+    metrics_registry.callback("response_cache_errors_total", "response_cache backend errors", lambda: response_cache.errors, "counter")
+    metrics_registry.callback(
+        "password_hash_pending", "Password hashing jobs queued or running", lambda: password_hasher.pending
+    )
+    metrics_registry.callback(
+        "password_hash_rejected_total", "Password hashing jobs refused (backlog full)",
+        lambda: password_hasher.rejected, "counter"
+    )
+    metrics_registry.callback(
+        "auth_rate_limit_errors_total", "Rate limiter backend failures (requests admitted)",
+        lambda: auth_rate_limiter.errors, "counter"
+    )
+
+
+if METRICS_ENABLED:
+    _register_callback_metrics()
+
+    @app.get("/metrics", include_in_schema=False)
+    def metrics():
+        """Prometheus scrape endpoint (aggregated over workers, see app.metrics)"""
+        return Response(metrics_registry.render(), media_type=METRICS_CONTENT_TYPE)
+
+
 @app.get("/")
 def read_root():
     """Health check endpoint"""
@@ -68,6 +141,11 @@ def read_root():
     }
 
 
+_IMPORTED = time.perf_counter()
+
+
+# Password hashing workers (spawn) re-import this module as __mp_main__ when it
+# is run directly: they must not start a server of their own
 if __name__ == "__main__":
     import uvicorn
 
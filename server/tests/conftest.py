@@ -0,0 +1,67 @@
+"""Shared fixtures: one app instance on a throwaway SQLite database.
+
+The settings are read when ``app`` is imported, so the environment is set
+before anything from it is. Every test registers its own user (and uses its
+own ISBNs), so tests do not depend on each other's data.
+"""
+
+import os
+import tempfile
+import uuid
+
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='bibliotheque-tests-'), 'test.db')}"
+os.environ.setdefault("ASYNC_DB", "false")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+# Cheap hashes, hashed inline: the pool and the bcrypt cost are not under test here
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+os.environ.setdefault("PASSWORD_HASH_WORKERS", "0")
+# Every test logs in from the same address; tests/test_rate_limit.py installs its own limiter
+os.environ.setdefault("AUTH_RATE_LIMIT_ENABLED", "false")
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+from main import app  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def client():
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+def unique(prefix: str) -> str:
+    return f"{prefix}-{uuid.uuid4().hex[:12]}"
+
+
+def register_and_login(client: TestClient, password: str = "secret-pw") -> dict:
+    email = f"{unique('user')}@bibliotheque.org"
+    assert client.post("/api/users/register", json={"email": email, "password": password}).status_code == 201
+    response = client.post("/api/users/login", json={"email": email, "password": password})
+    assert response.status_code == 200
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.fixture
+def headers(client):
+    """Authorization headers of a freshly registered user"""
+    return register_and_login(client)
+
+
+@pytest.fixture
+def make_author(client, headers):
+    def _make(name=None, **fields):
+        response = client.post("/api/authors/", json={"name": name or unique("Author"), **fields}, headers=headers)
+        assert response.status_code == 201, response.text
+        return response.json()
+    return _make
+
+
+@pytest.fixture
+def make_book(client, headers):
+    def _make(**fields):
+        payload = {"title": unique("Book"), "isbn": unique("isbn"), **fields}
+        response = client.post("/api/books/", json=payload, headers=headers)
+        assert response.status_code == 201, response.text
+        return response.json()
+    return _make
@@ -0,0 +1,55 @@
+"""Author type-ahead index (app.author_index)."""
+
+from app.author_index import AuthorPrefixIndex
+
+
+class _Snapshot:
+    """Stands in for a Session: returns ``rows``, running ``during`` while the query is in flight"""
+
+    def __init__(self, rows, during=lambda: None):
+        self.rows = rows
+        self.during = during
+
+    def execute(self, statement):
+        self.during()
+        return self
+
+    def tuples(self):
+        return self
+
+    def all(self):
+        return list(self.rows)
+
+
+def _names(index, prefix):
+    return [name for _, name in index.suggest(prefix)]
+
+
+def test_folded_word_prefixes():
+    index = AuthorPrefixIndex()
+    index.load([(1, "Émile Zola"), (2, "Victor Hugo")])
+    assert _names(index, "zo") == ["Émile Zola"]
+    assert _names(index, "EMI") == ["Émile Zola"]
+    index.upsert(1, "Honoré de Balzac")
+    assert _names(index, "zo") == []
+    assert _names(index, "balz") == ["Honoré de Balzac"]
+
+
+def test_writes_during_a_rebuild_are_not_lost():
+    index = AuthorPrefixIndex()
+    index.load([(1, "Émile Zola"), (2, "Victor Hugo")])
+
+    def concurrent_writes():
+        index.upsert(3, "George Sand")   # created after the snapshot was read
+        index.upsert(1, "Emile Zola (pseud.)")
+        index.remove(2)
+
+    index.rebuild(_Snapshot([(1, "Émile Zola"), (2, "Victor Hugo")], during=concurrent_writes))
+    assert _names(index, "sand") == ["George Sand"]
+    assert _names(index, "zola") == ["Emile Zola (pseud.)"]
+    assert _names(index, "hugo") == []
+
+    # the journal only covers the rebuild
+    index.rebuild(_Snapshot([(1, "Émile Zola")]))
+    assert _names(index, "sand") == []
+    assert _names(index, "zola") == ["Émile Zola"]
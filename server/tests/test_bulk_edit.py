@@ -0,0 +1,106 @@
+"""PATCH / DELETE /api/books/: set-based bulk edits with per-item results."""
+
+from app.query_guard import assert_max_queries
+
+from tests.conftest import register_and_login, unique
+
+
+def _statuses(result):
+    return [(item["id"], item["status"]) for item in result["results"]]
+
+
+def test_same_changes_for_several_ids(client, headers, make_author, make_book):
+    author = make_author()
+    books = [make_book(), make_book()]
+    ids = [book["id"] for book in books]
+    response = client.patch("/api/books/", json={
+        "ids": [*ids, 987654321], "changes": {"published_year": 1862, "author_ids": [author["id"]]},
+    }, headers=headers)
+    assert response.status_code == 200
+    result = response.json()
+    assert _statuses(result) == [(ids[0], "updated"), (ids[1], "updated"), (987654321, "not_found")]
+    assert (result["processed"], result["succeeded"], result["failed"]) == (3, 2, 1)
+
+    for book_id in ids:
+        book = client.get(f"/api/books/{book_id}", headers=headers).json()
+        assert book["published_year"] == 1862
+        assert [a["id"] for a in book["authors"]] == [author["id"]]
+
+
+def test_operations_report_each_item_in_request_order(client, headers, make_book):
+    books = [make_book() for _ in range(6)]
+    ids = [book["id"] for book in books]
+    new_isbn = unique("isbn")
+    response = client.patch("/api/books/", json={"operations": [
+        {"id": ids[0], "title": "First"},
+        {"id": ids[1], "title": "Second", "description": "Own values"},
+        {"id": ids[2], "isbn": books[3]["isbn"]},
+        {"id": ids[0], "title": "Repeated"},
+        {"id": ids[3]},
+        {"id": ids[4], "author_ids": [987654321]},
+        {"id": ids[5], "isbn": new_isbn},
+    ]}, headers=headers)
+    results = response.json()["results"]
+    assert [item["status"] for item in results] == [
+        "updated", "updated", "failed", "failed", "failed", "failed", "updated",
+    ]
+    assert [item["error"] for item in results if item["error"]] == [
+        "Book with this ISBN already exists",
+        "Duplicate id in batch",
+        "No fields to update",
+        "Unknown author ids: [987654321]",
+    ]
+    assert client.get(f"/api/books/{ids[0]}", headers=headers).json()["title"] == "First"
+    assert client.get(f"/api/books/{ids[1]}", headers=headers).json()["description"] == "Own values"
+    assert client.get(f"/api/books/{ids[2]}", headers=headers).json()["isbn"] == books[2]["isbn"]
+    assert client.get(f"/api/books/{ids[5]}", headers=headers).json()["isbn"] == new_isbn
+
+
+def test_query_count_does_not_grow_with_the_batch(client, headers, make_author, make_book):
+    author = make_author()
+    ids = [make_book()["id"] for _ in range(30)]
+    client.get("/api/users/me", headers=headers)  # user record cached
+    operations = [
+        {"id": book_id, "title": f"Title {i}", "author_ids": [author["id"]]} for i, book_id in enumerate(ids)
+    ]
+    # owned ids, known authors, one executemany UPDATE, unlink, link
+    with assert_max_queries(5):
+        result = client.patch("/api/books/", json={"operations": operations}, headers=headers).json()
+    assert result["succeeded"] == 30
+
+
+def test_search_index_follows_bulk_edits(client, headers, make_book):
+    book = make_book()
+    word = unique("zyx").replace("-", "")
+    client.patch("/api/books/", json={"ids": [book["id"]], "changes": {"title": f"Now {word}"}}, headers=headers)
+    hits = client.get(f"/api/books/search?q={word}", headers=headers).json()
+    assert [hit["book"]["id"] for hit in hits] == [book["id"]]
+
+
+def test_bulk_delete(client, headers, make_book):
+    keep, first, second = make_book(), make_book(), make_book()
+    response = client.delete(f"/api/books/?ids={first['id']},{second['id']},987654321", headers=headers)
+    assert response.status_code == 200
+    assert _statuses(response.json()) == [
+        (first["id"], "deleted"), (second["id"], "deleted"), (987654321, "not_found"),
+    ]
+    remaining = [book["id"] for book in client.get("/api/books/", headers=headers).json()]
+    assert remaining == [keep["id"]]
+
+
+def test_other_users_books_are_not_found(client, headers, make_book):
+    book = make_book()
+    intruder = register_and_login(client)
+    patched = client.patch("/api/books/", json={"ids": [book["id"]], "changes": {"title": "Mine"}}, headers=intruder)
+    deleted = client.delete(f"/api/books/?ids={book['id']}", headers=intruder)
+    assert _statuses(patched.json()) == [(book["id"], "not_found")]
+    assert _statuses(deleted.json()) == [(book["id"], "not_found")]
+    assert client.get(f"/api/books/{book['id']}", headers=headers).json()["title"] == book["title"]
+
+
+def test_invalid_requests(client, headers):
+    for body in ({}, {"ids": [1], "operations": [{"id": 1, "title": "x"}]}, {"ids": [1]}, {"ids": []}):
+        response = client.patch("/api/books/", json=body, headers=headers)
+        assert response.status_code == 400, body
+    assert client.delete("/api/books/?ids=a,b", headers=headers).status_code == 400
+    assert client.patch("/api/books/", json={"ids": [1], "changes": {"title": "x"}}).status_code in (401, 403)
@@ -0,0 +1,87 @@
+"""POST /api/books/bulk: streamed NDJSON / CSV import with per-row errors."""
+
+import json
+
+from app.bulk_import import BookImporter
+from app.database import SessionLocal
+
+from tests.conftest import unique
+
+
+def _ndjson(*records) -> str:
+    return "\n".join(record if isinstance(record, str) else json.dumps(record) for record in records)
+
+
+def _import(client, headers, body: str, content_type: str = "application/x-ndjson"):
+    response = client.post("/api/books/bulk", content=body, headers={**headers, "Content-Type": content_type})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_ndjson_import_links_authors_by_id_and_name(client, headers, make_author):
+    author = make_author()
+    new_name = unique("Imported Author")
+    result = _import(client, headers, _ndjson(
+        {"title": "By id", "isbn": unique("isbn"), "author_ids": [author["id"]]},
+        {"title": "By name", "isbn": unique("isbn"), "author_names": [author["name"], new_name]},
+    ))
+    assert result == {"processed": 2, "inserted": 2, "failed": 0, "errors": [], "errors_truncated": False}
+
+    books = {book["title"]: book for book in client.get("/api/books/", headers=headers).json()}
+    assert [a["id"] for a in books["By id"]["authors"]] == [author["id"]]
+    assert sorted(a["name"] for a in books["By name"]["authors"]) == sorted([author["name"], new_name])
+
+
+def test_errors_are_reported_in_row_order(client, headers, make_book):
+    existing = make_book()
+    isbn = unique("isbn")
+    result = _import(client, headers, _ndjson(
+        {"title": "Taken ISBN", "isbn": existing["isbn"]},      # 1: ISBN pass
+        {"title": "Fine", "isbn": isbn},
+        {"title": "Also fine", "isbn": unique("isbn")},
+        {"title": "Ghost author", "isbn": unique("isbn"), "author_ids": [987654321]},  # 4: author pass
+        {"isbn": unique("isbn")},                                # 5: validation pass
+        "not json",                                              # 6: parse error
+        {"title": "Repeated", "isbn": isbn},                     # 7: duplicate in upload
+    ))
+    assert result["inserted"] == 2
+    assert result["failed"] == 5
+    assert [error["row"] for error in result["errors"]] == [1, 4, 5, 6, 7]
+    assert result["errors"][0] == {"row": 1, "error": "Book with this ISBN already exists", "isbn": existing["isbn"]}
+
+
+def test_csv_import(client, headers, make_author):
+    author = make_author()
+    isbns = [unique("isbn"), unique("isbn")]
+    body = (
+        "title,isbn,published_year,author_ids,description\n"
+        f'Germinal,{isbns[0]},1885,{author["id"]},"La vie des mineurs, du Nord"\n'
+        f'"Multi\nline title",{isbns[1]},,,\n'
+    )
+    result = _import(client, headers, body, "text/csv")
+    assert result["inserted"] == 2, result
+
+    books = {book["isbn"]: book for book in client.get("/api/books/", headers=headers).json()}
+    assert books[isbns[0]]["published_year"] == 1885
+    assert books[isbns[0]]["description"] == "La vie des mineurs, du Nord"
+    assert books[isbns[0]]["authors"][0]["id"] == author["id"]
+    assert books[isbns[1]]["title"] == "Multi\nline title"
+
+
+def test_unsupported_content_type(client, headers):
+    response = client.post("/api/books/bulk", content="x", headers={**headers, "Content-Type": "text/plain"})
+    assert response.status_code == 400
+    assert response.json()["error"]["error_code"] == "UNSUPPORTED_FORMAT"
+
+
+def test_error_list_is_capped_and_sorted_across_chunks(client, headers):
+    owner_id = client.get("/api/users/me", headers=headers).json()["id"]
+    with SessionLocal() as db:
+        importer = BookImporter(db, owner_id, max_errors=3)
+        # each chunk finds validation errors before author errors
+        importer.import_chunk([(1, {"title": "x", "author_ids": [987654321]}), (2, {}), (3, "bad line")])
+        importer.import_chunk([(4, {}), (5, {})])
+        result = importer.result()
+    assert result.failed == 5
+    assert [error.row for error in result.errors] == [1, 2, 3]
+    assert result.errors_truncated
@@ -0,0 +1,96 @@
+"""Conditional GET: ETag / Last-Modified validators and 304 answers."""
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import update
+
+from app.database import SessionLocal
+from app.models import Author, Book
+from app.query_guard import assert_max_queries
+
+
+def _backdate(book_id: int, author_ids=(), hours: int = 1) -> None:
+    """Move timestamps into the past, so a write now lands in a later second"""
+    past = datetime.utcnow() - timedelta(hours=hours)
+    with SessionLocal() as db:
+        db.execute(update(Book).where(Book.id == book_id).values(updated_at=past))
+        if author_ids:
+            db.execute(update(Author).where(Author.id.in_(author_ids)).values(updated_at=past))
+        db.commit()
+
+
+def test_book_if_none_match(client, headers, make_book):
+    book = make_book()
+    response = client.get(f"/api/books/{book['id']}", headers=headers)
+    etag = response.headers["etag"]
+    assert response.headers["cache-control"] == "private, no-cache"
+
+    assert client.get(f"/api/books/{book['id']}", headers={**headers, "If-None-Match": etag}).status_code == 304
+
+    client.put(f"/api/books/{book['id']}", json={"title": "Changed"}, headers=headers)
+    response = client.get(f"/api/books/{book['id']}", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["title"] == "Changed"
+    assert response.headers["etag"] != etag
+
+
+def test_book_if_modified_since_sees_author_rename(client, headers, make_author, make_book):
+    author = make_author()
+    book = make_book(author_ids=[author["id"]])
+    _backdate(book["id"], [author["id"]])
+    last_modified = client.get(f"/api/books/{book['id']}", headers=headers).headers["last-modified"]
+    since = {**headers, "If-Modified-Since": last_modified}
+    assert client.get(f"/api/books/{book['id']}", headers=since).status_code == 304
+
+    client.put(f"/api/authors/{author['id']}", json={"name": "Renamed Author"}, headers=headers)
+    response = client.get(f"/api/books/{book['id']}", headers=since)
+    assert response.status_code == 200
+    assert response.json()["authors"][0]["name"] == "Renamed Author"
+    assert response.headers["last-modified"] != last_modified
+
+    # without authors in the response, only the book's own timestamp counts
+    assert client.get(f"/api/books/{book['id']}?include=", headers=since).status_code == 304
+
+
+@pytest.mark.parametrize("path, factory", [("/api/books/", "make_book"), ("/api/authors/", "make_author")])
+def test_collection_etag_changes_on_write(client, headers, request, path, factory):
+    create = request.getfixturevalue(factory)
+    create()
+    etag = client.get(path, headers=headers).headers["etag"]
+    assert client.get(path, headers={**headers, "If-None-Match": etag}).status_code == 304
+
+    create()
+    assert client.get(path, headers={**headers, "If-None-Match": etag}).status_code == 200
+
+
+def test_book_list_etag_changes_on_delete(client, headers, make_book):
+    make_book()
+    book = make_book()
+    etag = client.get("/api/books/", headers=headers).headers["etag"]
+    client.delete(f"/api/books/{book['id']}", headers=headers)
+    assert client.get("/api/books/", headers={**headers, "If-None-Match": etag}).status_code == 200
+
+
+def test_cached_author_is_revalidated_after_update(client, headers, make_author):
+    author = make_author()
+    first = client.get(f"/api/authors/{author['id']}", headers=headers)
+    etag = first.headers["etag"]
+    # served from the response cache, still conditional
+    assert client.get(f"/api/authors/{author['id']}", headers={**headers, "If-None-Match": etag}).status_code == 304
+
+    client.put(f"/api/authors/{author['id']}", json={"biography": "Updated"}, headers=headers)
+    response = client.get(f"/api/authors/{author['id']}", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["biography"] == "Updated"
+
+
+@pytest.mark.parametrize("path", ["/api/authors/?limit=5", "/api/authors/{id}"])
+def test_author_cache_hit_costs_no_query(client, headers, make_author, path):
+    path = path.format(id=make_author()["id"])
+    first = client.get(path, headers=headers)
+    with assert_max_queries(0):
+        hit = client.get(path, headers=headers)
+        revalidated = client.get(path, headers={**headers, "If-None-Match": first.headers["etag"]})
+    assert (hit.status_code, hit.content) == (200, first.content)
+    assert revalidated.status_code == 304
@@ -0,0 +1,89 @@
+"""Prometheus metrics: pool events and the multiprocess snapshot directory."""
+
+import json
+import os
+
+from sqlalchemy import create_engine, text
+
+from app import metrics
+from app.metrics import Registry
+
+
+def _dead_pid() -> int:
+    pid = 999999
+    while metrics._is_alive(pid):
+        pid -= 1
+    return pid
+
+
+def _histogram_count(histogram) -> int:
+    return sum(histogram.snapshot().get((), [0])[:-1])
+
+
+def _requests_total(registry: Registry) -> float:
+    return sum(registry.collect()["test_requests_total"].values())
+
+
+def _registry(directory) -> Registry:
+    registry = Registry(str(directory))
+    registry.counter("test_requests_total", "Requests").inc(amount=2)
+    registry.gauge("test_in_progress", "In progress").inc()
+    return registry
+
+
+def test_pool_events_count_checkouts_and_hold_time(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}")
+    metrics.instrument_engine(engine)
+    holds = _histogram_count(metrics.DB_POOL_HOLD_DURATION)
+    checkouts = metrics.DB_POOL_CHECKOUTS.snapshot().get((), 0)
+    opened = metrics.DB_POOL_CONNECTIONS_OPENED.snapshot().get((), 0)
+
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+        assert metrics.DB_POOL_CHECKED_OUT.snapshot()[()] >= 1
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+
+    assert metrics.DB_POOL_CHECKOUTS.snapshot()[()] == checkouts + 2
+    assert metrics.DB_POOL_CONNECTIONS_OPENED.snapshot()[()] == opened + 1  # reused from the pool
+    assert metrics.DB_POOL_CHECKED_OUT.snapshot()[()] == 0
+    assert _histogram_count(metrics.DB_POOL_HOLD_DURATION) == holds + 2
+    engine.dispose()
+
+
+def test_exited_worker_snapshots_are_folded(tmp_path):
+    dead = _dead_pid()
+    worker = _registry(tmp_path)
+    worker.flush()
+    os.replace(tmp_path / f"{os.getpid()}.json", tmp_path / f"{dead}.json")
+
+    registry = _registry(tmp_path)
+    assert _requests_total(registry) == 4
+    registry.fold_exited()
+    assert [name.startswith("exited-") for name in os.listdir(tmp_path)] == [True]
+    assert _requests_total(registry) == 4
+    folded = json.loads(next(tmp_path.iterdir()).read_text())
+    assert "test_in_progress" not in folded
+
+    # folding again leaves the single folded file alone
+    registry.fold_exited()
+    assert len(os.listdir(tmp_path)) == 1
+
+
+def test_snapshot_of_a_reused_pid_is_folded_before_the_first_flush(tmp_path):
+    _registry(tmp_path).flush()  # an exited worker that had this pid
+
+    registry = _registry(tmp_path)
+    registry.fold_exited()
+    registry.flush()
+    assert _requests_total(registry) == 4
+    assert registry.collect()["test_in_progress"] == {(): 1}
+
+
+def test_stray_and_corrupt_files_are_ignored(tmp_path):
+    (tmp_path / f"{_dead_pid()}.json").write_text("{not json")
+    (tmp_path / "notes.json").write_text("{}")
+    (tmp_path / "1.json.tmp").write_text("{}")
+    registry = _registry(tmp_path)
+    registry.fold_exited()
+    assert _requests_total(registry) == 2
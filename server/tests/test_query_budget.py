@@ -0,0 +1,68 @@
+"""Query budgets of the hot read paths (see TESTING.md).
+
+Each budget is checked with a page large enough that N+1 loading of authors
+or books would blow it, so a lost eager-loading option fails here.
+"""
+
+from app.database import init_db
+from app.query_guard import QueryBudgetExceeded, assert_max_queries
+
+import pytest
+
+from tests.conftest import unique
+
+
+@pytest.fixture
+def library(client, headers, make_author, make_book):
+    """25 books with two authors each, and the user record already cached"""
+    authors = [make_author()["id"] for _ in range(10)]
+    for i in range(25):
+        make_book(author_ids=[authors[i % 10], authors[(i + 1) % 10]])
+    assert client.get("/api/users/me", headers=headers).status_code == 200
+    return authors
+
+
+def test_list_books_budget_does_not_grow_with_page_size(client, headers, library):
+    # ETag summary + books + authors
+    with assert_max_queries(3):
+        response = client.get("/api/books/?limit=100", headers=headers)
+    assert response.status_code == 200
+    assert len(response.json()) == 25
+    assert all(len(book["authors"]) == 2 for book in response.json())
+
+
+def test_list_books_not_modified_costs_one_query(client, headers, library):
+    etag = client.get("/api/books/?limit=100", headers=headers).headers["etag"]
+    with assert_max_queries(1):
+        response = client.get("/api/books/?limit=100", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 304
+
+
+def test_users_me_budget(client, headers, library):
+    with assert_max_queries(1):
+        assert client.get("/api/users/me", headers=headers).status_code == 200
+    # one statement per include level
+    with assert_max_queries(3):
+        response = client.get("/api/users/me?include=books.authors", headers=headers)
+    assert response.status_code == 200
+    assert len(response.json()["books"]) == 25
+
+
+def test_login_budget(client):
+    email = f"{unique('login')}@bibliotheque.org"
+    client.post("/api/users/register", json={"email": email, "password": "secret-pw"})
+    # password hash lookup, then the user record
+    with assert_max_queries(2):
+        response = client.post("/api/users/login", json={"email": email, "password": "secret-pw"})
+    assert response.status_code == 200
+
+
+def test_init_db_with_current_schema_costs_one_query(client):
+    with assert_max_queries(1):
+        assert init_db() is False
+
+
+def test_guard_reports_the_statements_over_budget(client, headers, library):
+    with pytest.raises(QueryBudgetExceeded, match="Expected at most 0 SQL statements"):
+        with assert_max_queries(0):
+            client.get("/api/books/?limit=100", headers=headers)
@@ -0,0 +1,91 @@
+"""Token-bucket throttling of register/login (app.rate_limit)."""
+
+import pytest
+
+from app.exceptions import RateLimitError
+from app.rate_limit import AuthRateLimiter, BucketSpec, MemoryBackend
+from app.routes import users
+
+from tests.conftest import unique
+
+
+def _spec(key: str, rate: float = 1.0, burst: int = 2) -> BucketSpec:
+    return BucketSpec("ip", key, rate, burst)
+
+
+def test_bucket_allows_burst_then_refills():
+    backend = MemoryBackend()
+    bucket = [_spec("ip:1", rate=0.5, burst=2)]
+    assert backend.acquire(bucket, now=0.0) == [0.0]
+    assert backend.acquire(bucket, now=0.0) == [0.0]
+    assert backend.acquire(bucket, now=0.0) == [pytest.approx(2.0)]  # next token in 1 / 0.5 s
+    assert backend.acquire(bucket, now=1.0) == [pytest.approx(1.0)]
+    assert backend.acquire(bucket, now=2.0) == [0.0]
+
+
+def test_rejected_request_does_not_drain_the_other_bucket():
+    backend = MemoryBackend()
+    ip = _spec("ip:1", burst=5)
+    email = BucketSpec("email", "email:x", 1.0, 1)
+    assert backend.acquire([ip, email], now=0.0) == [0.0, 0.0]
+    waits = backend.acquire([ip, email], now=0.0)
+    assert waits[0] == 0.0 and waits[1] > 0
+    # only the first request took an IP token
+    for _ in range(4):
+        assert backend.acquire([ip], now=0.0) == [0.0]
+    assert backend.acquire([ip], now=0.0)[0] > 0
+
+
+def test_memory_backend_is_bounded():
+    backend = MemoryBackend(max_keys=3)
+    for i in range(10):
+        backend.acquire([_spec(f"ip:{i}")], now=0.0)
+    assert backend.stats()["keys"] == 3
+
+
+def test_limiter_raises_with_retry_after_and_normalizes_emails():
+    limiter = AuthRateLimiter(MemoryBackend(), ip_per_minute=0, email_per_minute=6, email_burst=1)
+    limiter.check("login", "10.0.0.1", "Reader@Example.org")
+    with pytest.raises(RateLimitError) as exc_info:
+        limiter.check("login", "10.0.0.2", "  reader@example.org ")
+    assert exc_info.value.status_code == 429
+    assert exc_info.value.headers == {"Retry-After": "10"}
+    assert exc_info.value.details["scope"] == "email"
+    assert limiter.stats()["rejected"] == 1
+
+
+def test_limiter_admits_when_disabled_or_backend_fails():
+    AuthRateLimiter(None).check("login", "10.0.0.1", "a@example.org")
+
+    class BrokenBackend(MemoryBackend):
+        def acquire(self, buckets, now):
+            raise ConnectionError("backend down")
+
+    limiter = AuthRateLimiter(BrokenBackend())
+    limiter.check("login", "10.0.0.1", "a@example.org")
+    assert limiter.stats()["errors"] == 1
+
+
+@pytest.fixture
+def strict_limiter(monkeypatch):
+    limiter = AuthRateLimiter(MemoryBackend(), ip_per_minute=60, ip_burst=2, email_per_minute=0)
+    monkeypatch.setattr(users, "auth_rate_limiter", limiter)
+    return limiter
+
+
+def test_login_is_throttled_before_checking_credentials(client, strict_limiter):
+    credentials = {"email": f"{unique('throttled')}@bibliotheque.org", "password": "wrong-pw"}
+    assert client.post("/api/users/login", json=credentials).status_code == 401
+    assert client.post("/api/users/login", json=credentials).status_code == 401
+
+    response = client.post("/api/users/login", json=credentials)
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == "1"
+    assert response.json()["error"]["error_code"] == "RATE_LIMIT_EXCEEDED"
+    assert strict_limiter.stats()["rejected"] == 1
+
+
+def test_register_is_throttled(client, strict_limiter):
+    for expected in (201, 201, 429):
+        body = {"email": f"{unique('burst')}@bibliotheque.org", "password": "secret-pw"}
+        assert client.post("/api/users/register", json=body).status_code == expected